@@ -0,0 +1,337 @@
+from .conversions import transpose, bytes_view
+from .engine import get_engine
+from .profiling import stage, instrumented
+
+class K_PKE:
+    
+    def __init__(self, k, eta1, eta2, du, dv, engine=None, matrix_expander=None, stream_matrix=False,
+                 specialized=False):
+        """
+        Inicializa una instancia del esquema K-PKE.
+
+        Entrada:
+        - k: número de filas/columnas de la matriz A (dimensión del esquema).
+        - eta1: parámetro de ruido para las distribuciones de s y e.
+        - eta2: parámetro de ruido para las distribuciones de e1 y e2.
+        - du: parámetro de compresión para el componente c1 del cifrado.
+        - dv: parámetro de compresión para el componente c2 del cifrado.
+        - engine: motor de cálculo (nombre registrado o Engine); None usa el motor por defecto.
+        - matrix_expander: objeto con un método expand(rho, k) que devuelve la matriz A (por ejemplo,
+          un MatrixExpander que la reparte entre varios procesos); None la calcula en serie.
+        - stream_matrix: no construir la matriz A completa, sino generar cada entrada al multiplicar
+          (Engine.NTT_sampled_matrix_vector_multiply), de modo que solo hay una en memoria a la vez.
+        - specialized: usar Encrypt y Decrypt generados para estos parámetros (codegen.k_pke_kernels),
+          con los bucles sobre k desenrollados y los desplazamientos como constantes.
+        """
+        assert(not (stream_matrix and matrix_expander is not None))
+        self.__engine = get_engine(engine)
+        self.__matrix_expander = matrix_expander
+        self.__stream_matrix = stream_matrix
+        self.__kernels = None
+        if specialized:
+            from .codegen import k_pke_kernels
+            self.__kernels = k_pke_kernels(k, eta1, eta2, du, dv)
+        self.__k = k
+        self.__eta1 = eta1
+        self.__eta2 = eta2
+        self.__du = du
+        self.__dv = dv
+    
+    @property
+    def engine(self):
+        """
+        Motor de cálculo que usa esta instancia.
+        """
+        return self.__engine
+    
+    def __expand_matrix(self, rho):
+        """
+        Construye la matriz pública A ∈ R_q^{k×k} en dominio NTT a partir de la semilla rho.
+        """
+        if self.__matrix_expander is not None:
+            return self.__matrix_expander.expand(rho, self.__k)
+        
+        eng = self.__engine
+        A = [[[0 for _ in range(256)] for _ in range(self.__k)] for _ in range(self.__k)]
+        for i in range(self.__k):
+            for j in range(self.__k):
+                A[i][j] = eng.SampleNTT(rho + bytes([j, i]))  # A[i][j] = XOF(rho || j || i)
+        return A
+    
+    def __matrix_vector_multiply(self, rho, s_gorro, transposed=False):
+        """
+        Producto A·ŝ (o Aᵀ·ŝ) en T_q con la matriz generada a partir de rho, completa o entrada a entrada.
+        """
+        eng = self.__engine
+        if self.__stream_matrix:
+            return eng.NTT_sampled_matrix_vector_multiply(rho, s_gorro, transposed)
+        
+        A = self.__expand_matrix(rho)
+        return eng.NTT_matrix_vector_multiply(transpose(A) if transposed else A, s_gorro)
+    
+    def expand_keys(self, dk_PKE, ek_PKE):
+        """
+        Decodifica un par de claves K-PKE y genera la matriz Aᵗ una sola vez, para reutilizarlos en
+        Decrypt_expanded y Encrypt_expanded_into.
+
+        Entrada:
+        - dk_PKE: clave secreta (384*k bytes).
+        - ek_PKE: clave pública (384*k + 32 bytes).
+
+        Salida:
+        - (s_gorro, t_gorro, A_T): ŝ, t̂ y Aᵗ en dominio NTT.
+        """
+        eng = self.__engine
+        dk_PKE = bytes_view(dk_PKE)
+        ek_PKE = bytes_view(ek_PKE)
+        s_gorro = [eng.ByteDecode(12, dk_PKE[384 * i : 384 * (i + 1)]) for i in range(self.__k)]
+        t_gorro = [eng.ByteDecode(12, ek_PKE[384 * i : 384 * (i + 1)]) for i in range(self.__k)]
+        A_T = transpose(self.__expand_matrix(bytes(ek_PKE[384 * self.__k:])))
+        return s_gorro, t_gorro, A_T
+    
+    def KeyGen(self, d):
+        """
+        Genera un par de claves (pública y secreta) para el esquema K-PKE.
+
+        Entrada:
+        - d: semilla de entrada de tamaño 32 bytes (bytes-like o lista de enteros).
+
+        Salida:
+        - ek_PKE: clave pública comprimida (bytes).
+        - dk_PKE: clave secreta comprimida (en dominio NTT, bytes).
+        """
+        ek_PKE = bytearray(384 * self.__k + 32)
+        dk_PKE = bytearray(384 * self.__k)
+        self.KeyGen_into(d, ek_PKE, dk_PKE)
+        
+        return bytes(ek_PKE), bytes(dk_PKE)
+    
+    @instrumented("K-PKE.KeyGen")
+    def KeyGen_into(self, d, out_ek, out_dk):
+        """
+        Genera un par de claves K-PKE escribiéndolas en buffers proporcionados por el llamante.
+
+        Entrada:
+        - d: semilla de entrada de tamaño 32 bytes (bytes-like o lista de enteros).
+        - out_ek: buffer escribible de 384*k + 32 bytes donde se escribe ek_PKE.
+        - out_dk: buffer escribible de 384*k bytes donde se escribe dk_PKE.
+        """
+        out_ek = bytes_view(out_ek)
+        out_dk = bytes_view(out_dk)
+        assert(not out_ek.readonly and len(out_ek) == 384 * self.__k + 32)
+        assert(not out_dk.readonly and len(out_dk) == 384 * self.__k)
+        eng = self.__engine
+        
+        (rho, sigma) = eng.G(bytes(d) + bytes([self.__k]))  # Expansión determinista de la semilla en rho y sigma
+        N = 0  # Contador para la función PRF
+        
+        with stage("noise"):  # Muestreo de ruido (PRF + CBD)
+            # Generación del vector secreto s ∈ R_q^k usando CBD con semilla sigma
+            s = [[0 for _ in range(256)] for _ in range(self.__k)]
+            for i in range(self.__k):
+                s[i] = eng.SamplePolyCBD(self.__eta1, eng.PRF(self.__eta1, sigma, N))
+                N = N + 1
+        
+            # Generación del vector de errores e ∈ R_q^k
+            e = [[0 for _ in range(256)] for _ in range(self.__k)]
+            for i in range(self.__k):
+                e[i] = eng.SamplePolyCBD(self.__eta1, eng.PRF(self.__eta1, sigma, N))
+                N = N + 1
+        
+        # Transformación NTT de s y e
+        s_gorro = list(map(eng.NTT, s))
+        e_gorro = list(map(eng.NTT, e))
+        
+        # Cálculo de t̂ = A·s_gorro + e_gorro, con la matriz pública A ∈ R_q^{k×k} generada a partir de rho
+        t_gorro = list(map(eng.SumNTTs, self.__matrix_vector_multiply(rho, s_gorro), e_gorro))
+        
+        # Codificación de la clave pública en su sitio: incluye t_gorro y rho
+        for i in range(self.__k):
+            eng.ByteEncode_into(12, t_gorro[i], out_ek, 384 * i)
+        out_ek[384 * self.__k:] = rho
+        
+        # Codificación de la clave secreta en su sitio: solo s_gorro
+        for i in range(self.__k):
+            eng.ByteEncode_into(12, s_gorro[i], out_dk, 384 * i)
+    
+    def Encrypt(self, ek_PKE, m, r):
+        """
+        Cifra un mensaje m utilizando la clave pública y una semilla aleatoria.
+
+        Entrada:
+        - ek_PKE: clave pública (bytes-like o lista de enteros).
+        - m: mensaje de 32 bytes a cifrar.
+        - r: semilla aleatoria para la generación de ruido.
+
+        Salida:
+        - c: cifrado (c1 || c2) como bytes.
+        """
+        c = bytearray(32 * (self.__du * self.__k + self.__dv))
+        self.Encrypt_into(ek_PKE, m, r, c)
+        
+        return bytes(c)
+    
+    @instrumented("K-PKE.Encrypt")
+    def Encrypt_into(self, ek_PKE, m, r, out):
+        """
+        Cifra un mensaje m escribiendo c1 || c2 directamente en un buffer del llamante.
+
+        Entrada:
+        - ek_PKE: clave pública (bytes-like o lista de enteros).
+        - m: mensaje de 32 bytes a cifrar.
+        - r: semilla aleatoria para la generación de ruido.
+        - out: buffer escribible de 32*(du*k + dv) bytes donde se escribe el cifrado.
+        """
+        if self.__kernels is not None:
+            return self.__kernels[0](self.__engine, self.__matrix_vector_multiply, ek_PKE, m, r, out)
+        
+        eng = self.__engine
+        
+        # Vista sin copia de la clave pública: los cortes posteriores no duplican datos
+        ek_PKE = bytes_view(ek_PKE)
+        
+        # Decodificación de t̂ a partir de ek_PKE
+        t_gorro = []
+        for i in range(self.__k):
+            t_gorro.append(eng.ByteDecode(12, ek_PKE[384 * i : 384 * (i + 1)]))
+        rho = bytes(ek_PKE[384 * self.__k:])  # Extracción de la semilla rho (32 bytes)
+        
+        # Aᵗ·ŷ con la matriz A reconstruida a partir de rho
+        self.__encrypt_into(t_gorro, lambda y_gorro: self.__matrix_vector_multiply(rho, y_gorro, True), m, r, out)
+    
+    @instrumented("K-PKE.Encrypt")
+    def Encrypt_expanded_into(self, t_gorro, A_T, m, r, out):
+        """
+        Cifra un mensaje m con una clave pública ya expandida (ver expand_keys), sin decodificar t̂
+        ni volver a generar la matriz A.
+
+        Entrada:
+        - t_gorro: vector t̂ de k polinomios en dominio NTT.
+        - A_T: matriz Aᵗ en dominio NTT.
+        - m, r, out: como en Encrypt_into.
+        """
+        eng = self.__engine
+        self.__encrypt_into(t_gorro, lambda y_gorro: eng.NTT_matrix_vector_multiply(A_T, y_gorro), m, r, out)
+    
+    def __encrypt_into(self, t_gorro, transposed_product, m, r, out):
+        """
+        Cuerpo común de Encrypt_into y Encrypt_expanded_into.
+
+        Entrada:
+        - t_gorro: vector t̂ decodificado.
+        - transposed_product: función que recibe ŷ y devuelve Aᵗ·ŷ.
+        - m, r, out: como en Encrypt_into.
+        """
+        out = bytes_view(out)
+        assert(not out.readonly and len(out) == 32 * (self.__du * self.__k + self.__dv))
+        
+        eng = self.__engine
+        N = 0  # Contador para PRF
+        
+        with stage("noise"):  # Muestreo de ruido (PRF + CBD)
+            # Generación del vector aleatorio y ∈ R_q^k
+            y = [[0 for _ in range(256)] for _ in range(self.__k)]
+            for i in range(self.__k):
+                y[i] = eng.SamplePolyCBD(self.__eta1, eng.PRF(self.__eta1, r, N))
+                N = N + 1
+        
+            # Generación del vector de errores e1 ∈ R_q^k
+            e1 = [[0 for _ in range(256)] for _ in range(self.__k)]
+            for i in range(self.__k):
+                e1[i] = eng.SamplePolyCBD(self.__eta2, eng.PRF(self.__eta2, r, N))
+                N = N + 1
+        
+            # Generación del error e2 ∈ R_q
+            e2 = eng.SamplePolyCBD(self.__eta2, eng.PRF(self.__eta2, r, N))
+        
+        # Transformación NTT del vector y
+        y_gorro = list(map(eng.NTT, y))
+        
+        # Cálculo de u = INTT(Aᵗ·y_gorro) + e1
+        u = list(map(eng.SumNTTs, list(map(eng.INTT, transposed_product(y_gorro))), e1))
+        
+        # Transformación del mensaje m a mu (0 --> 0 y 1 --> floor(q/2))
+        mu = eng.Decompress_poly(1, eng.ByteDecode(1, m))
+        
+        # Cálculo de v = INTT(t_gorro·_gorroy) + e2 + μ
+        v = eng.NTT_sum([eng.INTT(eng.NTT_vector_vector_multiply(t_gorro, y_gorro)), e2, mu])
+        
+        with stage("compress"):  # Compresión y codificación de la cápsula
+            # Codificación del componente c1 en su sitio: compresión de u
+            for i in range(self.__k):
+                eng.ByteEncode_into(self.__du, eng.Compress_poly(self.__du, u[i]), out, 32 * self.__du * i)
+        
+            # Codificación del componente c2 a continuación de c1: compresión de v
+            eng.ByteEncode_into(self.__dv, eng.Compress_poly(self.__dv, v), out, 32 * self.__du * self.__k)
+    
+    @instrumented("K-PKE.Decrypt")
+    def Decrypt(self, dk_PKE, c):
+        """
+        Descifra un cifrado c utilizando la clave secreta.
+
+        Entrada:
+        - dk_PKE: clave secreta (bytes-like o lista de enteros).
+        - c: cifrado (c1 || c2) (bytes-like o lista de enteros).
+
+        Salida:
+        - m: mensaje descifrado como 32 bytes.
+        """
+        if self.__kernels is not None:
+            return self.__kernels[1](self.__engine, dk_PKE, c)
+        
+        eng = self.__engine
+        
+        # Vista sin copia sobre la clave
+        dk_PKE = bytes_view(dk_PKE)
+        
+        # Decodificación de s_gorro desde la clave secreta
+        s_gorro = []
+        for i in range(self.__k):
+            s_gorro.append(eng.ByteDecode(12, dk_PKE[384 * i: 384 * (i + 1)]))
+        
+        return self.__decrypt(s_gorro, c)
+    
+    @instrumented("K-PKE.Decrypt")
+    def Decrypt_expanded(self, s_gorro, c):
+        """
+        Descifra un cifrado c con la clave secreta ya decodificada (ver expand_keys).
+
+        Entrada:
+        - s_gorro: vector ŝ de k polinomios en dominio NTT.
+        - c: cifrado (c1 || c2) (bytes-like o lista de enteros).
+
+        Salida:
+        - m: mensaje descifrado como 32 bytes.
+        """
+        return self.__decrypt(s_gorro, c)
+    
+    def __decrypt(self, s_gorro, c):
+        """
+        Cuerpo común de Decrypt y Decrypt_expanded.
+        """
+        eng = self.__engine
+        
+        # Vista sin copia sobre el cifrado
+        c = bytes_view(c)
+        
+        # Separación del cifrado en componentes c1 y c2
+        c1 = c[:32 * self.__du * self.__k]
+        c2 = c[32 * self.__du * self.__k:]
+        
+        with stage("decompress"):  # Decodificación y descompresión de la cápsula
+            # Reconstrucción de u' a partir de c1
+            u_prime = []
+            for i in range(self.__k):
+                u_prime.append(eng.Decompress_poly(self.__du, eng.ByteDecode(self.__du, c1[32 * self.__du * i: 32 * self.__du * (i + 1)])))
+        
+            # Reconstrucción de v' a partir de c2
+            v_prime = eng.Decompress_poly(self.__dv, eng.ByteDecode(self.__dv, c2))
+        
+        # Cálculo de w = v' - INTT(s_gorro·NTT(u'))
+        w = eng.SubtractNTTs(v_prime, eng.NTT_vector_dot(s_gorro, u_prime))
+        
+        with stage("compress"):  # Compresión y codificación del mensaje
+            # Decodificación del mensaje final m
+            m = eng.ByteEncode(1, eng.Compress_poly(1, w))
+        
+        return m
\ No newline at end of file
@@ -0,0 +1,752 @@
+from .K_PKE import K_PKE
+from .engine import get_engine
+from threading import Lock
+from .conversions import bytes_view
+from .validation import KeyValidator, ValidatedEK, ValidatedDK, ExpandedDK
+from .profiling import instrumented, measured
+from .randomness import DEFAULT_SOURCE
+    
+class ML_KEM:
+    
+    def __init__(self, k, eta1, eta2, du, dv, validation_cache_size=256, engine=None, shadow=None,
+                 matrix_expander=None, stream_matrix=False, decaps_cache=None,
+                 specialized=False, metrics=None, randomness=None):
+        """
+        Inicializa una instancia del esquema ML-KEM con los parámetros dados.
+
+        Entrada:
+        - k: número de polinomios en el esquema (determina el nivel de seguridad)
+        - eta1: parámetro de ruido para la generación de claves
+        - eta2: parámetro de ruido para el cifrado
+        - du, dv: parámetros de compresión de la cápsula
+        - validation_cache_size: número de claves ya validadas que se recuerdan (0 desactiva la caché)
+        - engine: motor de cálculo, "reference" u "optimized" (ver engine.py); None usa el motor por defecto
+        - shadow: instancia de engine.Shadow para comprobar una fracción de las operaciones contra el
+          motor de referencia (None lo desactiva)
+        - matrix_expander: expansor de la matriz A para K-PKE (por ejemplo, expand.MatrixExpander);
+          None la calcula en serie
+        - stream_matrix: generar cada entrada de A al multiplicar en lugar de construir la matriz
+          completa (una entrada en memoria en vez de k²)
+        - decaps_cache: instancia de decaps_cache.DecapsCache que recuerda el resultado de Decaps para
+          cápsulas repetidas (None lo desactiva); solo se consulta cuando Decaps recibe un ValidatedDK
+          (validate_dk), las claves en bytes se desencapsulan sin caché
+        - specialized: usar en K-PKE el Encrypt y el Decrypt generados para estos parámetros (codegen.py)
+        - metrics: registro de metrics.Metrics donde se anotan operaciones, errores, rechazos implícitos
+          y latencias (None lo desactiva)
+        - randomness: función que devuelve n bytes aleatorios (os.urandom o una fuente de randomness.py);
+          None usa randomness.DEFAULT_SOURCE, que pide la entropía al sistema por bloques
+
+        Internamente, se instancia una versión correspondiente del esquema K-PKE y un validador de claves.
+
+        Una misma instancia puede usarse a la vez desde varios hilos: K-PKE no guarda estado entre
+        llamadas, cada hash crea su propia esponja y las cachés (validación, motor de referencia del
+        modo sombra) se protegen con cerrojos. Ver concurrency.py para ejecutar lotes en hilos.
+        """
+        self.__k = k
+        self.__eta1 = eta1
+        self.__eta2 = eta2
+        self.__du = du
+        self.__dv = dv
+        self.__engine = get_engine(engine)
+        self.__k_pke = K_PKE(self.__k, self.__eta1, self.__eta2, self.__du, self.__dv, self.__engine,
+                             matrix_expander, stream_matrix, specialized)
+        self.__validator = KeyValidator(self.__k, validation_cache_size, self.__engine.H)
+        self.__shadow = shadow
+        self.__shadow_reference = None
+        self.__shadow_lock = Lock()
+        self.__decaps_cache = decaps_cache
+        self.__metrics = metrics
+        self.__random = DEFAULT_SOURCE if randomness is None else randomness
+    
+    @property
+    def engine(self):
+        """
+        Motor de cálculo que usa esta instancia.
+        """
+        return self.__engine
+    
+    @property
+    def param_set(self):
+        """
+        Nivel de seguridad (512, 768 o 1024).
+        """
+        return 256 * self.__k
+    
+    @property
+    def metrics(self):
+        """
+        Registro de métricas de esta instancia (o None).
+        """
+        return self.__metrics
+    
+    def __shadow_check(self, operation, inputs, result, reference_call):
+        """
+        Modo sombra: repite una fracción de las operaciones con el motor de referencia y compara.
+
+        Entrada:
+        - operation: "KeyGen", "Encaps" o "Decaps"
+        - inputs: diccionario con las entradas deterministas de la operación
+        - result: tupla con los resultados obtenidos con el motor propio
+        - reference_call: función que recibe la instancia de referencia y repite la operación
+
+        Salida:
+        - result, o los resultados de referencia si hay divergencia y el modo sombra los prefiere
+        """
+        shadow = self.__shadow
+        if shadow is None or not shadow.sample():
+            return result
+        if self.__shadow_reference is None:
+            with self.__shadow_lock:
+                if self.__shadow_reference is None:
+                    self.__shadow_reference = ML_KEM(self.__k, self.__eta1, self.__eta2, self.__du, self.__dv,
+                                                     validation_cache_size=0, engine=shadow.reference)
+        expected = reference_call(self.__shadow_reference)
+        
+        if shadow.report(operation, self.__engine.name, self.__k, inputs, result, expected) or not shadow.prefer_reference:
+            return result
+        return expected
+        
+    def __KeyGen_internal(self, d, z):
+        """
+        Algoritmo interno de generación de claves.
+
+        Entrada:
+        - d: semilla aleatoria para generación determinista
+        - z: cadena aleatoria utilizada para KDF alternativa en caso de fallo de descifrado
+
+        Salida:
+        - ek: clave pública (bytes)
+        - dk: clave privada extendida (incluye ek, H(ek), z) (bytes)
+        """
+        ek = bytearray(384 * self.__k + 32)
+        dk = bytearray(768 * self.__k + 96)
+        self.__KeyGen_internal_into(d, z, memoryview(ek), memoryview(dk))
+        
+        return bytes(ek), bytes(dk)
+    
+    def __KeyGen_internal_into(self, d, z, out_ek, out_dk):
+        """
+        Algoritmo interno de generación de claves sobre buffers del llamante.
+
+        Entrada:
+        - d, z: semillas de 32 bytes (como en __KeyGen_internal)
+        - out_ek: memoryview escribible de 384*k + 32 bytes para ek
+        - out_dk: memoryview escribible de 768*k + 96 bytes para dk = dk_PKE || ek || H(ek) || z
+        """
+        n = 384 * self.__k
+        
+        # K-PKE escribe ek_PKE y dk_PKE directamente en su sitio
+        self.__k_pke.KeyGen_into(d, out_ek, out_dk[:n])
+        out_dk[n : 2 * n + 32] = out_ek
+        out_dk[2 * n + 32 : 2 * n + 64] = self.__engine.H(out_ek)
+        out_dk[2 * n + 64:] = bytes_view(z)
+        
+        result = self.__shadow_check("KeyGen", {"d": d, "z": z}, (out_ek, out_dk),
+                                     lambda reference: reference.__KeyGen_internal(d, z))
+        if result[0] is not out_ek:
+            (out_ek[:], out_dk[:]) = result
+    
+    def __Encaps_internal(self, ek, m, h=None):
+        """
+        Algoritmo interno de encapsulación.
+
+        Entrada:
+        - ek: clave pública del receptor
+        - m: mensaje aleatorio (preimagen de la clave)
+        - h: H(ek) si ya se conoce (se calcula en caso contrario)
+
+        Salida:
+        - K: clave simétrica derivada mediante función hash
+        - c: cápsula (ciphertext) que encapsula el mensaje m
+        """
+        c = bytearray(32 * (self.__du * self.__k + self.__dv))
+        K = self.__Encaps_internal_into(ek, m, c, h)
+        
+        return K, bytes(c)
+    
+    def __Encaps_internal_into(self, ek, m, out_c, h=None):
+        """
+        Algoritmo interno de encapsulación que escribe la cápsula en un buffer del llamante.
+
+        Entrada:
+        - ek: clave pública del receptor
+        - m: mensaje aleatorio (preimagen de la clave)
+        - out_c: buffer escribible de 32*(du*k + dv) bytes para la cápsula
+        - h: H(ek) si ya se conoce (se calcula en caso contrario)
+
+        Salida:
+        - K: clave simétrica derivada mediante función hash
+        """
+        if h is None:
+            h = self.__engine.H(ek)
+        (K, r) = self.__engine.G(b"".join((m, h)))
+        self.__k_pke.Encrypt_into(ek, m, r, out_c)
+        
+        (K, c) = self.__shadow_check("Encaps", {"ek": ek, "m": m}, (K, out_c),
+                                     lambda reference: reference.__Encaps_internal(ek, m, h))
+        if c is not out_c:
+            out_c[:] = c
+        
+        return K
+        
+    def __Decaps_internal(self, dk, c):
+        """
+        Algoritmo interno de desencapsulación.
+
+        Entrada:
+        - dk: clave privada extendida del receptor
+        - c: cápsula recibida
+
+        Salida:
+        - K': clave simétrica recuperada (o clave alternativa si el descifrado falla)
+        """
+        # Se extraen las partes necesarias de la clave privada (cortes de memoryview, sin copia)
+        dk_PKE = dk[:384 * self.__k]
+        ek_PKE = dk[384 * self.__k : 768 * self.__k + 32]
+        h = dk[768 * self.__k + 32 : 768 * self.__k + 64]
+        z = dk[768 * self.__k + 64:]
+        
+        # Se intenta recuperar el mensaje original
+        m_prime = self.__k_pke.Decrypt(dk_PKE, c)
+        K_prime = self.__recheck(m_prime, c, h, z, lambda m, r, out: self.__k_pke.Encrypt_into(ek_PKE, m, r, out))
+        
+        (K_prime,) = self.__shadow_check("Decaps", {"dk": dk, "c": c}, (K_prime,),
+                                         lambda reference: (reference.__Decaps_internal(dk, c),))
+            
+        return K_prime
+    
+    def __recheck(self, m_prime, c, h, z, encrypt_into):
+        """
+        Transformación FO de Decaps: vuelve a cifrar el mensaje recuperado y, si la cápsula no
+        coincide, devuelve la clave de rechazo implícito.
+
+        Entrada:
+        - m_prime: mensaje recuperado por K-PKE.Decrypt
+        - c: cápsula recibida
+        - h, z: H(ek) y valor de rechazo implícito de la clave privada
+        - encrypt_into: función (m, r, out) que cifra con la clave pública de dk
+
+        Salida:
+        - K' (o K̄ = J(z || c) si el descifrado falla)
+        """
+        (K_prime, r_prime) = self.__engine.G(m_prime + h)
+        K_barra = self.__engine.J(b"".join((z, c)))  # Clave alternativa en caso de fallo
+        c_prime = bytearray(len(c))
+        encrypt_into(m_prime, r_prime, c_prime)
+        
+        # Se comprueba si el descifrado fue correcto
+        if c != c_prime:
+            K_prime = K_barra
+            if self.__metrics is not None:
+                self.__metrics.record_rejection(self.param_set)
+        
+        return K_prime
+    
+    @instrumented("ML-KEM.KeyGen")
+    @measured("KeyGen")
+    def KeyGen(self):
+        """
+        Genera un par de claves pública y privada para ML-KEM.
+
+        Salida:
+        - ek: clave pública (bytes)
+        - dk: clave privada extendida (bytes)
+        """
+        seed = self.__random(64)
+        (d, z) = (seed[:32], seed[32:])
+        
+        (ek, dk) = self.__KeyGen_internal(d, z)
+        
+        return ek, dk
+    
+    def KeyGen_seed(self):
+        """
+        Genera únicamente la semilla de un par de claves.
+
+        El par (ek, dk) queda completamente determinado por los 64 bytes d || z, por lo que basta
+        con almacenar la semilla y reconstruir las claves con KeyGen_from_seed o expand_seed.
+
+        Salida:
+        - seed: 64 bytes (d || z)
+        """
+        return self.__random(64)
+    
+    @measured("KeyGen")
+    def KeyGen_from_seed(self, seed):
+        """
+        Reconstruye de forma determinista el par de claves asociado a una semilla.
+
+        Entrada:
+        - seed: 64 bytes (d || z), bytes-like o lista de enteros
+
+        Salida:
+        - ek: clave pública (bytes)
+        - dk: clave privada extendida (bytes)
+        """
+        seed = bytes_view(seed)
+        assert(len(seed) == 64)
+        
+        return self.__KeyGen_internal(seed[:32], seed[32:])
+    
+    def expand_seed(self, seed):
+        """
+        Reconstruye el par de claves asociado a una semilla en forma ya validada.
+
+        Las claves se generan aquí mismo, por lo que no necesitan pasar por las comprobaciones de
+        Encaps/Decaps: H(ek) se toma directamente de dk.
+
+        Entrada:
+        - seed: 64 bytes (d || z)
+
+        Salida:
+        - ValidatedEK y ValidatedDK listos para Encaps y Decaps
+        """
+        (ek, dk) = self.KeyGen_from_seed(seed)
+        h = dk[768 * self.__k + 32 : 768 * self.__k + 64]
+        
+        return ValidatedEK(self.__k, ek, h), ValidatedDK(self.__k, dk)
+    
+    @instrumented("ML-KEM.KeyGen")
+    @measured("KeyGen")
+    def KeyGen_into(self, out_ek, out_dk):
+        """
+        Genera un par de claves escribiéndolas en buffers preasignados (por ejemplo, un hueco de un
+        buffer de envío o de una zona de memoria para un lote), sin crear bytes intermedios.
+
+        Entrada:
+        - out_ek: bytearray o memoryview escribible de 384*k + 32 bytes
+        - out_dk: bytearray o memoryview escribible de 768*k + 96 bytes
+        """
+        out_ek = bytes_view(out_ek)
+        out_dk = bytes_view(out_dk)
+        assert(not out_ek.readonly and len(out_ek) == 384 * self.__k + 32)
+        assert(not out_dk.readonly and len(out_dk) == 768 * self.__k + 96)
+        
+        seed = self.__random(64)
+        (d, z) = (seed[:32], seed[32:])
+        
+        self.__KeyGen_internal_into(d, z, out_ek, out_dk)
+    
+    def validate_ek(self, ek):
+        """
+        Valida una clave pública según FIPS 203 (comprobaciones de tipo y de módulo).
+
+        El resultado puede conservarse y pasarse a Encaps/Encaps_into en lugar de ek para
+        omitir la validación y el cálculo de H(ek) en cada llamada.
+
+        Entrada:
+        - ek: clave pública (bytes, bytearray, memoryview o lista de enteros)
+
+        Salida:
+        - ValidatedEK
+        """
+        return self.__validator.validate_ek(ek)
+    
+    def validate_dk(self, dk):
+        """
+        Valida una clave privada extendida según FIPS 203 (comprobaciones de tipo y de hash).
+
+        El resultado puede conservarse y pasarse a Decaps en lugar de dk.
+
+        Entrada:
+        - dk: clave privada extendida (bytes, bytearray, memoryview o lista de enteros)
+
+        Salida:
+        - ValidatedDK
+        """
+        return self.__validator.validate_dk(dk)
+    
+    @instrumented("ML-KEM.Encaps")
+    @measured("Encaps")
+    def Encaps(self, ek):
+        """
+        Realiza el algoritmo de encapsulación usando una clave pública.
+
+        Entrada:
+        - ek: clave pública del receptor (bytes, bytearray, memoryview, lista de enteros o ValidatedEK)
+
+        Salida:
+        - K: clave simétrica generada (bytes)
+        - c: cápsula correspondiente (bytes)
+        """
+        # Verifica que la clave pública es válida según el estándar (o la toma de la caché de validación)
+        (ek, h) = self.__validator.check_ek(ek)
+        
+        m = self.__random(32)  # Mensaje aleatorio que se encapsula
+        
+        (K, c) = self.__Encaps_internal(ek, m, h)
+        
+        return K, c
+    
+    @instrumented("ML-KEM.Encaps")
+    @measured("Encaps")
+    def Encaps_into(self, ek, out_c, out_K):
+        """
+        Realiza la encapsulación escribiendo la cápsula y la clave en buffers preasignados.
+
+        Entrada:
+        - ek: clave pública del receptor (bytes, bytearray, memoryview, lista de enteros o ValidatedEK)
+        - out_c: bytearray o memoryview escribible de 32*(du*k + dv) bytes para c
+        - out_K: bytearray o memoryview escribible de 32 bytes para K
+        """
+        (ek, h) = self.__validator.check_ek(ek)
+        out_c = bytes_view(out_c)
+        out_K = bytes_view(out_K)
+        assert(not out_c.readonly and len(out_c) == (32 * (self.__du * self.__k + self.__dv)))
+        assert(not out_K.readonly and len(out_K) == 32)
+        
+        m = self.__random(32)  # Mensaje aleatorio que se encapsula
+        
+        out_K[:] = self.__Encaps_internal_into(ek, m, out_c, h)
+    
+    @instrumented("ML-KEM.Decaps")
+    @measured("Decaps")
+    def Decaps(self, dk, c):
+        """
+        Realiza el algoritmo de desencapsulación usando una clave privada.
+
+        Entrada:
+        - dk: clave privada extendida del receptor (bytes, bytearray, memoryview, lista de enteros o ValidatedDK)
+        - c: cápsula recibida (bytes, bytearray, memoryview o lista de enteros)
+
+        Salida:
+        - K': clave simétrica recuperada (bytes)
+        """
+        # Vista sin copia; para listas se comprueba además el rango de cada byte
+        c = bytes_view(c)
+        
+        # Verificaciones de integridad sobre cápsula y clave (la de dk puede resolverse en la caché de validación)
+        assert(len(c) == (32 * (self.__du * self.__k + self.__dv)))
+        validated = dk
+        dk = self.__validator.check_dk(dk)
+        
+        # La caché solo se usa con un ValidatedDK, cuya huella se recuerda: con una clave en bytes habría
+        # que calcular H(dk) en cada llamada y un fallo sería más lento que no tener caché
+        cache = self.__decaps_cache
+        if cache is None or not isinstance(validated, ValidatedDK):
+            return self.__Decaps_internal(dk, c)
+        
+        # Cápsula retransmitida: mismo K' (también en el rechazo implícito) sin repetir el cálculo
+        key = (cache.fingerprint(validated, self.__engine.H), self.__engine.H(c))
+        K_prime = cache.lookup(*key)
+        if K_prime is None:
+            K_prime = self.__Decaps_internal(dk, c)
+            cache.store(*key, K_prime)
+        
+        return K_prime
+    
+    def expand_dk(self, dk):
+        """
+        Valida una clave privada extendida y la expande para Decaps_expanded.
+
+        Entrada:
+        - dk: clave privada extendida (bytes-like, lista de enteros o ValidatedDK)
+
+        Salida:
+        - ExpandedDK
+        """
+        dk = self.__validator.check_dk(dk)
+        k = self.__k
+        (s_gorro, t_gorro, A_T) = self.__k_pke.expand_keys(dk[:384 * k], dk[384 * k : 768 * k + 32])
+        
+        return ExpandedDK(k, s_gorro, t_gorro, A_T, bytes(dk[768 * k + 32 : 768 * k + 64]), bytes(dk[768 * k + 64:]))
+    
+    @instrumented("ML-KEM.Decaps")
+    @measured("Decaps")
+    def Decaps_expanded(self, key, c):
+        """
+        Desencapsulación con una clave privada ya expandida (ver expand_dk): mismo resultado que Decaps,
+        sin decodificar la clave ni generar la matriz A en cada llamada.
+
+        Entrada:
+        - key: ExpandedDK de este nivel de seguridad
+        - c: cápsula recibida (bytes, bytearray, memoryview o lista de enteros)
+
+        Salida:
+        - K': clave simétrica recuperada (bytes)
+        """
+        assert(isinstance(key, ExpandedDK) and key.k == self.__k)
+        c = bytes_view(c)
+        assert(len(c) == (32 * (self.__du * self.__k + self.__dv)))
+        
+        m_prime = self.__k_pke.Decrypt_expanded(key.s_gorro, c)
+        
+        return self.__recheck(m_prime, c, key.h, key.z,
+                              lambda m, r, out: self.__k_pke.Encrypt_expanded_into(key.t_gorro, key.A_T, m, r, out))
+
+
+class ML_KEM_512:
+    
+    def __init__(self, **options):
+        """
+        Inicializa una instancia ML-KEM con parámetros correspondientes al nivel de seguridad 1 (512).
+
+        Entrada:
+        - options: opciones de ML_KEM (validation_cache_size, engine, shadow, matrix_expander, stream_matrix,
+          decaps_cache, specialized, metrics, randomness)
+        """
+        self.__ml_kem = ML_KEM(2, 3, 2, 10, 4, **options)
+    
+    @property
+    def engine(self):
+        """
+        Motor de cálculo que usa esta instancia.
+        """
+        return self.__ml_kem.engine
+    
+    def KeyGen(self):
+        """
+        Ejecuta la generación de claves para ML-KEM-512.
+        """
+        return self.__ml_kem.KeyGen()
+    
+    def KeyGen_into(self, out_ek, out_dk):
+        """
+        Ejecuta la generación de claves para ML-KEM-512 sobre buffers preasignados.
+        """
+        return self.__ml_kem.KeyGen_into(out_ek, out_dk)
+    
+    def KeyGen_seed(self):
+        """
+        Genera la semilla de 64 bytes (d || z) de un par de claves ML-KEM-512.
+        """
+        return self.__ml_kem.KeyGen_seed()
+    
+    def KeyGen_from_seed(self, seed):
+        """
+        Reconstruye el par de claves ML-KEM-512 asociado a una semilla.
+        """
+        return self.__ml_kem.KeyGen_from_seed(seed)
+    
+    def expand_seed(self, seed):
+        """
+        Reconstruye el par de claves ML-KEM-512 asociado a una semilla en forma ya validada.
+        """
+        return self.__ml_kem.expand_seed(seed)
+    
+    def Encaps(self, ek):
+        """
+        Ejecuta la encapsulación con clave pública para ML-KEM-512.
+        """
+        return self.__ml_kem.Encaps(ek)
+    
+    def Encaps_into(self, ek, out_c, out_K):
+        """
+        Ejecuta la encapsulación para ML-KEM-512 sobre buffers preasignados.
+        """
+        return self.__ml_kem.Encaps_into(ek, out_c, out_K)
+    
+    def Decaps(self, dk, c):
+        """
+        Ejecuta la desencapsulación con clave privada para ML-KEM-512.
+        """
+        return self.__ml_kem.Decaps(dk, c)
+    
+    def validate_ek(self, ek):
+        """
+        Valida una clave pública de ML-KEM-512 y devuelve un ValidatedEK reutilizable.
+        """
+        return self.__ml_kem.validate_ek(ek)
+    
+    def validate_dk(self, dk):
+        """
+        Valida una clave privada de ML-KEM-512 y devuelve un ValidatedDK reutilizable.
+        """
+        return self.__ml_kem.validate_dk(dk)
+    
+    def expand_dk(self, dk):
+        """
+        Valida y expande una clave privada de ML-KEM-512 para Decaps_expanded.
+        """
+        return self.__ml_kem.expand_dk(dk)
+    
+    def Decaps_expanded(self, key, c):
+        """
+        Ejecuta la desencapsulación de ML-KEM-512 con una clave privada ya expandida.
+        """
+        return self.__ml_kem.Decaps_expanded(key, c)
+
+
+class ML_KEM_768:
+    
+    def __init__(self, **options):
+        """
+        Inicializa una instancia ML-KEM con parámetros correspondientes al nivel de seguridad 3 (768).
+
+        Entrada:
+        - options: opciones de ML_KEM (validation_cache_size, engine, shadow, matrix_expander, stream_matrix,
+          decaps_cache, specialized, metrics, randomness)
+        """
+        self.__ml_kem = ML_KEM(3, 2, 2, 10, 4, **options)
+    
+    @property
+    def engine(self):
+        """
+        Motor de cálculo que usa esta instancia.
+        """
+        return self.__ml_kem.engine
+    
+    def KeyGen(self):
+        """
+        Ejecuta la generación de claves para ML-KEM-768.
+        """
+        return self.__ml_kem.KeyGen()
+    
+    def KeyGen_into(self, out_ek, out_dk):
+        """
+        Ejecuta la generación de claves para ML-KEM-768 sobre buffers preasignados.
+        """
+        return self.__ml_kem.KeyGen_into(out_ek, out_dk)
+    
+    def KeyGen_seed(self):
+        """
+        Genera la semilla de 64 bytes (d || z) de un par de claves ML-KEM-768.
+        """
+        return self.__ml_kem.KeyGen_seed()
+    
+    def KeyGen_from_seed(self, seed):
+        """
+        Reconstruye el par de claves ML-KEM-768 asociado a una semilla.
+        """
+        return self.__ml_kem.KeyGen_from_seed(seed)
+    
+    def expand_seed(self, seed):
+        """
+        Reconstruye el par de claves ML-KEM-768 asociado a una semilla en forma ya validada.
+        """
+        return self.__ml_kem.expand_seed(seed)
+    
+    def Encaps(self, ek):
+        """
+        Ejecuta la encapsulación con clave pública para ML-KEM-768.
+        """
+        return self.__ml_kem.Encaps(ek)
+    
+    def Encaps_into(self, ek, out_c, out_K):
+        """
+        Ejecuta la encapsulación para ML-KEM-768 sobre buffers preasignados.
+        """
+        return self.__ml_kem.Encaps_into(ek, out_c, out_K)
+    
+    def Decaps(self, dk, c):
+        """
+        Ejecuta la desencapsulación con clave privada para ML-KEM-768.
+        """
+        return self.__ml_kem.Decaps(dk, c)
+    
+    def validate_ek(self, ek):
+        """
+        Valida una clave pública de ML-KEM-768 y devuelve un ValidatedEK reutilizable.
+        """
+        return self.__ml_kem.validate_ek(ek)
+    
+    def validate_dk(self, dk):
+        """
+        Valida una clave privada de ML-KEM-768 y devuelve un ValidatedDK reutilizable.
+        """
+        return self.__ml_kem.validate_dk(dk)
+    
+    def expand_dk(self, dk):
+        """
+        Valida y expande una clave privada de ML-KEM-768 para Decaps_expanded.
+        """
+        return self.__ml_kem.expand_dk(dk)
+    
+    def Decaps_expanded(self, key, c):
+        """
+        Ejecuta la desencapsulación de ML-KEM-768 con una clave privada ya expandida.
+        """
+        return self.__ml_kem.Decaps_expanded(key, c)
+
+
+class ML_KEM_1024:
+    
+    def __init__(self, **options):
+        """
+        Inicializa una instancia ML-KEM con parámetros correspondientes al nivel de seguridad 5 (1024).
+
+        Entrada:
+        - options: opciones de ML_KEM (validation_cache_size, engine, shadow, matrix_expander, stream_matrix,
+          decaps_cache, specialized, metrics, randomness)
+        """
+        self.__ml_kem = ML_KEM(4, 2, 2, 11, 5, **options)
+    
+    @property
+    def engine(self):
+        """
+        Motor de cálculo que usa esta instancia.
+        """
+        return self.__ml_kem.engine
+    
+    def KeyGen(self):
+        """
+        Ejecuta la generación de claves para ML-KEM-1024.
+        """
+        return self.__ml_kem.KeyGen()
+    
+    def KeyGen_into(self, out_ek, out_dk):
+        """
+        Ejecuta la generación de claves para ML-KEM-1024 sobre buffers preasignados.
+        """
+        return self.__ml_kem.KeyGen_into(out_ek, out_dk)
+    
+    def KeyGen_seed(self):
+        """
+        Genera la semilla de 64 bytes (d || z) de un par de claves ML-KEM-1024.
+        """
+        return self.__ml_kem.KeyGen_seed()
+    
+    def KeyGen_from_seed(self, seed):
+        """
+        Reconstruye el par de claves ML-KEM-1024 asociado a una semilla.
+        """
+        return self.__ml_kem.KeyGen_from_seed(seed)
+    
+    def expand_seed(self, seed):
+        """
+        Reconstruye el par de claves ML-KEM-1024 asociado a una semilla en forma ya validada.
+        """
+        return self.__ml_kem.expand_seed(seed)
+    
+    def Encaps(self, ek):
+        """
+        Ejecuta la encapsulación con clave pública para ML-KEM-1024.
+        """
+        return self.__ml_kem.Encaps(ek)
+    
+    def Encaps_into(self, ek, out_c, out_K):
+        """
+        Ejecuta la encapsulación para ML-KEM-1024 sobre buffers preasignados.
+        """
+        return self.__ml_kem.Encaps_into(ek, out_c, out_K)
+    
+    def Decaps(self, dk, c):
+        """
+        Ejecuta la desencapsulación con clave privada para ML-KEM-1024.
+        """
+        return self.__ml_kem.Decaps(dk, c)
+    
+    def validate_ek(self, ek):
+        """
+        Valida una clave pública de ML-KEM-1024 y devuelve un ValidatedEK reutilizable.
+        """
+        return self.__ml_kem.validate_ek(ek)
+    
+    def validate_dk(self, dk):
+        """
+        Valida una clave privada de ML-KEM-1024 y devuelve un ValidatedDK reutilizable.
+        """
+        return self.__ml_kem.validate_dk(dk)
+    
+    def expand_dk(self, dk):
+        """
+        Valida y expande una clave privada de ML-KEM-1024 para Decaps_expanded.
+        """
+        return self.__ml_kem.expand_dk(dk)
+    
+    def Decaps_expanded(self, key, c):
+        """
+        Ejecuta la desencapsulación de ML-KEM-1024 con una clave privada ya expandida.
+        """
+        return self.__ml_kem.Decaps_expanded(key, c)
+
@@ -0,0 +1,46 @@
+"""
+Implementación académica en Python del estándar ML-KEM (FIPS 203).
+
+Importar el paquete no ejecuta ningún cálculo: los submódulos se cargan de forma perezosa la
+primera vez que se accede a alguno de los nombres exportados, por ejemplo:
+
+    from mlkem import ML_KEM_768
+
+La clase genérica ML_KEM y la clase K_PKE están en los submódulos del mismo nombre
+(mlkem.ML_KEM y mlkem.K_PKE).
+"""
+import importlib
+
+# Nombre exportado -> submódulo que lo define
+_EXPORTS = {
+    "ML_KEM_512": "ML_KEM",
+    "ML_KEM_768": "ML_KEM",
+    "ML_KEM_1024": "ML_KEM",
+    "KeyValidator": "validation",
+    "ValidatedEK": "validation",
+    "ValidatedDK": "validation",
+    "SeedKeyStore": "keystore",
+    "Keyring": "keyring",
+    "KeyringWriter": "keyring",
+    "KeyPool": "keypool",
+    "MatrixExpander": "expand",
+    "BatchExecutor": "concurrency",
+    "DecapsCache": "decaps_cache",
+    "DecapsPool": "decaps_pool",
+}
+
+__all__ = sorted(_EXPORTS)
+
+def __getattr__(name):
+    """
+    Carga bajo demanda el submódulo que define name (PEP 562) y guarda el resultado en el paquete.
+    """
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module("." + _EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
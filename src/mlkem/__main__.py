@@ -0,0 +1,58 @@
+import argparse
+import time
+from .ML_KEM import ML_KEM_512, ML_KEM_768, ML_KEM_1024
+from .conversions import b2h, BytesToBits
+
+PARAM_SETS = {512: ML_KEM_512, 768: ML_KEM_768, 1024: ML_KEM_1024}
+
+def to_hex(B):
+    """
+    Representación hexadecimal de una secuencia de bytes.
+    """
+    return "".join(b2h(BytesToBits(B)))
+
+
+def main(argv=None):
+    """
+    Demostración: ejecuta KeyGen, Encaps y Decaps una vez, muestra las claves y la cápsula en
+    hexadecimal y los tiempos de cada operación.
+
+    Uso: python -m mlkem [--param-set {512,768,1024}]
+    """
+    parser = argparse.ArgumentParser(prog="python -m mlkem", description="Demostración de ML-KEM")
+    parser.add_argument("--param-set", type=int, choices=sorted(PARAM_SETS), default=768)
+    args = parser.parse_args(argv)
+
+    ml = PARAM_SETS[args.param_set]()
+
+    start = time.time()
+    (ek, dk) = ml.KeyGen()
+    end = time.time()
+    t1 = end - start
+    start = time.time()
+    (K, c) = ml.Encaps(ek)
+    end = time.time()
+    t2 = end - start
+    start = time.time()
+    K_prime = ml.Decaps(dk, c)
+    end = time.time()
+    t3 = end - start
+
+    if K != K_prime:
+        print("¡Fallo en la generación de la clave secreta compartida!\n")
+        return 1
+
+    print(f"Clave de encapsulado(ek) de tamaño {len(ek)} bytes:\n{to_hex(ek)}\n")
+    print(f"Clave de desencapsulado(dk) de tamaño {len(dk)} bytes:\n{to_hex(dk)}\n")
+    print(f"Texto cifrado (c) de tamaño {len(c)} bytes:\n{to_hex(c)}\n")
+    print(f"Clave secreta compartida (K) de tamaño {len(K)} bytes:\n{to_hex(K)}\n")
+
+    print(f"Tiempo de Generación de Claves: {t1:.3f} segundos")
+    print(f"Tiempo de Encapsulado: {t2:.3f} segundos")
+    print(f"Tiempo de Desencapsulado: {t3:.3f} segundos")
+    print(f"Tiempo total: {t1 + t2 + t3:.3f} segundos")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
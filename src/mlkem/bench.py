@@ -0,0 +1,324 @@
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+from .ML_KEM import ML_KEM
+from .engine import get_engine, engines
+from . import kronecker, keccak_bitsliced
+from .randomness import OSRandom, ShakeDRBG, DeterministicRandom
+from .decaps_cache import DecapsCache
+
+q = 3329
+
+# Parámetros (k, eta1, eta2, du, dv) de cada nivel de seguridad
+PARAM_SETS = {512: (2, 3, 2, 10, 4), 768: (3, 2, 2, 10, 4), 1024: (4, 2, 2, 11, 5)}
+
+class Case:
+    """
+    Caso de prueba de rendimiento.
+
+    setup se ejecuta una sola vez, fuera de la medición, y devuelve la función sin argumentos que se mide.
+    """
+
+    def __init__(self, name, setup):
+        self.name = name
+        self.setup = setup
+
+
+def operation_cases(param_sets, engine=None):
+    """
+    Casos KeyGen, Encaps y Decaps para cada nivel de seguridad, con el motor de cálculo indicado.
+
+    La caché de validación se desactiva para que cada Encaps/Decaps pague las comprobaciones
+    completas de FIPS 203, como ocurre con una clave que se ve por primera vez. La aleatoriedad sale
+    de una fuente determinista, para medir las mismas claves y cápsulas en cada ejecución (el coste
+    del muestreo por rechazo de A depende de rho).
+    """
+    cases = []
+    for n in param_sets:
+        def keygen(n=n):
+            ml = ML_KEM(*PARAM_SETS[n], validation_cache_size=0, engine=engine,
+                        randomness=DeterministicRandom(b"mlkem.bench"))
+            return ml.KeyGen
+
+        def encaps(n=n):
+            ml = ML_KEM(*PARAM_SETS[n], validation_cache_size=0, engine=engine,
+                        randomness=DeterministicRandom(b"mlkem.bench"))
+            (ek, dk) = ml.KeyGen()
+            return lambda: ml.Encaps(ek)
+
+        def decaps(n=n):
+            ml = ML_KEM(*PARAM_SETS[n], validation_cache_size=0, engine=engine,
+                        randomness=DeterministicRandom(b"mlkem.bench"))
+            (ek, dk) = ml.KeyGen()
+            (K, c) = ml.Encaps(ek)
+            return lambda: ml.Decaps(dk, c)
+
+        # Decaps con un ValidatedDK, sin caché de resultados y con ella, fallando siempre o acertando
+        # siempre: el fallo debe costar solo H(c) más que sin caché. Para fallar se alternan dos
+        # cápsulas con una sola entrada por clave, de modo que cada una desaloja a la otra
+        def decaps_validated(n=n, cache_hits=None):
+            cache = None if cache_hits is None else DecapsCache(max_entries_per_key=1)
+            ml = ML_KEM(*PARAM_SETS[n], validation_cache_size=0, engine=engine,
+                        randomness=DeterministicRandom(b"mlkem.bench"), decaps_cache=cache)
+            (ek, dk) = ml.KeyGen()
+            capsules = [ml.Encaps(ek)[1] for _ in range(1 if cache_hits is not False else 2)]
+            dk = ml.validate_dk(dk)
+            turn = [0]
+
+            def run():
+                turn[0] ^= len(capsules) - 1
+                return ml.Decaps(dk, capsules[turn[0]])
+            return run
+
+        # Misma Encaps generando A entrada a entrada (compárese el pico de memoria con el de Encaps)
+        def encaps_stream(n=n):
+            ml = ML_KEM(*PARAM_SETS[n], validation_cache_size=0, engine=engine,
+                        randomness=DeterministicRandom(b"mlkem.bench"), stream_matrix=True)
+            (ek, dk) = ml.KeyGen()
+            return lambda: ml.Encaps(ek)
+
+        cases += [Case(f"ML-KEM-{n}/KeyGen", keygen),
+                  Case(f"ML-KEM-{n}/Encaps", encaps),
+                  Case(f"ML-KEM-{n}/Encaps(stream_matrix)", encaps_stream),
+                  Case(f"ML-KEM-{n}/Decaps", decaps),
+                  Case(f"ML-KEM-{n}/Decaps(ValidatedDK)", decaps_validated),
+                  Case(f"ML-KEM-{n}/Decaps(cache miss)", lambda n=n: decaps_validated(n, False)),
+                  Case(f"ML-KEM-{n}/Decaps(cache hit)", lambda n=n: decaps_validated(n, True))]
+    return cases
+
+
+def stage_cases(engine=None):
+    """
+    Casos para las primitivas del motor indicado, con entradas de los tamaños que se usan en ML-KEM-768.
+    """
+    e = get_engine(engine)
+    rng = random.Random(0)
+    seed = bytes(rng.getrandbits(8) for _ in range(32))
+    poly = [rng.randrange(q) for _ in range(256)]
+    poly2 = [rng.randrange(q) for _ in range(256)]
+    ek = bytes(rng.getrandbits(8) for _ in range(1184))
+    c = bytes(rng.getrandbits(8) for _ in range(1088))
+    encoded = e.ByteEncode(12, poly)
+    # ŝ de una clave real (ruido pequeño antes de la NTT) y u arbitrario, como en K-PKE.Decrypt
+    s_gorro = [e.NTT([rng.choice((0, 1, 2, q - 1, q - 2)) for _ in range(256)]) for _ in range(3)]
+    u = [[rng.randrange(q) for _ in range(256)] for _ in range(3)]
+
+    return [
+        Case("stage/SampleNTT", lambda: lambda: e.SampleNTT(seed + bytes([0, 1]))),
+        Case("stage/SamplePolyCBD(eta=2)", lambda: (lambda B: lambda: e.SamplePolyCBD(2, B))(e.PRF(2, seed, 0))),
+        Case("stage/SamplePolyCBD(eta=3)", lambda: (lambda B: lambda: e.SamplePolyCBD(3, B))(e.PRF(3, seed, 0))),
+        Case("stage/NTT", lambda: lambda: e.NTT(poly)),
+        Case("stage/INTT", lambda: lambda: e.INTT(poly)),
+        Case("stage/MultiplyNTTs", lambda: lambda: e.MultiplyNTTs(poly, poly2)),
+        Case("stage/ByteEncode(d=12)", lambda: lambda: e.ByteEncode(12, poly)),
+        Case("stage/ByteDecode(d=12)", lambda: lambda: e.ByteDecode(12, encoded)),
+        Case("stage/Compress(d=10)", lambda: lambda: e.Compress_poly(10, poly)),
+        Case("stage/NTT_sum(3)", lambda: lambda: e.NTT_sum([poly, poly2, poly])),
+        # Producto en R_q en el dominio normal: vía NTT frente a sustitución de Kronecker
+        Case("stage/PolyMultiply(NTT)", lambda: lambda: e.INTT(e.MultiplyNTTs(e.NTT(poly), e.NTT(poly2)))),
+        Case("stage/PolyMultiply(Kronecker)", lambda: lambda: kronecker.poly_multiply(poly, poly2)),
+        Case("stage/NTT_vector_dot(k=3)", lambda: lambda: e.NTT_vector_dot(s_gorro, u)),
+        Case("stage/NTT_vector_dot(k=3,Kronecker)",
+             lambda: lambda: kronecker.inner_product([e.INTT(x) for x in s_gorro], u)),
+        Case("hash/H(ek)", lambda: lambda: e.H(ek)),
+        Case("hash/G(m||h)", lambda: lambda: e.G(seed + seed)),
+        Case("hash/J(z||c)", lambda: lambda: e.J(seed + c)),
+        Case("hash/PRF(eta=2)", lambda: lambda: e.PRF(2, seed, 0)),
+        # PRF de un lote de 64 Encaps de ML-KEM-768 (2k + 1 = 7 llamadas cada uno): una a una frente a
+        # Keccak troceado por bits
+        Case("hash/PRF×448", lambda: lambda: [e.PRF(2, seed, b % 256) for b in range(448)]),
+        Case("hash/PRF×448(bitsliced)",
+             lambda: lambda: keccak_bitsliced.PRF_many(2, [seed] * 448, [b % 256 for b in range(448)])),
+        # Aleatoriedad de un Encaps: una llamada al sistema frente a buffer por hilo o DRBG
+        Case("random/os.urandom(32)", lambda: lambda: os.urandom(32)),
+        Case("random/OSRandom(32)", lambda: (lambda source: lambda: source(32))(OSRandom())),
+        Case("random/ShakeDRBG(32)", lambda: (lambda source: lambda: source(32))(ShakeDRBG())),
+    ]
+
+
+def all_cases(param_sets, engine=None):
+    """
+    Lista completa de casos: operaciones para los niveles pedidos y etapas internas.
+    """
+    return operation_cases(param_sets, engine) + stage_cases(engine)
+
+
+def percentile(samples, p):
+    """
+    Percentil p (0-100) de una lista de muestras por el método del rango más cercano.
+    """
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(p / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def run_case(case, repeats, warmup, min_sample_time, memory):
+    """
+    Ejecuta un caso y resume sus tiempos.
+
+    Cada muestra ejecuta la función number veces, con number elegido durante el calentamiento para
+    que una muestra dure al menos min_sample_time (las etapas más rápidas duran microsegundos).
+
+    Salida:
+    - diccionario con mediana, p99, media y desviación (segundos por llamada), operaciones por
+      segundo, número de muestras y, si memory es True, el pico de memoria de una llamada
+    """
+    fn = case.setup()
+
+    # Calentamiento y calibración del número de llamadas por muestra
+    number = 1
+    for _ in range(max(1, warmup)):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        # Se duplica number hasta que la duración estimada de una muestra alcanza el mínimo
+        while elapsed < min_sample_time:
+            number *= 2
+            elapsed *= 2
+
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number)
+
+    median = statistics.median(samples)
+    result = {
+        "median_s": median,
+        "p99_s": percentile(samples, 99),
+        "mean_s": statistics.fmean(samples),
+        "stdev_s": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "ops_per_s": 1 / median if median > 0 else float("inf"),
+        "samples": len(samples),
+        "number": number,
+    }
+
+    if memory:
+        # tracemalloc ralentiza la ejecución, así que el pico de memoria se mide en una pasada aparte
+        tracemalloc.start()
+        tracemalloc.reset_peak()
+        fn()
+        result["peak_mem_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return result
+
+
+def compare(results, baseline, threshold, overrides):
+    """
+    Compara unos resultados con una línea base guardada.
+
+    Entrada:
+    - results, baseline: diccionarios nombre -> resultado (como en el campo "results" del JSON)
+    - threshold: aumento relativo máximo permitido de la mediana (0.10 = 10 %)
+    - overrides: diccionario nombre -> umbral específico para ese caso
+
+    Salida:
+    - lista de tuplas (nombre, mediana base, mediana actual, cociente, umbral, hay_regresion)
+    """
+    rows = []
+    for (name, result) in results.items():
+        if name not in baseline:
+            continue
+        base = baseline[name]["median_s"]
+        ratio = result["median_s"] / base if base > 0 else float("inf")
+        limit = overrides.get(name, threshold)
+        rows.append((name, base, result["median_s"], ratio, limit, ratio > 1 + limit))
+    return rows
+
+
+def format_time(t):
+    """
+    Formatea un tiempo en segundos con la unidad más legible.
+    """
+    for (unit, scale) in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if t >= scale:
+            return f"{t / scale:8.3f} {unit}"
+    return f"{t / 1e-9:8.1f} ns"
+
+
+def main(argv=None):
+    """
+    Uso: python -m mlkem.bench [--param-sets 512,768,1024] [--only REGEX] [--repeats N] [--warmup N]
+                               [--json SALIDA] [--baseline BASE.json] [--threshold 0.10]
+                               [--threshold-for NOMBRE=UMBRAL ...] [--no-memory] [--engine NOMBRE]
+
+    Devuelve 1 si algún caso supera su umbral de regresión respecto a la línea base.
+    """
+    parser = argparse.ArgumentParser(prog="python -m mlkem.bench", description="Benchmarks de ML-KEM")
+    parser.add_argument("--param-sets", default="512,768,1024")
+    parser.add_argument("--only", default=None, help="expresión regular sobre los nombres de los casos")
+    parser.add_argument("--repeats", type=int, default=7)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--min-sample-time", type=float, default=0.005,
+                        help="duración mínima de una muestra en segundos")
+    parser.add_argument("--no-memory", action="store_true", help="no medir el pico de memoria")
+    parser.add_argument("--json", default=None, help="fichero donde guardar los resultados")
+    parser.add_argument("--baseline", default=None, help="resultados JSON de referencia")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    parser.add_argument("--threshold-for", action="append", default=[], metavar="NOMBRE=UMBRAL")
+    parser.add_argument("--engine", default=None, choices=engines(), help="motor de cálculo (por defecto, MLKEM_ENGINE)")
+    args = parser.parse_args(argv)
+
+    param_sets = [int(x) for x in args.param_sets.split(",") if x]
+    assert(all(n in PARAM_SETS for n in param_sets))
+    cases = all_cases(param_sets, args.engine)
+    if args.only:
+        cases = [c for c in cases if re.search(args.only, c.name)]
+
+    results = {}
+    for case in cases:
+        result = run_case(case, args.repeats, args.warmup, args.min_sample_time, not args.no_memory)
+        results[case.name] = result
+        mem = f"  pico {result['peak_mem_bytes'] / 1024:9.1f} KiB" if "peak_mem_bytes" in result else ""
+        print(f"{case.name:<32} mediana {format_time(result['median_s'])}  p99 {format_time(result['p99_s'])}"
+              f"  {result['ops_per_s']:12.2f} op/s{mem}", flush=True)
+
+    report = {
+        "meta": {
+            "python": sys.version,
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "repeats": args.repeats,
+            "warmup": args.warmup,
+            "engine": get_engine(args.engine).name,
+        },
+        "results": results,
+    }
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    if args.baseline is None:
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+    overrides = {}
+    for item in args.threshold_for:
+        (name, limit) = item.rsplit("=", 1)
+        overrides[name] = float(limit)
+
+    regressions = 0
+    print()
+    for (name, base, current, ratio, limit, regressed) in compare(results, baseline, args.threshold, overrides):
+        regressions += regressed
+        status = "REGRESIÓN" if regressed else "ok"
+        print(f"{name:<32} base {format_time(base)}  actual {format_time(current)}  x{ratio:5.2f}"
+              f"  (umbral +{limit:.0%})  {status}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,193 @@
+"""
+Generación de código en línea recta para los núcleos más repetidos.
+
+Las versiones genéricas de NTT/INTT recorren bucles anidados, reconstruyen objetos range y leen
+zetas[i] en cada vuelta, y K_PKE consulta k, du y dv una y otra vez. Aquí se genera, la primera vez
+que se pide y una sola vez por proceso, código Python sin bucles en el que las constantes ya están
+sustituidas:
+
+- NTT e INTT desenrolladas: los 256 coeficientes viven en variables locales y cada mariposa es una
+  sentencia con su zeta como literal. Solo se reducen módulo q los productos por zeta; las sumas y
+  restas intermedias quedan sin reducir (con enteros de Python no hay desbordamiento y su tamaño
+  crece como mucho 2^7·q) y se reducen una vez al final.
+- Encrypt y Decrypt de K-PKE especializados para cada juego de parámetros (k, eta1, eta2, du, dv):
+  bucles sobre k desenrollados y desplazamientos de cada polinomio en la clave y la cápsula como
+  literales.
+
+Cada núcleo generado se compara con su versión genérica antes de devolverse; si alguna entrada de
+prueba no coincide se lanza RuntimeError y no se usa.
+"""
+import random
+from functools import lru_cache
+from .conversions import bytes_view
+from .ntt import zetas
+from .profiling import stage, instrumented
+
+q = 3329
+
+def ntt_source(inverse=False):
+    """
+    Código fuente de NTT (o de INTT si inverse es True) desenrollada.
+
+    Salida:
+    - texto con la definición de una función NTT(f) o INTT(f_gorro)
+    """
+    lines = []
+    if not inverse:
+        lines += ["def NTT(f):", "    assert(len(f) == 256)"]
+        lines.append(f"    ({', '.join(f'f{j}' for j in range(256))},) = f")
+        (i, l) = (1, 128)
+        while l >= 2:
+            for start in range(0, 256, 2 * l):
+                zeta = zetas[i]
+                i += 1
+                for j in range(start, start + l):
+                    # Mariposa de Cooley–Tukey con el producto reducido y la suma y la resta sin reducir
+                    lines.append(f"    t = {zeta} * f{j + l} % {q}; f{j + l} = f{j} - t; f{j} = f{j} + t")
+            l //= 2
+        lines.append(f"    return [{', '.join(f'f{j} % {q}' for j in range(256))}]")
+    else:
+        lines += ["def INTT(f_gorro):", "    assert(len(f_gorro) == 256)"]
+        lines.append(f"    ({', '.join(f'f{j}' for j in range(256))},) = f_gorro")
+        (i, l) = (127, 2)
+        while l <= 128:
+            for start in range(0, 256, 2 * l):
+                zeta = zetas[i]
+                i -= 1
+                for j in range(start, start + l):
+                    # Mariposa de Gentleman–Sande: la suma queda sin reducir
+                    lines.append(f"    t = f{j}; f{j} = t + f{j + l}; f{j + l} = {zeta} * (f{j + l} - t) % {q}")
+            l *= 2
+        # Normalización final por 128^{-1} mod q = 3303
+        lines.append(f"    return [{', '.join(f'f{j} * 3303 % {q}' for j in range(256))}]")
+    return "\n".join(lines) + "\n"
+
+
+def _compile(source, name, namespace=None):
+    """
+    Compila el código generado y devuelve la función name que define.
+    """
+    namespace = {} if namespace is None else dict(namespace)
+    exec(compile(source, f"<mlkem.codegen:{name}>", "exec"), namespace)
+    return namespace[name]
+
+
+def _check(name, generated, generic, inputs):
+    """
+    Compara un núcleo generado con su versión genérica sobre una lista de entradas (tuplas de argumentos).
+    """
+    for args in inputs:
+        if generated(*args) != generic(*args):
+            raise RuntimeError(f"el núcleo generado {name} no coincide con la versión genérica")
+
+
+def _test_polys():
+    """
+    Polinomios de prueba: casos extremos y aleatorios con semilla fija.
+    """
+    rng = random.Random(203)
+    return [[0] * 256, [q - 1] * 256, list(range(256))] + [[rng.randrange(q) for _ in range(256)] for _ in range(8)]
+
+
+@lru_cache(maxsize=None)
+def ntt_kernels():
+    """
+    NTT e INTT desenrolladas, comprobadas contra las de ntt.py.
+
+    Salida:
+    - (NTT, INTT), con la misma interfaz e instrumentación que las genéricas
+    """
+    from . import ntt
+    NTT = _compile(ntt_source(False), "NTT")
+    INTT = _compile(ntt_source(True), "INTT")
+    polys = [(f,) for f in _test_polys()]
+    _check("NTT", NTT, ntt.NTT, polys)
+    _check("INTT", INTT, ntt.INTT, polys)
+    return instrumented("NTT")(NTT), instrumented("INTT")(INTT)
+
+
+def k_pke_source(k, eta1, eta2, du, dv):
+    """
+    Código fuente de Encrypt_into y Decrypt de K-PKE especializados para un juego de parámetros.
+
+    Las funciones generadas reciben el motor de cálculo como primer argumento; Encrypt_into recibe
+    además la función que calcula Aᵀ·ŷ a partir de rho (la de K_PKE, que construye la matriz
+    completa o la genera entrada a entrada).
+    """
+    c1 = 32 * du * k
+    ys = [f"y{i}" for i in range(k)]
+    e1s = [f"e1_{i}" for i in range(k)]
+    ts = [f"t{i}" for i in range(k)]
+    us = [f"u{i}" for i in range(k)]
+
+    enc = ["def Encrypt_into(eng, matrix_vector_multiply, ek_PKE, m, r, out):",
+           "    out = bytes_view(out)",
+           f"    assert(not out.readonly and len(out) == {32 * (du * k + dv)})",
+           "    ek_PKE = bytes_view(ek_PKE)",
+           "    ByteDecode = eng.ByteDecode"]
+    enc += [f"    t{i} = ByteDecode(12, ek_PKE[{384 * i}:{384 * (i + 1)}])" for i in range(k)]
+    enc += [f"    rho = bytes(ek_PKE[{384 * k}:])",
+            "    with stage(\"noise\"):",
+            "        (PRF, CBD) = (eng.PRF, eng.SamplePolyCBD)"]
+    enc += [f"        y{i} = CBD({eta1}, PRF({eta1}, r, {i}))" for i in range(k)]
+    enc += [f"        e1_{i} = CBD({eta2}, PRF({eta2}, r, {k + i}))" for i in range(k)]
+    enc += [f"        e2 = CBD({eta2}, PRF({eta2}, r, {2 * k}))",
+            "    NTT = eng.NTT",
+            f"    y_gorro = [{', '.join(f'NTT({y})' for y in ys)}]",
+            f"    ({', '.join(f'a{i}' for i in range(k))},) = matrix_vector_multiply(rho, y_gorro, True)",
+            "    (INTT, SumNTTs) = (eng.INTT, eng.SumNTTs)"]
+    enc += [f"    u{i} = SumNTTs(INTT(a{i}), e1_{i})" for i in range(k)]
+    enc += ["    mu = eng.Decompress_poly(1, ByteDecode(1, m))",
+            f"    v = eng.NTT_sum([INTT(eng.NTT_vector_vector_multiply([{', '.join(ts)}], y_gorro)), e2, mu])",
+            "    with stage(\"compress\"):",
+            "        (ByteEncode_into, Compress_poly) = (eng.ByteEncode_into, eng.Compress_poly)"]
+    enc += [f"        ByteEncode_into({du}, Compress_poly({du}, u{i}), out, {32 * du * i})" for i in range(k)]
+    enc += [f"        ByteEncode_into({dv}, Compress_poly({dv}, v), out, {c1})"]
+
+    dec = ["def Decrypt(eng, dk_PKE, c):",
+           "    dk_PKE = bytes_view(dk_PKE)",
+           "    c = bytes_view(c)",
+           "    ByteDecode = eng.ByteDecode",
+           "    with stage(\"decompress\"):",
+           "        Decompress_poly = eng.Decompress_poly"]
+    dec += [f"        u{i} = Decompress_poly({du}, ByteDecode({du}, c[{32 * du * i}:{32 * du * (i + 1)}]))" for i in range(k)]
+    dec += [f"        v_prime = Decompress_poly({dv}, ByteDecode({dv}, c[{c1}:]))",
+            f"    s_gorro = [{', '.join(f'ByteDecode(12, dk_PKE[{384 * i}:{384 * (i + 1)}])' for i in range(k))}]",
+            f"    w = eng.SubtractNTTs(v_prime, eng.NTT_vector_dot(s_gorro, [{', '.join(us)}]))",
+            "    with stage(\"compress\"):",
+            "        return eng.ByteEncode(1, eng.Compress_poly(1, w))"]
+
+    return "\n".join(enc) + "\n\n\n" + "\n".join(dec) + "\n"
+
+
+@lru_cache(maxsize=None)
+def k_pke_kernels(k, eta1, eta2, du, dv):
+    """
+    Encrypt_into y Decrypt de K-PKE especializados, comprobados contra K_PKE genérico.
+
+    Salida:
+    - (Encrypt_into, Decrypt) con las firmas de k_pke_source
+    """
+    from .K_PKE import K_PKE
+    from .engine import get_engine
+    source = k_pke_source(k, eta1, eta2, du, dv)
+    namespace = {"bytes_view": bytes_view, "stage": stage}
+    Encrypt_into = _compile(source, "Encrypt_into", namespace)
+    Decrypt = _compile(source, "Decrypt", namespace)
+
+    # Comprobación con el motor optimizado (el código generado es el mismo para cualquier motor)
+    eng = get_engine("optimized")
+    generic = K_PKE(k, eta1, eta2, du, dv, eng)
+    (ek, dk) = generic.KeyGen(bytes(range(32)))
+    (m, r) = (bytes(range(32, 64)), bytes(range(64, 96)))
+
+    def encrypt(ek, m, r):
+        out = bytearray(32 * (du * k + dv))
+        Encrypt_into(eng, eng.NTT_sampled_matrix_vector_multiply, ek, m, r, out)
+        return bytes(out)
+
+    _check("Encrypt", encrypt, generic.Encrypt, [(ek, m, r), (ek, r, m)])
+    c = generic.Encrypt(ek, m, r)
+    tampered = bytes([c[0] ^ 1]) + c[1:]
+    _check("Decrypt", lambda dk, c: Decrypt(eng, dk, c), generic.Decrypt, [(dk, c), (dk, tampered)])
+    return Encrypt_into, Decrypt
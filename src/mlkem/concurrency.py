@@ -0,0 +1,234 @@
+"""
+Ejecución de ML-KEM en varios hilos con una única instancia compartida.
+
+Una instancia de ML_KEM (y el K_PKE, los hashes y las cachés que tiene detrás) puede usarse a la vez
+desde varios hilos sin cerrojos externos. BatchExecutor reparte lotes de KeyGen, Encaps y Decaps
+entre los hilos de un ThreadPoolExecutor. Con el GIL, los hilos no ganan rendimiento en un código que
+es casi todo Python puro; en CPython sin GIL (3.13t y posteriores) el mismo código escala con los
+núcleos sin el coste de serializar claves y cápsulas entre procesos.
+
+Uso: python -m mlkem.concurrency stress  [--param-set 768] [--threads 8] [--iterations 20]
+     python -m mlkem.concurrency scaling [--param-set 768] [--threads 1,2,4,8] [--operations 64]
+"""
+import argparse
+import os
+import sys
+import sysconfig
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from .ML_KEM import ML_KEM_512, ML_KEM_768, ML_KEM_1024
+from .engine import get_engine, engines
+
+PARAM_SETS = {512: ML_KEM_512, 768: ML_KEM_768, 1024: ML_KEM_1024}
+
+def free_threaded():
+    """
+    Indica si el intérprete ejecuta los hilos sin GIL.
+
+    Salida:
+    - True en una compilación sin GIL (Py_GIL_DISABLED) que no lo ha vuelto a activar
+    """
+    if not sysconfig.get_config_var("Py_GIL_DISABLED"):
+        return False
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is None or not is_gil_enabled()
+
+
+class BatchExecutor:
+    """
+    Lotes de operaciones de ML-KEM repartidos entre hilos que comparten una instancia.
+
+    Los resultados se devuelven en el mismo orden que las entradas.
+    """
+
+    def __init__(self, ml_kem, max_workers=None):
+        """
+        Entrada:
+        - ml_kem: instancia de ML_KEM (o ML_KEM_512/768/1024) compartida por todos los hilos
+        - max_workers: número de hilos (por defecto, el número de núcleos)
+        """
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        assert(max_workers >= 1)
+        self.__ml_kem = ml_kem
+        self.__executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mlkem")
+
+    def map(self, fn, *iterables):
+        """
+        Aplica fn a los elementos de iterables en los hilos y devuelve la lista de resultados.
+        """
+        return list(self.__executor.map(fn, *iterables))
+
+    def KeyGen(self, n):
+        """
+        Genera n pares de claves.
+
+        Salida:
+        - lista de n tuplas (ek, dk)
+        """
+        ml_kem = self.__ml_kem
+        return self.map(lambda _: ml_kem.KeyGen(), range(n))
+
+    def KeyGen_from_seed(self, seeds):
+        """
+        Reconstruye los pares de claves de una lista de semillas de 64 bytes.
+        """
+        return self.map(self.__ml_kem.KeyGen_from_seed, seeds)
+
+    def Encaps(self, eks):
+        """
+        Encapsula un secreto para cada clave pública de eks.
+
+        Salida:
+        - lista de tuplas (K, c)
+        """
+        return self.map(self.__ml_kem.Encaps, eks)
+
+    def Decaps(self, dk, cs):
+        """
+        Desencapsula con la misma clave privada cada cápsula de cs.
+
+        Salida:
+        - lista de secretos compartidos K'
+        """
+        ml_kem = self.__ml_kem
+        return self.map(lambda c: ml_kem.Decaps(dk, c), cs)
+
+    def Decaps_many(self, pairs):
+        """
+        Desencapsula una lista de pares (dk, c), cada uno con su propia clave.
+        """
+        return self.map(self.__ml_kem.Decaps, *zip(*pairs)) if pairs else []
+
+    def close(self):
+        """
+        Espera a las operaciones en curso y detiene los hilos.
+        """
+        self.__executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def stress(ml_kem, threads=8, iterations=20, keys=4):
+    """
+    Prueba de concurrencia: muchos hilos usan la misma instancia con operaciones mezcladas.
+
+    Cada hilo reconstruye pares de claves a partir de semillas fijas, encapsula con ellos y
+    desencapsula cápsulas calculadas de antemano (válidas y alteradas, para pasar también por el
+    rechazo implícito), y compara cada resultado con el obtenido en serie antes de arrancar los
+    hilos. Todos los hilos empiezan a la vez tras una barrera para forzar el solapamiento, y las
+    cachés de validación de la instancia se comparten entre ellos.
+
+    Entrada:
+    - ml_kem: instancia a probar
+    - threads: número de hilos
+    - iterations: rondas de operaciones de cada hilo
+    - keys: número de pares de claves distintos que se reparten los hilos
+
+    Salida:
+    - diccionario con el número de operaciones y de discrepancias, y la duración en segundos
+    """
+    seeds = [bytes([i]) * 64 for i in range(keys)]
+    expected = []
+    for seed in seeds:
+        (ek, dk) = ml_kem.KeyGen_from_seed(seed)
+        (K, c) = ml_kem.Encaps(ek)
+        tampered = bytes([c[0] ^ 1]) + c[1:]
+        expected.append((seed, ek, dk, K, c, tampered, ml_kem.Decaps(dk, tampered)))
+
+    barrier = threading.Barrier(threads)
+    lock = threading.Lock()
+    totals = {"operations": 0, "mismatches": 0}
+
+    def worker(index):
+        operations = mismatches = 0
+        barrier.wait()
+        for n in range(iterations):
+            (seed, ek, dk, K, c, tampered, K_rejected) = expected[(index + n) % keys]
+            mismatches += ml_kem.KeyGen_from_seed(seed) != (ek, dk)
+            mismatches += ml_kem.Decaps(dk, c) != K
+            mismatches += ml_kem.Decaps(dk, tampered) != K_rejected
+            (K_new, c_new) = ml_kem.Encaps(ek)
+            mismatches += ml_kem.Decaps(dk, c_new) != K_new
+            operations += 5
+        with lock:
+            totals["operations"] += operations
+            totals["mismatches"] += mismatches
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        for future in [executor.submit(worker, i) for i in range(threads)]:
+            future.result()
+    totals["seconds"] = time.perf_counter() - start
+    return totals
+
+
+def scaling(ml_kem, thread_counts, operations=64):
+    """
+    Rendimiento de Encaps + Decaps con una instancia compartida según el número de hilos.
+
+    Entrada:
+    - ml_kem: instancia a medir
+    - thread_counts: lista de números de hilos
+    - operations: número de parejas Encaps + Decaps de cada medición
+
+    Salida:
+    - lista de tuplas (hilos, operaciones por segundo, aceleración respecto a la primera medición)
+    """
+    (ek, dk) = ml_kem.KeyGen()
+    ml_kem.Decaps(dk, ml_kem.Encaps(ek)[1])     # Calienta las cachés de validación y las tablas
+
+    def roundtrip(_):
+        (K, c) = ml_kem.Encaps(ek)
+        return ml_kem.Decaps(dk, c) == K
+
+    rows = []
+    for threads in thread_counts:
+        with BatchExecutor(ml_kem, threads) as batch:
+            start = time.perf_counter()
+            assert(all(batch.map(roundtrip, range(operations))))
+            elapsed = time.perf_counter() - start
+        rate = operations / elapsed
+        rows.append((threads, rate, rate / rows[0][1] if rows else 1.0))
+    return rows
+
+
+def main(argv=None):
+    """
+    Prueba de concurrencia (stress) y medida de escalado con hilos (scaling). Devuelve 1 si la
+    prueba de concurrencia encuentra alguna discrepancia.
+    """
+    parser = argparse.ArgumentParser(prog="python -m mlkem.concurrency", description="ML-KEM con varios hilos")
+    parser.add_argument("mode", choices=("stress", "scaling"))
+    parser.add_argument("--param-set", type=int, choices=sorted(PARAM_SETS), default=768)
+    parser.add_argument("--engine", default=None, choices=engines(), help="motor de cálculo (por defecto, MLKEM_ENGINE)")
+    parser.add_argument("--threads", default=None, help="hilos (stress) o lista de hilos separada por comas (scaling)")
+    parser.add_argument("--iterations", type=int, default=20, help="rondas por hilo (stress)")
+    parser.add_argument("--operations", type=int, default=64, help="Encaps + Decaps por medición (scaling)")
+    args = parser.parse_args(argv)
+
+    ml_kem = PARAM_SETS[args.param_set](engine=args.engine)
+    print(f"Python {sys.version.split()[0]}, motor {get_engine(args.engine).name}, "
+          f"{'sin GIL' if free_threaded() else 'con GIL'}, {os.cpu_count()} núcleos")
+
+    if args.mode == "stress":
+        threads = int(args.threads or 8)
+        result = stress(ml_kem, threads, args.iterations)
+        print(f"{threads} hilos: {result['operations']} operaciones en {result['seconds']:.2f} s, "
+              f"{result['mismatches']} discrepancias")
+        return 1 if result["mismatches"] else 0
+
+    thread_counts = [int(x) for x in (args.threads or "1,2,4,8").split(",") if x]
+    print(f"{'hilos':>6} {'op/s':>10} {'aceleración':>12}")
+    for (threads, rate, speedup) in scaling(ml_kem, thread_counts, args.operations):
+        print(f"{threads:>6} {rate:>10.2f} {speedup:>11.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,207 @@
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from .validation import ValidatedDK
+
+class DecapsCache:
+    """
+    Caché acotada de resultados de Decaps para cápsulas retransmitidas.
+
+    Decaps es determinista: para la misma clave privada y la misma cápsula devuelve siempre el mismo
+    K', tanto si la cápsula es válida como si se rechaza de forma implícita (K' = J(z || c)). Cuando un
+    cliente repite el mismo mensaje de negociación, la caché devuelve el K' ya calculado sin repetir
+    el descifrado ni el recifrado de la transformación FO, y el resultado no cambia entre reintentos.
+
+    Las entradas se indexan por (huella de dk, H(c)), donde la huella es H(dk) calculada con el motor
+    de ML_KEM, de modo que un acierto exige exactamente la misma clave privada y la misma cápsula.
+    Las huellas de las últimas claves usadas se recuerdan aparte (fingerprint), para que una consulta
+    solo pague H(c) y no también H(dk). Se recuerdan por identidad del ValidatedDK y con una referencia
+    débil: la caché no guarda copias de claves privadas ni mantiene vivas las del llamante.
+
+    ML_KEM solo consulta la caché cuando Decaps recibe un ValidatedDK (ml_kem.validate_dk(dk)). Con la
+    clave en bytes habría que calcular H(dk) en cada llamada, y un fallo costaría entre un 30 y un 40 %
+    más que no tener caché; así, un fallo solo añade H(c) a la desencapsulación y un acierto evita el
+    descifrado y el recifrado. Las claves en bytes se desencapsulan siempre sin caché.
+
+    Cada entrada de resultado ocupa unos 300 bytes (tres valores de 32 bytes más la estructura) y
+    cada huella recordada unos 250; max_entries acota el total de ambas y, con él, la memoria. Las
+    huellas nunca ocupan más de la mitad de max_entries, de modo que siempre queda sitio para
+    resultados. max_entries_per_key impide que una sola clave desaloje las entradas de las demás.
+    """
+
+    def __init__(self, max_entries=4096, max_entries_per_key=256, ttl=30.0, clock=time.monotonic,
+                 max_keys=64):
+        """
+        Entrada:
+        - max_entries: número máximo de entradas en total
+        - max_entries_per_key: número máximo de entradas de una misma clave privada
+        - ttl: segundos durante los que una entrada es válida desde que se calcula
+        - clock: función que devuelve el instante actual en segundos (monótona)
+        - max_keys: número de claves privadas (ValidatedDK) cuya huella se recuerda; se limita a
+          max_entries // 2 para que las huellas no desalojen todos los resultados
+        """
+        assert(max_entries >= 1 and max_entries_per_key >= 1)
+        assert(ttl > 0 and max_keys >= 0)
+        self.__max_entries = max_entries
+        self.__max_entries_per_key = max_entries_per_key
+        self.__ttl = ttl
+        self.__clock = clock
+        self.__max_keys = min(max_keys, max_entries // 2)
+        self.__fingerprints = OrderedDict()     # id(ValidatedDK) -> (referencia débil, H(dk)), LRU
+        # (huella, H(c)) -> (caducidad, K'), en orden de inserción, que con un ttl fijo es el de caducidad
+        self.__entries = OrderedDict()
+        self.__per_key = {}             # huella -> OrderedDict de H(c) en orden de inserción
+        self.__lock = threading.Lock()
+        self.__hits = 0
+        self.__misses = 0
+        self.__expired = 0
+        self.__evicted = 0
+
+    def fingerprint(self, dk, hash_function):
+        """
+        Huella de una clave privada.
+
+        La clave es un ValidatedDK (inmutable), y la huella se recuerda por identidad para las max_keys
+        claves usadas más recientemente.
+
+        Entrada:
+        - dk: ValidatedDK
+        - hash_function: H del motor de ML_KEM
+
+        Salida:
+        - H(dk)
+        """
+        assert(isinstance(dk, ValidatedDK))
+        if self.__max_keys <= 0:
+            return hash_function(dk.dk)
+        key = id(dk)
+        with self.__lock:
+            entry = self.__fingerprints.get(key)
+            # Un id puede reutilizarse cuando muere el objeto: la referencia débil confirma que es el mismo
+            if entry is not None and entry[0]() is dk:
+                self.__fingerprints.move_to_end(key)
+                return entry[1]
+        fingerprint = hash_function(dk.dk)
+        with self.__lock:
+            self.__fingerprints[key] = (weakref.ref(dk), fingerprint)
+            self.__fingerprints.move_to_end(key)
+            while len(self.__fingerprints) > self.__max_keys:
+                self.__fingerprints.popitem(last=False)
+        return fingerprint
+
+    def __remove(self, key):
+        """
+        Elimina una entrada de los dos índices (con el cerrojo tomado).
+        """
+        del self.__entries[key]
+        (fingerprint, c_hash) = key
+        per_key = self.__per_key[fingerprint]
+        del per_key[c_hash]
+        if not per_key:
+            del self.__per_key[fingerprint]
+
+    def __expire(self, now):
+        """
+        Elimina las entradas caducadas, que son siempre las más antiguas (con el cerrojo tomado).
+        """
+        while self.__entries:
+            (key, (expiry, _)) = next(iter(self.__entries.items()))
+            if expiry > now:
+                break
+            self.__remove(key)
+            self.__expired += 1
+
+    def lookup(self, fingerprint, c_hash):
+        """
+        Busca el resultado de una desencapsulación anterior.
+
+        Entrada:
+        - fingerprint: huella de la clave privada (H(dk))
+        - c_hash: H(c) de la cápsula
+
+        Salida:
+        - K' (bytes) o None si no hay una entrada vigente
+        """
+        with self.__lock:
+            self.__expire(self.__clock())
+            entry = self.__entries.get((fingerprint, c_hash))
+            if entry is None:
+                self.__misses += 1
+                return None
+            self.__hits += 1
+            return entry[1]
+
+    def store(self, fingerprint, c_hash, K):
+        """
+        Guarda el resultado de una desencapsulación, desalojando las entradas más antiguas de la misma
+        clave o de toda la caché si se superan los límites.
+        """
+        key = (fingerprint, c_hash)
+        with self.__lock:
+            now = self.__clock()
+            self.__expire(now)
+            if key in self.__entries:
+                return
+            per_key = self.__per_key.setdefault(fingerprint, OrderedDict())
+            if len(per_key) >= self.__max_entries_per_key:
+                self.__remove((fingerprint, next(iter(per_key))))
+                self.__evicted += 1
+                per_key = self.__per_key.setdefault(fingerprint, OrderedDict())
+            # Las huellas recordadas cuentan también para el límite de max_entries
+            while self.__entries and len(self.__entries) + len(self.__fingerprints) >= self.__max_entries:
+                self.__remove(next(iter(self.__entries)))
+                self.__evicted += 1
+                per_key = self.__per_key.setdefault(fingerprint, OrderedDict())
+            self.__entries[key] = (now + self.__ttl, bytes(K))
+            per_key[c_hash] = None
+
+    def invalidate(self, fingerprint):
+        """
+        Elimina todas las entradas de una clave privada (por ejemplo, al retirarla).
+
+        Entrada:
+        - fingerprint: huella de la clave, H(dk) con el motor de la instancia (ml_kem.engine.H(dk))
+
+        Salida:
+        - número de entradas eliminadas
+        """
+        with self.__lock:
+            for key in [key for (key, (_, value)) in self.__fingerprints.items() if value == fingerprint]:
+                del self.__fingerprints[key]
+            per_key = self.__per_key.get(fingerprint)
+            if per_key is None:
+                return 0
+            c_hashes = list(per_key)
+            for c_hash in c_hashes:
+                self.__remove((fingerprint, c_hash))
+            return len(c_hashes)
+
+    def clear(self):
+        """
+        Vacía la caché (las métricas se conservan).
+        """
+        with self.__lock:
+            self.__entries.clear()
+            self.__per_key.clear()
+            self.__fingerprints.clear()
+
+    def __len__(self):
+        with self.__lock:
+            return len(self.__entries)
+
+    def stats(self):
+        """
+        Métricas de la caché.
+
+        Salida:
+        - diccionario con aciertos, fallos, tasa de aciertos, entradas caducadas y desalojadas, y
+          número actual de entradas, de claves distintas y de huellas recordadas
+        """
+        with self.__lock:
+            lookups = self.__hits + self.__misses
+            return {"hits": self.__hits, "misses": self.__misses,
+                    "hit_rate": self.__hits / lookups if lookups else 0.0,
+                    "expired": self.__expired, "evicted": self.__evicted,
+                    "entries": len(self.__entries), "keys": len(self.__per_key),
+                    "fingerprints": len(self.__fingerprints)}
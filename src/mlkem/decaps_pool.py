@@ -0,0 +1,472 @@
+"""
+Servicio de desencapsulación con procesos trabajadores y memoria compartida.
+
+Al repartir Decaps entre procesos con un pool genérico, cada trabajador vuelve a decodificar y
+expandir la clave privada del servidor y cada petición serializa la cápsula. DecapsPool evita ambas
+cosas:
+
+- La clave se expande una sola vez en el proceso principal (ML_KEM.expand_dk: ŝ, t̂, Aᵀ, h y z) y
+  se escribe en un bloque de multiprocessing.shared_memory como coeficientes de 16 bits. Los
+  trabajadores la leen a través de una vista de solo lectura y la convierten a listas una vez por
+  clave, no por petición.
+- Las cápsulas y los secretos viajan por dos buffers circulares en memoria compartida por
+  trabajador (peticiones y respuestas), con registros de tamaño fijo y semáforos que cuentan huecos
+  libres y ocupados. No se serializa nada.
+- El bloque de la clave tiene dos huecos. rotate(dk) escribe la clave nueva en el hueco inactivo
+  (cuando ya no queda ninguna petición en curso que lo use) y cambia el hueco activo: las peticiones
+  siguientes usan la clave nueva y los trabajadores no se reinician.
+- Un hilo vigilante espera a la terminación de los procesos trabajadores. Si uno muere, sus
+  peticiones pendientes fallan con RuntimeError, deja de recibir peticiones nuevas y se arranca
+  otro en su lugar.
+"""
+import multiprocessing
+import struct
+import threading
+from array import array
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+from multiprocessing.connection import wait
+from .ML_KEM import ML_KEM_512, ML_KEM_768, ML_KEM_1024
+from .engine import get_engine
+from .validation import ExpandedDK
+
+PARAM_SETS = {512: ML_KEM_512, 768: ML_KEM_768, 1024: ML_KEM_1024}
+# (k, du, dv) de cada nivel de seguridad, para los tamaños de los registros
+_SIZES = {512: (2, 10, 4), 768: (3, 10, 4), 1024: (4, 11, 5)}
+
+_GENERATION = struct.Struct("<Q")               # Cabecera de cada hueco de clave
+_REQUEST = struct.Struct("<QBxxxI")             # Número de secuencia, hueco de clave, generación
+_RESPONSE = struct.Struct("<QB")                # Número de secuencia, estado (0: correcto)
+_STOP = 255                                     # Hueco de clave que indica al trabajador que termine
+
+def _slot_size(k):
+    """
+    Bytes de un hueco de clave: generación, ŝ, t̂ y Aᵀ (2k + k² polinomios de 512 bytes), h y z.
+    """
+    return _GENERATION.size + (2 * k + k * k) * 512 + 64
+
+
+def _write_key(buf, offset, key, generation):
+    """
+    Escribe una ExpandedDK en el hueco que empieza en offset. La generación se escribe al final.
+    """
+    k = key.k
+    polys = key.s_gorro + key.t_gorro + [a for row in key.A_T for a in row]
+    data = array('H', [x for f in polys for x in f]).tobytes() + key.h + key.z
+    start = offset + _GENERATION.size
+    buf[start : start + len(data)] = data
+    _GENERATION.pack_into(buf, offset, generation)
+
+
+def _read_key(buf, offset, k):
+    """
+    Lee una ExpandedDK del hueco que empieza en offset.
+    """
+    start = offset + _GENERATION.size
+    words = buf[start : start + (2 * k + k * k) * 512].cast('H')
+    try:
+        polys = [words[256 * n : 256 * (n + 1)].tolist() for n in range(2 * k + k * k)]
+    finally:
+        words.release()
+    tail = start + (2 * k + k * k) * 512
+    A_T = [polys[2 * k + k * i : 2 * k + k * (i + 1)] for i in range(k)]
+    return ExpandedDK(k, polys[:k], polys[k : 2 * k], A_T, bytes(buf[tail : tail + 32]), bytes(buf[tail + 32 : tail + 64]))
+
+
+class _Ring:
+    """
+    Buffer circular de registros de tamaño fijo en memoria compartida, con un productor y un consumidor.
+
+    spaces cuenta los registros libres e items los ocupados; cada extremo lleva su propio índice.
+    """
+
+    def __init__(self, context, capacity, record_size):
+        self.capacity = capacity
+        self.record_size = record_size
+        self.shm = shared_memory.SharedMemory(create=True, size=capacity * record_size)
+        self.items = context.Semaphore(0)
+        self.spaces = context.Semaphore(capacity)
+
+    def __getstate__(self):
+        # Al pasar el anillo a un trabajador solo viajan el nombre del bloque y los semáforos
+        return (self.capacity, self.record_size, self.shm.name, self.items, self.spaces)
+
+    def __setstate__(self, state):
+        (self.capacity, self.record_size, name, self.items, self.spaces) = state
+        self.shm = shared_memory.SharedMemory(name=name)
+
+    def offset(self, index):
+        return (index % self.capacity) * self.record_size
+
+
+def _worker(param_set, engine_name, key_name, requests, responses):
+    """
+    Bucle de un proceso trabajador: toma cápsulas del anillo de peticiones y escribe los secretos en
+    el de respuestas.
+    """
+    (k, du, dv) = _SIZES[param_set]
+    c_len = 32 * (du * k + dv)
+    ml_kem = PARAM_SETS[param_set](engine=get_engine(engine_name), validation_cache_size=0)
+    key_shm = shared_memory.SharedMemory(name=key_name)
+    key_buf = key_shm.buf.toreadonly()
+    req_buf = requests.shm.buf
+    resp_buf = responses.shm.buf
+    slot_size = _slot_size(k)
+    keys = {}                                   # hueco -> (generación, ExpandedDK)
+    index = 0
+    try:
+        while True:
+            requests.items.acquire()
+            offset = requests.offset(index)
+            (seq, slot, generation) = _REQUEST.unpack_from(req_buf, offset)
+            if slot == _STOP:
+                break
+            status = 0
+            K = bytes(32)
+            try:
+                cached = keys.get(slot)
+                if cached is None or cached[0] != generation:
+                    assert(_GENERATION.unpack_from(key_buf, slot * slot_size)[0] == generation)
+                    cached = keys[slot] = (generation, _read_key(key_buf, slot * slot_size, k))
+                c = req_buf[offset + _REQUEST.size : offset + _REQUEST.size + c_len]
+                try:
+                    K = ml_kem.Decaps_expanded(cached[1], c)
+                finally:
+                    c.release()
+            except Exception:
+                status = 1
+            requests.spaces.release()           # El registro de la petición ya no se usa
+            index += 1
+
+            responses.spaces.acquire()
+            out = responses.offset(seq)
+            _RESPONSE.pack_into(resp_buf, out, seq, status)
+            resp_buf[out + _RESPONSE.size : out + _RESPONSE.size + 32] = K
+            responses.items.release()
+    finally:
+        del req_buf, resp_buf
+        key_buf.release()
+        key_shm.close()
+        requests.shm.close()
+        responses.shm.close()
+
+
+class _Channel:
+    """
+    Extremo del proceso principal para un trabajador: anillos, proceso, futuros pendientes e hilo
+    que recoge las respuestas.
+    """
+
+    def __init__(self, pool, context, param_set, engine_name, key_name, capacity, c_len):
+        self.requests = _Ring(context, capacity, _REQUEST.size + c_len)
+        self.responses = _Ring(context, capacity, _RESPONSE.size + 32)
+        self.lock = threading.Lock()
+        self.pending = {}                       # número de secuencia -> (futuro, hueco de clave)
+        self.next_seq = 0
+        self.received = 0
+        self.stopping = False
+        self.dead = False                       # El trabajador murió y el canal ya no se usa
+        self.process = context.Process(target=_worker, name="mlkem-decaps",
+                                       args=(param_set, engine_name, key_name, self.requests, self.responses),
+                                       daemon=True)
+        self.process.start()
+        self.pool = pool
+        self.collector = threading.Thread(target=self.collect, name="mlkem-decaps-collector", daemon=True)
+        self.collector.start()
+
+    def submit(self, slot, generation, c):
+        """
+        Copia una cápsula en el anillo de peticiones y devuelve su futuro (o None si el trabajador
+        ha muerto y hay que usar otro).
+        """
+        future = Future()
+        self.requests.spaces.acquire()
+        with self.lock:
+            if self.dead:
+                self.requests.spaces.release()  # Despierta al siguiente que espere un hueco
+                return None
+            seq = self.next_seq
+            self.next_seq += 1
+            self.pending[seq] = (future, slot)
+            offset = self.requests.offset(seq)
+            buf = self.requests.shm.buf
+            _REQUEST.pack_into(buf, offset, seq, slot, generation)
+            buf[offset + _REQUEST.size : offset + _REQUEST.size + len(c)] = c
+            del buf
+            self.requests.items.release()
+        return future
+
+    def collect(self):
+        """
+        Hilo de recogida: resuelve los futuros en el orden en que responde el trabajador.
+        """
+        buf = self.responses.shm.buf
+        try:
+            while True:
+                self.responses.items.acquire()
+                with self.lock:
+                    if self.dead or (self.stopping and not self.pending):
+                        break
+                offset = self.responses.offset(self.received)
+                (seq, status) = _RESPONSE.unpack_from(buf, offset)
+                K = bytes(buf[offset + _RESPONSE.size : offset + _RESPONSE.size + 32])
+                self.responses.spaces.release()
+                self.received += 1
+                with self.lock:
+                    entry = self.pending.pop(seq, None)
+                if entry is None:
+                    continue                    # Ya se dio por fallida al morir el trabajador
+                (future, slot) = entry
+                self.pool._completed(slot)
+                if status == 0:
+                    future.set_result(K)
+                else:
+                    future.set_exception(RuntimeError("el trabajador no pudo desencapsular la cápsula"))
+        finally:
+            del buf
+
+    def __fail_pending(self):
+        """
+        Da por fallidas las peticiones pendientes, que el trabajador ya no responderá.
+        """
+        with self.lock:
+            failed = list(self.pending.values())
+            self.pending.clear()
+        for (future, slot) in failed:
+            self.pool._completed(slot)
+            future.set_exception(RuntimeError("el trabajador de Decaps terminó de forma inesperada"))
+
+    def __release(self):
+        """
+        Espera al proceso y al hilo de recogida y libera los anillos.
+        """
+        self.process.join()
+        self.responses.items.release()          # Despierta al hilo de recogida para que termine
+        self.collector.join()
+        for ring in (self.requests, self.responses):
+            ring.shm.close()
+            ring.shm.unlink()
+
+    def abandon(self):
+        """
+        El trabajador ha muerto: falla sus peticiones pendientes, despierta a quien espera un hueco
+        en el anillo de peticiones (para que pruebe con otro trabajador) y libera los anillos.
+        """
+        with self.lock:
+            self.dead = True
+        self.__fail_pending()
+        self.requests.spaces.release()
+        self.__release()
+
+    def stop(self):
+        """
+        Pide al trabajador que termine, espera al proceso y al hilo de recogida y libera los anillos.
+        """
+        # Con el anillo lleno y el trabajador muerto no quedaría nunca un hueco para la orden de parada
+        while not self.requests.spaces.acquire(timeout=0.1):
+            if not self.process.is_alive():
+                break
+        else:
+            with self.lock:
+                self.stopping = True
+                offset = self.requests.offset(self.next_seq)
+                _REQUEST.pack_into(self.requests.shm.buf, offset, self.next_seq, _STOP, 0)
+                self.requests.items.release()
+        self.process.join()
+        if self.process.exitcode != 0:
+            # El trabajador terminó sin responder a todo: sus peticiones ya no se resolverán
+            with self.lock:
+                self.dead = True
+            self.__fail_pending()
+        self.__release()
+
+
+class DecapsPool:
+    """
+    Pool de procesos que desencapsulan con una clave privada expandida en memoria compartida.
+    """
+
+    def __init__(self, param_set, dk, processes=None, capacity=32, engine=None, context=None):
+        """
+        Entrada:
+        - param_set: nivel de seguridad (512, 768 o 1024)
+        - dk: clave privada extendida del servidor (se valida aquí)
+        - processes: número de procesos trabajadores (por defecto, el número de núcleos)
+        - capacity: registros de cada anillo (peticiones en curso por trabajador)
+        - engine: motor de cálculo, por nombre, que usan el proceso principal y los trabajadores
+        - context: contexto de multiprocessing ("fork", "spawn", "forkserver" o None)
+        """
+        assert(param_set in PARAM_SETS)
+        if processes is None:
+            processes = multiprocessing.cpu_count() or 1
+        assert(processes >= 1 and capacity >= 1)
+        context = multiprocessing.get_context(context)
+        engine_name = get_engine(engine).name
+        (k, du, dv) = _SIZES[param_set]
+        self.__c_len = 32 * (du * k + dv)
+        self.__k = k
+        self.__context = context
+        self.__param_set = param_set
+        self.__engine_name = engine_name
+        self.__capacity = capacity
+        self.__ml_kem = PARAM_SETS[param_set](engine=engine_name)
+        self.__lock = threading.Condition()
+        self.__in_flight = [0, 0]               # Peticiones en curso por hueco de clave
+        self.__generations = [0, 0]
+        self.__active = 0
+        self.__closed = False
+        self.__key_shm = shared_memory.SharedMemory(create=True, size=2 * _slot_size(k))
+        self.__channels = []
+        self.__next = 0
+        self.__restarting = 0                   # Trabajadores muertos cuyo sustituto aún arranca
+        (self.__wakeup, self.__wakeup_sender) = context.Pipe(duplex=False)
+        self.__watchdog = None
+        try:
+            self.__install(0, self.__ml_kem.expand_dk(dk))
+            for _ in range(processes):
+                self.__channels.append(self.__start_channel())
+            self.__watchdog = threading.Thread(target=self.__watch, name="mlkem-decaps-watchdog", daemon=True)
+            self.__watchdog.start()
+        except BaseException:
+            self.close()
+            raise
+
+    def __start_channel(self):
+        return _Channel(self, self.__context, self.__param_set, self.__engine_name, self.__key_shm.name,
+                        self.__capacity, self.__c_len)
+
+    def __watch(self):
+        """
+        Hilo vigilante: cuando un trabajador termina sin que se le haya pedido, lo saca del reparto,
+        falla sus peticiones pendientes y arranca otro en su lugar. Un trabajador que muere sin haber
+        respondido a ninguna petición no se sustituye, para no entrar en un bucle de arranques fallidos.
+        """
+        while True:
+            with self.__lock:
+                channels = list(self.__channels)
+            ready = wait([channel.process.sentinel for channel in channels] + [self.__wakeup])
+            if self.__wakeup in ready:
+                return                          # close() ha pedido terminar
+            for channel in channels:
+                if channel.process.sentinel not in ready:
+                    continue
+                with self.__lock:
+                    self.__channels.remove(channel)
+                    self.__restarting += 1
+                channel.abandon()
+                replacement = None              # Si no se sustituye, se sigue con un trabajador menos
+                if channel.received:
+                    try:
+                        replacement = self.__start_channel()
+                    except Exception:
+                        pass
+                with self.__lock:
+                    if replacement is not None:
+                        self.__channels.append(replacement)
+                    self.__restarting -= 1
+                    self.__lock.notify_all()
+
+    def __install(self, slot, key):
+        """
+        Escribe una clave expandida en un hueco con una generación nueva (con el hueco sin usar).
+        """
+        self.__generations[slot] += 1
+        _write_key(self.__key_shm.buf, slot * _slot_size(self.__k), key, self.__generations[slot])
+
+    def _completed(self, slot):
+        with self.__lock:
+            self.__in_flight[slot] -= 1
+            if self.__in_flight[slot] == 0:
+                self.__lock.notify_all()
+
+    def submit(self, c):
+        """
+        Encola la desencapsulación de una cápsula.
+
+        Entrada:
+        - c: cápsula (bytes-like) del nivel de seguridad del pool
+
+        Salida:
+        - concurrent.futures.Future con K' (o RuntimeError si el trabajador no pudo desencapsular o
+          murió antes de responder)
+        """
+        c = memoryview(c).cast('B')
+        assert(len(c) == self.__c_len)
+        while True:
+            with self.__lock:
+                assert(not self.__closed)
+                while not self.__channels and self.__restarting:
+                    self.__lock.wait()
+                if not self.__channels:
+                    raise RuntimeError("no queda ningún trabajador de Decaps")
+                slot = self.__active
+                generation = self.__generations[slot]
+                self.__in_flight[slot] += 1
+                # Reparto por turnos entre los trabajadores
+                channel = self.__channels[self.__next % len(self.__channels)]
+                self.__next += 1
+            try:
+                future = channel.submit(slot, generation, c)
+            except BaseException:
+                self._completed(slot)
+                raise
+            if future is not None:
+                return future
+            # El trabajador murió mientras se esperaba un hueco: se prueba con otro
+            self._completed(slot)
+
+    def Decaps(self, c):
+        """
+        Desencapsula una cápsula y espera al resultado.
+        """
+        return self.submit(c).result()
+
+    def map(self, cs):
+        """
+        Desencapsula una lista de cápsulas repartiéndolas entre los trabajadores.
+
+        Salida:
+        - lista de secretos K' en el mismo orden
+        """
+        return [future.result() for future in [self.submit(c) for c in cs]]
+
+    def rotate(self, dk):
+        """
+        Sustituye la clave privada sin reiniciar los trabajadores.
+
+        La clave nueva se valida y expande aquí, se escribe en el hueco inactivo en cuanto terminan
+        las peticiones que aún lo usaban y pasa a ser la activa. Las peticiones ya encoladas terminan
+        con la clave anterior; las que se encolan después de volver usan la nueva.
+        """
+        key = self.__ml_kem.expand_dk(dk)
+        with self.__lock:
+            slot = 1 - self.__active
+            while self.__in_flight[slot]:
+                self.__lock.wait()
+            self.__install(slot, key)
+            self.__active = slot
+
+    def close(self):
+        """
+        Espera a las peticiones en curso, detiene los trabajadores y libera la memoria compartida.
+        """
+        with self.__lock:
+            if self.__closed:
+                return
+            self.__closed = True
+        if self.__watchdog is not None:
+            self.__wakeup_sender.send(None)
+            self.__watchdog.join()
+        for channel in self.__channels:
+            channel.stop()
+        self.__channels = []
+        self.__wakeup.close()
+        self.__wakeup_sender.close()
+        self.__key_shm.close()
+        self.__key_shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
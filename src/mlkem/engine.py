@@ -0,0 +1,291 @@
+"""
+Selección del motor de cálculo de ML-KEM.
+
+Un motor (Engine) agrupa todas las primitivas que usan K_PKE y ML_KEM: funciones hash, muestreo,
+NTT, aritmética en T_q, codificación y compresión. Motores registrados:
+
+- "reference": las implementaciones legibles de keccak.py, sampling.py, ntt.py y conversions.py,
+  que siguen al pie de la letra los algoritmos de FIPS 203.
+- "optimized": los núcleos de kernels.py (Keccak por palabras de 64 bits, compresión por tablas,
+  codificación por palabras y por carriles SWAR, NTT por cortes de listas).
+- "kronecker": "optimized", pero el producto ŝᵀ·u de K-PKE.Decrypt se calcula en el dominio normal
+  por sustitución de Kronecker (kronecker.py) en lugar de con NTT.
+- "unrolled": "optimized" con NTT e INTT generadas en línea recta (codegen.py).
+
+Los motores se construyen de forma perezosa la primera vez que se piden, y register_engine permite
+añadir variantes nuevas para desplegarlas gradualmente (ver Shadow).
+"""
+import os
+import random
+import threading
+from functools import reduce
+
+class Engine:
+    """
+    Conjunto de primitivas de ML-KEM con la misma interfaz que las funciones de referencia.
+    """
+
+    PRIMITIVES = ("H", "G", "J", "PRF", "XOF", "SampleNTT", "SamplePolyCBD", "NTT", "INTT",
+                  "MultiplyNTTs", "SumNTTs", "SubtractNTTs", "ByteEncode_into", "ByteDecode",
+                  "Compress_poly", "Decompress_poly")
+
+    # Primitivas opcionales: si faltan (None), el motor usa la vía equivalente basada en NTT
+    OPTIONAL = ("PolyInnerProduct", "SumManyNTTs")
+
+    def __init__(self, name, **primitives):
+        """
+        Entrada:
+        - name: nombre del motor
+        - primitives: una función por cada nombre de Engine.PRIMITIVES y, si se quiere, de Engine.OPTIONAL
+        """
+        assert(set(self.PRIMITIVES) <= set(primitives) <= set(self.PRIMITIVES + self.OPTIONAL))
+        self.name = name
+        for key in self.OPTIONAL:
+            setattr(self, key, None)
+        for (key, fn) in primitives.items():
+            setattr(self, key, fn)
+
+    def replace(self, name, **primitives):
+        """
+        Devuelve un motor nuevo igual a este salvo por las primitivas indicadas.
+        """
+        current = {key: getattr(self, key) for key in self.PRIMITIVES + self.OPTIONAL}
+        current.update(primitives)
+        return Engine(name, **current)
+
+    def NTT_vector_vector_multiply(self, f_gorro, g_gorro):
+        """
+        Producto escalar en T_q de dos vectores de polinomios (como ntt.NTT_vector_vector_multiply).
+        """
+        assert(len(f_gorro) == len(g_gorro))
+        return self.NTT_sum([self.MultiplyNTTs(f_gorro[i], g_gorro[i]) for i in range(len(f_gorro))])
+
+    def NTT_sum(self, polys):
+        """
+        Suma en R_q (o T_q) de una lista de polinomios: SumManyNTTs si el motor la tiene y, si no,
+        SumNTTs encadenadas.
+        """
+        if self.SumManyNTTs is None:
+            return reduce(self.SumNTTs, polys)
+        return self.SumManyNTTs(polys)
+
+    def NTT_matrix_vector_multiply(self, A_gorro, s_gorro):
+        """
+        Producto matriz-vector en T_q (como ntt.NTT_matrix_vector_multiply).
+        """
+        return [self.NTT_vector_vector_multiply(A_gorro[i], s_gorro) for i in range(len(A_gorro))]
+
+    def NTT_sampled_matrix_vector_multiply(self, rho, s_gorro, transposed=False):
+        """
+        Producto A·ŝ (o Aᵀ·ŝ) en T_q generando cada entrada A[i][j] = SampleNTT(rho || j || i) justo
+        cuando se necesita, acumulándola en el resultado y descartándola: en memoria solo hay a la vez
+        una entrada de la matriz, en lugar de las k² de la matriz completa.
+
+        Entrada:
+        - rho: semilla de 32 bytes de la matriz
+        - s_gorro: vector de k polinomios en dominio NTT
+        - transposed: multiplicar por Aᵀ en lugar de por A
+
+        Salida:
+        - lista de k polinomios, igual que NTT_matrix_vector_multiply con la matriz completa
+        """
+        rho = bytes(rho)
+        k = len(s_gorro)
+        result = []
+        for i in range(k):
+            acc = None
+            for j in range(k):
+                # Fila i de A: A[i][j] = XOF(rho || j || i); fila i de Aᵀ: A[j][i] = XOF(rho || i || j)
+                a = self.SampleNTT(rho + (bytes([i, j]) if transposed else bytes([j, i])))
+                product = self.MultiplyNTTs(a, s_gorro[j])
+                acc = product if acc is None else self.SumNTTs(acc, product)
+            result.append(acc)
+        return result
+
+    def NTT_vector_dot(self, s_gorro, u):
+        """
+        Producto escalar sᵀ·u en R_q (dominio normal), con s dado en dominio NTT y u en dominio normal.
+
+        Sin PolyInnerProduct es INTT(ŝᵀ ∘ NTT(u)), como en FIPS 203; con él, INTT(ŝ) y un producto
+        directo en el dominio normal (k transformadas en lugar de k + 1, y sin MultiplyNTTs).
+        """
+        if self.PolyInnerProduct is None:
+            return self.INTT(self.NTT_vector_vector_multiply(s_gorro, [self.NTT(x) for x in u]))
+        return self.PolyInnerProduct([self.INTT(x) for x in s_gorro], u)
+
+    def ByteEncode(self, d, F):
+        """
+        ByteEncode que devuelve bytes, sobre ByteEncode_into.
+        """
+        out = bytearray(32 * d)
+        self.ByteEncode_into(d, F, out)
+        return bytes(out)
+
+    def __repr__(self):
+        return f"<Engine {self.name!r}>"
+
+
+def _reference():
+    from . import keccak, sampling, ntt, conversions
+    return Engine("reference",
+                  H=keccak.H, G=keccak.G, J=keccak.J, PRF=keccak.PRF, XOF=keccak.XOF,
+                  SampleNTT=sampling.SampleNTT, SamplePolyCBD=sampling.SamplePolyCBD,
+                  NTT=ntt.NTT, INTT=ntt.INTT, MultiplyNTTs=ntt.MultiplyNTTs,
+                  SumNTTs=ntt.SumNTTs, SubtractNTTs=ntt.SubtractNTTs,
+                  ByteEncode_into=conversions.ByteEncode_into, ByteDecode=conversions.ByteDecode,
+                  Compress_poly=conversions.Compress_poly, Decompress_poly=conversions.Decompress_poly)
+
+
+def _optimized():
+    from . import kernels
+    return Engine("optimized", **{key: getattr(kernels, key) for key in Engine.PRIMITIVES + Engine.OPTIONAL
+                                  if hasattr(kernels, key)})
+
+
+def _kronecker():
+    from . import kronecker
+    return get_engine("optimized").replace("kronecker", PolyInnerProduct=kronecker.inner_product)
+
+
+def _unrolled():
+    from .codegen import ntt_kernels
+    (NTT, INTT) = ntt_kernels()
+    return get_engine("optimized").replace("unrolled", NTT=NTT, INTT=INTT)
+
+
+_factories = {"reference": _reference, "optimized": _optimized, "kronecker": _kronecker, "unrolled": _unrolled}
+_engines = {}
+_lock = threading.RLock()  # Reentrante: una fábrica puede derivar su motor de otro (Engine.replace)
+
+# Motor por defecto; puede elegirse sin tocar el código con la variable de entorno MLKEM_ENGINE
+DEFAULT_ENGINE = os.environ.get("MLKEM_ENGINE", "reference")
+
+def register_engine(name, factory):
+    """
+    Registra un motor nuevo.
+
+    Entrada:
+    - name: nombre con el que se seleccionará (por ejemplo, en ML_KEM(..., engine=name))
+    - factory: función sin argumentos que construye el Engine la primera vez que se pide
+    """
+    with _lock:
+        _factories[name] = factory
+        _engines.pop(name, None)
+
+
+def get_engine(engine=None):
+    """
+    Resuelve un motor a partir de su nombre.
+
+    Entrada:
+    - engine: nombre registrado, instancia de Engine o None (motor por defecto)
+
+    Salida:
+    - Engine
+    """
+    if isinstance(engine, Engine):
+        return engine
+    name = DEFAULT_ENGINE if engine is None else engine
+    with _lock:
+        if name not in _engines:
+            if name not in _factories:
+                raise ValueError(f"motor de ML-KEM desconocido: {name!r}")
+            _engines[name] = _factories[name]()
+        return _engines[name]
+
+
+def engines():
+    """
+    Nombres de los motores registrados.
+    """
+    return sorted(_factories)
+
+
+class Shadow:
+    """
+    Modo sombra: una fracción de las operaciones se repite con un motor de referencia y se
+    comparan los resultados.
+
+    Las operaciones internas de ML-KEM son deterministas una vez fijada la aleatoriedad (d, z para
+    KeyGen; m para Encaps), así que ambas ejecuciones deben coincidir byte a byte. Cada divergencia
+    se cuenta y se comunica a on_divergence. El informe lleva en claro solo las salidas públicas
+    (ek de KeyGen, c de Encaps); de las secretas (dk y K) indica únicamente si coinciden.
+    """
+
+    # Nombres de las salidas de cada operación y cuáles son públicas
+    OUTPUTS = {"KeyGen": ("ek", "dk"), "Encaps": ("K", "c"), "Decaps": ("K",)}
+    PUBLIC_OUTPUTS = frozenset(("ek", "c"))
+
+    def __init__(self, fraction=0.01, reference="reference", on_divergence=None,
+                 prefer_reference=True, include_inputs=False, seed=None):
+        """
+        Entrada:
+        - fraction: fracción de operaciones (entre 0 y 1) que se comprueban
+        - reference: motor con el que se compara (nombre o Engine)
+        - on_divergence: función que recibe un diccionario con los detalles de cada divergencia
+        - prefer_reference: si hay divergencia, devolver el resultado del motor de referencia
+        - include_inputs: incluir en el informe las entradas y las salidas secretas (¡semillas, claves
+          privadas y secretos compartidos!)
+        - seed: semilla del muestreo, para reproducir qué operaciones se comprueban
+        """
+        assert(0 <= fraction <= 1)
+        self.fraction = fraction
+        self.reference = reference
+        self.on_divergence = on_divergence
+        self.prefer_reference = prefer_reference
+        self.include_inputs = include_inputs
+        self.checked = 0
+        self.divergences = 0
+        self.__random = random.Random(seed)
+        self.__lock = threading.Lock()
+
+    def sample(self):
+        """
+        Decide si la operación actual se comprueba contra el motor de referencia.
+        """
+        if self.fraction <= 0:
+            return False
+        with self.__lock:
+            return self.fraction >= 1 or self.__random.random() < self.fraction
+
+    def report(self, operation, engine, k, inputs, result, expected):
+        """
+        Registra el resultado de una comprobación.
+
+        Entrada:
+        - operation: "KeyGen", "Encaps" o "Decaps"
+        - engine: nombre del motor comprobado
+        - k: parámetro k del esquema
+        - inputs: diccionario con las entradas deterministas de la operación
+        - result, expected: tuplas de resultados del motor comprobado y del de referencia
+
+        Salida:
+        - True si los resultados coinciden
+
+        En el informe, result y expected llevan None en lugar de las salidas secretas salvo con
+        include_inputs; mismatched nombra las salidas que difieren.
+        """
+        same = tuple(bytes(x) for x in result) == tuple(bytes(x) for x in expected)
+        with self.__lock:
+            self.checked += 1
+            if not same:
+                self.divergences += 1
+        if not same and self.on_divergence is not None:
+            names = self.OUTPUTS.get(operation, tuple(f"output{i}" for i in range(len(result))))
+            shown = [self.include_inputs or name in self.PUBLIC_OUTPUTS for name in names]
+            details = {"operation": operation, "engine": engine, "reference": get_engine(self.reference).name,
+                       "k": k, "outputs": list(names),
+                       "mismatched": [name for (name, x, y) in zip(names, result, expected) if bytes(x) != bytes(y)],
+                       "result": [bytes(x).hex() if show else None for (x, show) in zip(result, shown)],
+                       "expected": [bytes(x).hex() if show else None for (x, show) in zip(expected, shown)]}
+            if self.include_inputs:
+                details["inputs"] = {key: bytes(value).hex() for (key, value) in inputs.items()}
+            self.on_divergence(details)
+        return same
+
+    def stats(self):
+        """
+        Número de operaciones comprobadas y de divergencias detectadas.
+        """
+        with self.__lock:
+            return {"checked": self.checked, "divergences": self.divergences}
@@ -0,0 +1,164 @@
+"""
+Expansión de la matriz pública A de K-PKE repartida entre varios procesos.
+
+Los k² polinomios A[i][j] = SampleNTT(rho || j || i) son independientes entre sí. MatrixExpander
+mantiene un conjunto de procesos trabajadores ya arrancados que comparten con el proceso principal
+un bloque de multiprocessing.shared_memory: cada trabajador escribe sus polinomios directamente en
+el bloque (256 coeficientes de 16 bits por polinomio) y el proceso principal los lee de ahí, sin
+serializar ningún polinomio. Por las tuberías solo viajan rho, la lista de posiciones (i, j) que toca
+a cada trabajador y un acuse de fin. El proceso principal calcula también su parte mientras espera.
+
+Con k = 4 (ML-KEM-1024) y varios núcleos, la latencia de una sola KeyGen o Encrypt baja porque los
+16 SampleNTT dejan de ejecutarse uno tras otro.
+"""
+import multiprocessing
+import threading
+from array import array
+from multiprocessing import shared_memory
+from .engine import get_engine
+
+_POLY_BYTES = 2 * 256
+_MAX_K = 4
+
+def _worker(conn, shm_name, engine_name):
+    """
+    Bucle de un proceso trabajador: recibe (rho, k, posiciones), escribe los polinomios en el bloque
+    compartido y responde con el número de polinomios escritos.
+    """
+    # Los procesos creados por multiprocessing comparten el resource_tracker del principal, que es
+    # quien elimina el bloque en close()
+    shm = shared_memory.SharedMemory(name=shm_name)
+    engine = get_engine(engine_name)
+    buf = shm.buf
+    try:
+        while True:
+            message = conn.recv()
+            if message is None:
+                break
+            (rho, k, jobs) = message
+            for (i, j) in jobs:
+                offset = (i * k + j) * _POLY_BYTES
+                buf[offset : offset + _POLY_BYTES] = array('H', engine.SampleNTT(rho + bytes([j, i]))).tobytes()
+            conn.send(len(jobs))
+    finally:
+        del buf
+        shm.close()
+
+
+class MatrixExpander:
+    """
+    Servicio de expansión de la matriz A con procesos trabajadores y salida en memoria compartida.
+    """
+
+    def __init__(self, processes=None, engine=None, context=None):
+        """
+        Entrada:
+        - processes: número de procesos trabajadores (por defecto, núcleos disponibles menos uno)
+        - engine: motor con el que los trabajadores ejecutan SampleNTT; debe poder resolverse por
+          nombre en los trabajadores (un motor registrado con register_engine solo está disponible en
+          ellos si se arrancan con fork)
+        - context: contexto de multiprocessing ("fork", "spawn", "forkserver" o None para el predeterminado)
+        """
+        if processes is None:
+            processes = max(1, (multiprocessing.cpu_count() or 1) - 1)
+        assert(processes >= 1)
+        self.__engine = get_engine(engine)
+        self.__processes = processes
+        self.__context = multiprocessing.get_context(context)
+        self.__lock = threading.Lock()
+        self.__shm = None
+        self.__workers = []
+
+    def start(self):
+        """
+        Crea el bloque compartido y arranca los trabajadores (se llama sola en el primer expand).
+        """
+        with self.__lock:
+            self.__start()
+
+    def __start(self):
+        if self.__shm is not None:
+            return
+        self.__shm = shared_memory.SharedMemory(create=True, size=_MAX_K * _MAX_K * _POLY_BYTES)
+        try:
+            for _ in range(self.__processes):
+                (parent, child) = self.__context.Pipe()
+                process = self.__context.Process(target=_worker, args=(child, self.__shm.name, self.__engine.name),
+                                                 name="mlkem-expander", daemon=True)
+                process.start()
+                child.close()
+                self.__workers.append((process, parent))
+        except BaseException:
+            self.__close()
+            raise
+
+    def expand(self, rho, k):
+        """
+        Calcula la matriz A ∈ T_q^{k×k} con A[i][j] = SampleNTT(rho || j || i).
+
+        Entrada:
+        - rho: semilla de 32 bytes
+        - k: dimensión de la matriz (2, 3 o 4)
+
+        Salida:
+        - A como lista de k listas de k polinomios (listas de 256 enteros), igual que el cálculo en serie
+        """
+        assert(2 <= k <= _MAX_K)
+        rho = bytes(rho)
+        positions = [(i, j) for i in range(k) for j in range(k)]
+        with self.__lock:
+            self.__start()
+            # Reparto por turnos entre los trabajadores y el propio proceso principal (el último)
+            parts = len(self.__workers) + 1
+            shares = [positions[n::parts] for n in range(parts)]
+            busy = []
+            for ((process, conn), jobs) in zip(self.__workers, shares):
+                if jobs:
+                    conn.send((rho, k, jobs))
+                    busy.append(conn)
+
+            A = [[None] * k for _ in range(k)]
+            for (i, j) in shares[-1]:
+                A[i][j] = self.__engine.SampleNTT(rho + bytes([j, i]))
+            for conn in busy:
+                conn.recv()
+
+            coefficients = self.__shm.buf[: k * k * _POLY_BYTES].cast('H')
+            try:
+                for (i, j) in positions:
+                    if A[i][j] is None:
+                        offset = (i * k + j) * 256
+                        A[i][j] = coefficients[offset : offset + 256].tolist()
+            finally:
+                coefficients.release()
+        return A
+
+    def close(self):
+        """
+        Detiene los trabajadores y libera el bloque compartido.
+        """
+        with self.__lock:
+            self.__close()
+
+    def __close(self):
+        for (process, conn) in self.__workers:
+            try:
+                conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for (process, conn) in self.__workers:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+            conn.close()
+        self.__workers = []
+        if self.__shm is not None:
+            self.__shm.close()
+            self.__shm.unlink()
+            self.__shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,377 @@
+"""
+Cifrado híbrido (KEM-DEM) de ficheros de cualquier tamaño sobre ML-KEM.
+
+La clave compartida K que produce ML_KEM.Encaps se expande con SHAKE256 (keccak_lanes) en una
+clave de flujo y una clave de autenticación. El fichero se cifra por bloques de tamaño fijo: cada
+bloque se combina con el flujo de SHAKE256 y lleva una etiqueta de 32 bytes que cubre su posición y
+si es el último, de modo que reordenar, truncar o modificar bloques se detecta al descifrar.
+
+La entrada se lee con mmap cuando es un fichero regular y, en otro caso (tuberías, sockets), con
+readinto sobre un conjunto fijo de buffers que un hilo lector va llenando mientras se procesa el
+bloque anterior. La memoria usada no depende del tamaño del fichero.
+
+Formato (enteros en little-endian):
+
+  cabecera: magic (8) | versión (u16) | tamaño de bloque (u32) | longitud de c (u16) | c
+  bloques:  texto cifrado (tamaño de bloque bytes, salvo el último, más corto y posiblemente vacío)
+            | etiqueta (32)
+"""
+import argparse
+import hmac
+import mmap
+import os
+import queue
+import stat
+import struct
+import sys
+import threading
+from contextlib import closing
+from .conversions import bytes_view
+from .keccak_lanes import Sponge, shake256
+from .validation import ValidatedDK
+
+MAGIC = b"MLKEMHY1"
+VERSION = 1
+HEADER = struct.Struct("<8sHIH")
+TAG_SIZE = 32
+DEFAULT_CHUNK_SIZE = 64 * 1024
+# Tamaño de bloque máximo: la cabecera viene del fichero y decide cuánta memoria se reserva
+MAX_CHUNK_SIZE = 16 * 1024 * 1024
+
+# Tamaños de ek y dk de cada nivel de seguridad, para deducirlo a partir de una clave
+EK_SIZES = {800: 512, 1184: 768, 1568: 1024}
+DK_SIZES = {1632: 512, 2400: 768, 3168: 1024}
+# Tamaño de la cápsula c de cada nivel de seguridad
+C_SIZES = {512: 768, 768: 1088, 1024: 1568}
+
+def _derive_keys(K, header):
+    """
+    Deriva la clave de flujo y la clave de autenticación a partir de K y de la cabecera completa.
+
+    Salida:
+    - k_enc, k_mac: 32 bytes cada una
+    """
+    okm = shake256(b"".join((b"ML-KEM hybrid v1", bytes(K), bytes(header))), 64)
+    return okm[:32], okm[32:]
+
+
+def _keystream(k_enc):
+    """
+    Esponja SHAKE256 cuya salida es el flujo de cifrado del fichero completo.
+    """
+    sponge = Sponge(136, 0x1F)
+    sponge.absorb(k_enc)
+    return sponge
+
+
+def _tag(k_mac, index, final, ct):
+    """
+    Etiqueta de un bloque: SHAKE256(k_mac || índice || final || texto cifrado), 32 bytes.
+    """
+    sponge = Sponge(136, 0x1F)
+    sponge.absorb(k_mac + struct.pack("<QB", index, final))
+    sponge.absorb(ct)
+    return sponge.squeeze(TAG_SIZE)
+
+
+def _xor(data, stream):
+    """
+    XOR de data con los primeros len(data) bytes de stream, como un único entero.
+    """
+    n = len(data)
+    return (int.from_bytes(data, 'little') ^ int.from_bytes(stream[:n], 'little')).to_bytes(n, 'little')
+
+
+def _read_full(f, buf):
+    """
+    Llena buf con readinto, repitiendo ante lecturas parciales. Devuelve los bytes leídos
+    (menos que len(buf) solo al llegar al final del fichero).
+    """
+    view = memoryview(buf)
+    n = 0
+    while n < len(view):
+        read = f.readinto(view[n:])
+        if not read:
+            break
+        n += read
+    return n
+
+
+def _chunks(f, size, depth=2):
+    """
+    Recorre f en bloques de size bytes como memoryviews; el último bloque puede ser más corto.
+
+    Si f es un fichero regular se proyecta con mmap y los bloques son cortes sin copia; la proyección
+    se cierra al terminar o al cerrar el generador, así que el consumidor debe haber liberado antes
+    los cortes que haga de cada bloque. En otro caso un hilo lector llena con readinto hasta depth bloques
+    por adelantado, reutilizando siempre los mismos depth + 1 buffers. Cada memoryview solo es válido
+    hasta pedir el siguiente bloque.
+    """
+    try:
+        fd = f.fileno()
+        st = os.fstat(fd)
+        regular = stat.S_ISREG(st.st_mode) and st.st_size - f.tell() > 0
+    except (AttributeError, OSError, ValueError):
+        regular = False
+
+    if regular:
+        start = f.tell()
+        mm = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+        if hasattr(mm, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+            mm.madvise(mmap.MADV_SEQUENTIAL)
+        view = memoryview(mm)
+        chunk = None
+        try:
+            for offset in range(start, len(mm), size):
+                chunk = view[offset : offset + size]
+                yield chunk
+                chunk.release()
+            f.seek(0, os.SEEK_END)
+        finally:
+            if chunk is not None:
+                chunk.release()
+            view.release()
+            mm.close()
+        return
+
+    free = queue.Queue()
+    full = queue.Queue(depth)
+    for _ in range(depth + 1):
+        free.put(bytearray(size))
+    stop = threading.Event()
+
+    def reader():
+        try:
+            while not stop.is_set():
+                buf = free.get()
+                if buf is None:
+                    return
+                n = _read_full(f, buf)
+                full.put((buf, n))
+                if n < size:
+                    return
+        except BaseException as exc:
+            full.put((None, exc))
+
+    thread = threading.Thread(target=reader, name="mlkem-hybrid-reader", daemon=True)
+    thread.start()
+    try:
+        while True:
+            (buf, n) = full.get()
+            if buf is None:
+                raise n
+            yield memoryview(buf)[:n]
+            free.put(buf)
+            if n < size:
+                return
+    finally:
+        # Si el consumidor termina antes de tiempo, se desbloquea al lector esté donde esté
+        stop.set()
+        free.put(None)
+        while thread.is_alive():
+            try:
+                full.get_nowait()
+            except queue.Empty:
+                thread.join(0.01)
+
+
+def encrypt_stream(ml_kem, ek, src, dst, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Cifra el contenido de src para el titular de ek y lo escribe en dst.
+
+    Entrada:
+    - ml_kem: instancia de ML_KEM (o ML_KEM_512/768/1024) del nivel de seguridad de ek
+    - ek: clave pública del destinatario (o ValidatedEK)
+    - src: fichero binario de entrada (admite readinto o fileno)
+    - dst: fichero binario de salida
+    - chunk_size: tamaño de bloque en bytes (como mucho MAX_CHUNK_SIZE)
+
+    Salida:
+    - número de bytes de texto claro cifrados
+    """
+    assert(0 < chunk_size <= MAX_CHUNK_SIZE)
+    (K, c) = ml_kem.Encaps(ek)
+    header = HEADER.pack(MAGIC, VERSION, chunk_size, len(c)) + c
+    (k_enc, k_mac) = _derive_keys(K, header)
+    stream = _keystream(k_enc)
+    dst.write(header)
+
+    index = 0
+    total = 0
+    final = False
+    with closing(_chunks(src, chunk_size)) as chunks:
+        for chunk in chunks:
+            final = len(chunk) < chunk_size
+            ct = _xor(chunk, stream.squeeze(len(chunk)))
+            dst.write(ct)
+            dst.write(_tag(k_mac, index, final, ct))
+            index += 1
+            total += len(chunk)
+
+    # El último bloque siempre es más corto que chunk_size; si el tamaño es múltiplo exacto, va vacío
+    if not final:
+        dst.write(_tag(k_mac, index, True, b""))
+    return total
+
+
+def decrypt_stream(ml_kem, dk, src, dst):
+    """
+    Descifra en dst un fichero producido por encrypt_stream.
+
+    Cada bloque se autentica antes de escribirse, pero si el fichero está dañado a mitad, dst ya
+    contendrá los bloques anteriores (válidos): decrypt_file escribe en un fichero temporal por ello.
+    La cabecera se comprueba antes de leer nada más: la longitud de c debe ser la del nivel de
+    seguridad de dk y el tamaño de bloque no puede superar MAX_CHUNK_SIZE.
+
+    Entrada:
+    - ml_kem: instancia de ML_KEM (o ML_KEM_512/768/1024) del nivel de seguridad de dk
+    - dk: clave privada del destinatario (o ValidatedDK)
+    - src: fichero binario cifrado
+    - dst: fichero binario de salida
+
+    Salida:
+    - número de bytes de texto claro escritos
+    """
+    fixed = src.read(HEADER.size)
+    if len(fixed) < HEADER.size:
+        raise ValueError("fichero cifrado truncado")
+    (magic, version, chunk_size, c_size) = HEADER.unpack(fixed)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("el fichero no es un cifrado híbrido ML-KEM compatible")
+    if not 0 < chunk_size <= MAX_CHUNK_SIZE:
+        raise ValueError("tamaño de bloque no válido en la cabecera: %d" % chunk_size)
+    dk_size = len(dk.dk if isinstance(dk, ValidatedDK) else bytes_view(dk))
+    if dk_size not in DK_SIZES:
+        raise ValueError("tamaño de clave no válido: %d bytes" % dk_size)
+    if c_size != C_SIZES[DK_SIZES[dk_size]]:
+        raise ValueError("longitud de cápsula no válida en la cabecera: %d" % c_size)
+    c = src.read(c_size)
+    if len(c) < c_size:
+        raise ValueError("fichero cifrado truncado")
+
+    K = ml_kem.Decaps(dk, c)
+    (k_enc, k_mac) = _derive_keys(K, fixed + c)
+    stream = _keystream(k_enc)
+
+    index = 0
+    total = 0
+    with closing(_chunks(src, chunk_size + TAG_SIZE)) as records:
+        for record in records:
+            if len(record) < TAG_SIZE:
+                raise ValueError("fichero cifrado truncado")
+            final = len(record) < chunk_size + TAG_SIZE
+            # Los cortes se liberan al salir del with, para que _chunks pueda cerrar la proyección
+            with record[:-TAG_SIZE] as ct, record[-TAG_SIZE:] as tag:
+                # Una clave incorrecta (Decaps devuelve entonces una clave pseudoaleatoria) también falla aquí
+                if not hmac.compare_digest(_tag(k_mac, index, final, ct), tag):
+                    raise ValueError("autenticación fallida en el bloque %d" % index)
+                dst.write(_xor(ct, stream.squeeze(len(ct))))
+                index += 1
+                total += len(ct)
+            if final:
+                return total
+    raise ValueError("fichero cifrado truncado")
+
+
+def encrypt_file(ml_kem, ek, src_path, dst_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Cifra el fichero src_path en dst_path (ver encrypt_stream).
+    """
+    with open(src_path, "rb") as src, open(dst_path, "wb") as dst:
+        return encrypt_stream(ml_kem, ek, src, dst, chunk_size)
+
+
+def decrypt_file(ml_kem, dk, src_path, dst_path):
+    """
+    Descifra src_path en dst_path (ver decrypt_stream). El resultado se escribe primero en un
+    fichero temporal junto a dst_path, que solo se renombra si todos los bloques se autentican.
+    El temporal se crea nuevo y solo legible por su propietario (0o600), como la clave privada.
+    """
+    tmp_path = dst_path + ".part"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    try:
+        with open(fd, "wb") as dst, open(src_path, "rb") as src:
+            total = decrypt_stream(ml_kem, dk, src, dst)
+        os.replace(tmp_path, dst_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return total
+
+
+def _ml_kem_for(param_set, engine):
+    from . import ML_KEM
+    return getattr(ML_KEM, "ML_KEM_%d" % param_set)(engine=engine)
+
+
+def main(argv=None):
+    """
+    Uso: python -m mlkem.hybrid keygen --param-set 768 EK DK
+         python -m mlkem.hybrid encrypt EK ENTRADA SALIDA [--chunk-size N]
+         python -m mlkem.hybrid decrypt DK ENTRADA SALIDA
+
+    ENTRADA y SALIDA pueden ser "-" (entrada y salida estándar). Opción común: --engine NOMBRE.
+    """
+    parser = argparse.ArgumentParser(prog="python -m mlkem.hybrid", description="Cifrado híbrido de ficheros con ML-KEM")
+    parser.add_argument("--engine", default=None, help="motor de cálculo (por defecto, MLKEM_ENGINE)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    keygen = commands.add_parser("keygen", help="genera un par de claves")
+    keygen.add_argument("--param-set", type=int, choices=(512, 768, 1024), default=768)
+    keygen.add_argument("ek")
+    keygen.add_argument("dk")
+    encrypt = commands.add_parser("encrypt", help="cifra un fichero para una clave pública")
+    encrypt.add_argument("ek")
+    encrypt.add_argument("input")
+    encrypt.add_argument("output")
+    encrypt.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    decrypt = commands.add_parser("decrypt", help="descifra un fichero con la clave privada")
+    decrypt.add_argument("dk")
+    decrypt.add_argument("input")
+    decrypt.add_argument("output")
+    args = parser.parse_args(argv)
+    if args.command == "encrypt" and not 0 < args.chunk_size <= MAX_CHUNK_SIZE:
+        parser.error("--chunk-size debe estar entre 1 y %d" % MAX_CHUNK_SIZE)
+
+    if args.command == "keygen":
+        (ek, dk) = _ml_kem_for(args.param_set, args.engine).KeyGen()
+        with open(args.ek, "wb") as f:
+            f.write(ek)
+        with open(os.open(args.dk, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "wb") as f:
+            f.write(dk)
+        return 0
+
+    with open(args.ek if args.command == "encrypt" else args.dk, "rb") as f:
+        key = f.read()
+    sizes = EK_SIZES if args.command == "encrypt" else DK_SIZES
+    if len(key) not in sizes:
+        print("tamaño de clave no válido: %d bytes" % len(key), file=sys.stderr)
+        return 2
+    ml_kem = _ml_kem_for(sizes[len(key)], args.engine)
+
+    src = sys.stdin.buffer if args.input == "-" else open(args.input, "rb")
+    try:
+        if args.command == "encrypt":
+            if args.output == "-":
+                encrypt_stream(ml_kem, key, src, sys.stdout.buffer, args.chunk_size)
+            else:
+                with open(args.output, "wb") as dst:
+                    encrypt_stream(ml_kem, key, src, dst, args.chunk_size)
+        elif args.output == "-":
+            decrypt_stream(ml_kem, key, src, sys.stdout.buffer)
+        elif args.input == "-":
+            with open(args.output, "wb") as dst:
+                decrypt_stream(ml_kem, key, src, dst)
+        else:
+            decrypt_file(ml_kem, key, args.input, args.output)
+    except ValueError as exc:
+        print("error: %s" % exc, file=sys.stderr)
+        return 1
+    finally:
+        if src is not sys.stdin.buffer:
+            src.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
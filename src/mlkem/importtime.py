@@ -0,0 +1,71 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+# Presupuestos de tiempo de importación (milisegundos, tiempo acumulado según -X importtime)
+BUDGETS_MS = {
+    "mlkem": 20.0,
+    "mlkem.ML_KEM": 100.0,
+}
+
+def measure(module, repeats=5):
+    """
+    Mide el tiempo de importación de un módulo en un intérprete nuevo.
+
+    Se ejecuta `python -X importtime -c "import module"` repeats veces y se toma la mediana del
+    tiempo acumulado que el propio intérprete atribuye al módulo.
+
+    Entrada:
+    - module: nombre del módulo a importar (por ejemplo, "mlkem.ML_KEM")
+    - repeats: número de ejecuciones
+
+    Salida:
+    - Mediana del tiempo de importación en milisegundos
+    """
+    env = dict(os.environ)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env["PYTHONPATH"] = root + os.pathsep + env.get("PYTHONPATH", "")
+
+    samples = []
+    for _ in range(repeats):
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                              env=env, capture_output=True, text=True, check=True)
+        # Formato de cada línea: "import time: self [us] | cumulative | imported package"
+        for line in proc.stderr.splitlines():
+            fields = [x.strip() for x in line.split("|")]
+            if len(fields) == 3 and fields[2] == module:
+                samples.append(int(fields[1]) / 1000)
+    return statistics.median(samples)
+
+
+def main(argv=None):
+    """
+    Comprueba que los tiempos de importación no superan su presupuesto.
+
+    Uso: python -m mlkem.importtime [--repeats N] [--budget MODULO=MS ...]
+    """
+    parser = argparse.ArgumentParser(prog="python -m mlkem.importtime",
+                                     description="Tiempo de importación de mlkem frente a su presupuesto")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--budget", action="append", default=[], metavar="MODULO=MS",
+                        help="sustituye o añade un presupuesto (se puede repetir)")
+    args = parser.parse_args(argv)
+
+    budgets = dict(BUDGETS_MS)
+    for item in args.budget:
+        (module, ms) = item.split("=")
+        budgets[module] = float(ms)
+
+    failed = False
+    for (module, budget) in budgets.items():
+        ms = measure(module, args.repeats)
+        status = "OK" if ms <= budget else "EXCEDIDO"
+        failed = failed or ms > budget
+        print(f"{module:<24} {ms:8.2f} ms  (presupuesto {budget:.2f} ms)  {status}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,271 @@
+"""
+Keccak-f[1600] troceado por bits (bitslicing) sobre enteros de Python, para M instancias a la vez.
+
+Es la misma permutación que keccak.Keccak_f(1600), con el estado en la representación por bits de
+Keccak_p (la posición z del bit (x, y) de cada palabra), pero cada uno de los 1600 bits del estado
+es un entero que lleva ese bit de las M instancias: el bit de la instancia m está en la posición 8m
+(un byte por instancia, para que pasar bytes al estado y del estado a bytes se haga con
+int.from_bytes y unas pocas máscaras en lugar de bit a bit). Así, cada XOR o AND de θ y χ avanza
+las M esponjas a la vez, y ρ y π no hacen ninguna operación: solo reordenan la lista de enteros.
+
+Sirve para calcular en lote, sin NumPy, hashes independientes con entradas de la misma longitud,
+como las k² llamadas a XOF de la matriz A o las llamadas a PRF de un lote de cápsulas.
+"""
+from .keccak_lanes import ROUND_CONSTANTS
+
+def _rho_pi_sources():
+    """
+    Para cada bit de destino de π(ρ(A)), el índice del bit de origen en A.
+
+    Los bits se indexan como 64*(x + 5*y) + z, igual que la cadena de Keccak_p.__string_to_state.
+    """
+    offsets = [0] * 25
+    (x, y) = (1, 0)
+    for t in range(24):
+        offsets[x + 5 * y] = (t + 1) * (t + 2) // 2
+        (x, y) = (y, (2 * x + 3 * y) % 5)
+
+    sources = [0] * 1600
+    for x in range(5):
+        for y in range(5):
+            # π: A'[x][y] = A[(x + 3y) % 5][x]; ρ: A'[x][y][z] = A[x][y][(z - offset) % 64]
+            (sx, sy) = ((x + 3 * y) % 5, x)
+            for z in range(64):
+                sources[64 * (x + 5 * y) + z] = 64 * (sx + 5 * sy) + (z - offsets[sx + 5 * sy]) % 64
+    return sources
+
+
+RHO_PI_SOURCES = _rho_pi_sources()
+
+# Para cada bit de destino, la columna (x, z) de θ cuyo D se suma al bit de origen
+THETA_COLUMNS = [i % 320 for i in RHO_PI_SOURCES]
+
+# Bits z activos de la constante de ronda de ι en cada ronda
+ROUND_BITS = [[z for z in range(64) if (rc >> z) & 1] for rc in ROUND_CONSTANTS]
+
+def ones(count):
+    """
+    Entero con el bit 8m a 1 para cada instancia m < count (el valor 1 en todas las instancias).
+    """
+    return int.from_bytes(b"\x01" * count, 'little')
+
+
+def keccak_f1600_bitsliced(S, one):
+    """
+    Aplica las 24 rondas de Keccak-f[1600] a M instancias.
+
+    Entrada:
+    - S: lista de 1600 enteros, el bit 64*(x + 5*y) + z de las M instancias
+    - one: ones(M)
+
+    Salida:
+    - lista de 1600 enteros con el estado tras la permutación
+    """
+    sources = RHO_PI_SOURCES
+    columns = THETA_COLUMNS
+    for bits in ROUND_BITS:
+        # θ: paridades de columna C[x][z] y D[x][z] = C[x-1][z] ^ C[x+1][z-1]
+        C = [S[i] ^ S[i + 320] ^ S[i + 640] ^ S[i + 960] ^ S[i + 1280] for i in range(320)]
+        D = []
+        for x in range(5):
+            left = C[64 * ((x - 1) % 5) : 64 * ((x - 1) % 5) + 64]
+            right = C[64 * ((x + 1) % 5) : 64 * ((x + 1) % 5) + 64]
+            D += [l ^ r for (l, r) in zip(left, right[63:] + right[:63])]
+
+        # θ, ρ y π en una pasada: ρ y π solo cambian de sitio los bits
+        B = [S[i] ^ D[j] for (i, j) in zip(sources, columns)]
+
+        # χ: A[x] ^= ~A[x+1] & A[x+2] en cada fila, con las palabras de 64 bits como cortes de la lista
+        S = []
+        for y in range(0, 1600, 320):
+            (b0, b1, b2, b3, b4) = (B[y : y + 64], B[y + 64 : y + 128], B[y + 128 : y + 192],
+                                    B[y + 192 : y + 256], B[y + 256 : y + 320])
+            S += [a ^ (c & ~b) for (a, b, c) in zip(b0, b1, b2)]
+            S += [a ^ (c & ~b) for (a, b, c) in zip(b1, b2, b3)]
+            S += [a ^ (c & ~b) for (a, b, c) in zip(b2, b3, b4)]
+            S += [a ^ (c & ~b) for (a, b, c) in zip(b3, b4, b0)]
+            S += [a ^ (c & ~b) for (a, b, c) in zip(b4, b0, b1)]
+
+        # ι: la constante de ronda, que es la misma en todas las instancias
+        for z in bits:
+            S[z] ^= one
+    return S
+
+
+class BatchSponge:
+    """
+    M esponjas Keccak[c] que absorben entradas de la misma longitud y extraen en paralelo.
+
+    Entrada:
+    - rate: tasa en bytes (168 para SHAKE128, 136 para SHAKE256 y SHA3-256, 72 para SHA3-512)
+    - suffix: bits de dominio junto con el primer bit del padding pad10*1, como byte
+      (0x06 para SHA-3, 0x1F para SHAKE)
+    """
+
+    def __init__(self, rate, suffix):
+        self.__rate = rate
+        self.__suffix = suffix
+        self.__S = None
+        self.__one = None
+        self.__count = 0
+        self.__squeezed = False         # Si ya se entregó el bloque del estado actual
+
+    def __xor_block(self, columns):
+        """
+        XOR de un bloque de rate bytes por instancia; columns[p] lleva el byte p de las M instancias.
+        """
+        S = self.__S
+        one = self.__one
+        for (p, column) in enumerate(columns):
+            if column:
+                # Los 8 bits del byte p son los bits z = 8*(p % 8) .. de la palabra p // 8
+                base = 8 * p
+                for b in range(8):
+                    S[base + b] ^= (column >> b) & one
+        self.__S = keccak_f1600_bitsliced(S, self.__one)
+
+    def absorb(self, inputs):
+        """
+        Absorbe una entrada completa por instancia y aplica el padding.
+
+        Entrada:
+        - inputs: lista de M entradas bytes-like, todas de la misma longitud
+        """
+        assert(self.__S is None and len(inputs) >= 1)
+        length = len(inputs[0])
+        assert(all(len(data) == length for data in inputs))
+        self.__count = len(inputs)
+        rate = self.__rate
+        self.__one = ones(self.__count)
+        self.__S = [0] * 1600
+
+        # Padding pad10*1 con los bits de dominio: es el mismo en todas las instancias
+        padded_length = (length // rate + 1) * rate
+        padding = bytearray(padded_length - length)
+        padding[0] ^= self.__suffix
+        padding[-1] ^= 0x80
+        padding = bytes(padding)
+
+        for start in range(0, padded_length, rate):
+            columns = []
+            for p in range(start, start + rate):
+                if p < length:
+                    columns.append(int.from_bytes(bytes(data[p] for data in inputs), 'little'))
+                else:
+                    columns.append(padding[p - length] * self.__one)
+            self.__xor_block(columns)
+
+    def squeeze_block(self):
+        """
+        Extrae los rate bytes siguientes de cada instancia.
+
+        Salida:
+        - lista de M bloques de rate bytes
+        """
+        if self.__squeezed:
+            self.__S = keccak_f1600_bitsliced(self.__S, self.__one)
+        self.__squeezed = True
+        S = self.__S
+        count = self.__count
+        columns = []
+        for p in range(self.__rate):
+            base = 8 * p
+            column = 0
+            for b in range(8):
+                column |= S[base + b] << b
+            columns.append(column.to_bytes(count, 'little'))
+        # columns[p][m] es el byte p de la instancia m
+        return [bytes(block) for block in zip(*columns)]
+
+
+def _many(rate, suffix, inputs, n):
+    """
+    n bytes de salida de la esponja (rate, suffix) para cada entrada de inputs.
+    """
+    sponge = BatchSponge(rate, suffix)
+    sponge.absorb(inputs)
+    outputs = [b""] * len(inputs)
+    while len(outputs[0]) < n:
+        outputs = [out + block for (out, block) in zip(outputs, sponge.squeeze_block())]
+    return [out[:n] for out in outputs]
+
+
+def shake128_many(inputs, n):
+    """
+    SHAKE128 con n bytes de salida de cada entrada (todas de la misma longitud).
+    """
+    return _many(168, 0x1F, inputs, n)
+
+
+def shake256_many(inputs, n):
+    """
+    SHAKE256 con n bytes de salida de cada entrada (todas de la misma longitud).
+    """
+    return _many(136, 0x1F, inputs, n)
+
+
+def sha3_256_many(inputs):
+    """
+    SHA3-256 de cada entrada (todas de la misma longitud).
+    """
+    return _many(136, 0x06, inputs, 32)
+
+
+def sha3_512_many(inputs):
+    """
+    SHA3-512 de cada entrada (todas de la misma longitud).
+    """
+    return _many(72, 0x06, inputs, 64)
+
+
+def PRF_many(eta, s, bs):
+    """
+    PRF_eta(s_i, b_i) = SHAKE256(s_i || b_i, 8·64·eta) para cada par, en un único lote.
+
+    Entrada:
+    - eta: 2 o 3
+    - s: lista de semillas de 32 bytes
+    - bs: lista de enteros entre 0 y 255, uno por semilla
+
+    Salida:
+    - lista de salidas de 64·eta bytes
+    """
+    assert(eta == 2 or eta == 3)
+    assert(len(s) == len(bs) and all(len(x) == 32 for x in s) and all(0 <= b <= 255 for b in bs))
+    return shake256_many([bytes(x) + bytes([b]) for (x, b) in zip(s, bs)], 64 * eta)
+
+
+def SampleNTT_many(Bs):
+    """
+    SampleNTT (algoritmo 7 de FIPS 203) de varias semillas a la vez.
+
+    Las esponjas avanzan juntas: se extraen bloques de 168 bytes de todas hasta que cada instancia
+    tiene sus 256 coeficientes (normalmente tres bloques; una instancia que termina antes descarta
+    los bloques que sobran, que no afectan a su resultado).
+
+    Entrada:
+    - Bs: lista de semillas de 34 bytes (rho || j || i)
+
+    Salida:
+    - lista de polinomios en T_q, como [kernels.SampleNTT(B) for B in Bs]
+    """
+    assert(all(len(B) == 34 for B in Bs))
+    sponge = BatchSponge(168, 0x1F)
+    sponge.absorb([bytes(B) for B in Bs])
+    polys = [[] for _ in Bs]
+    pending = len(Bs)
+    while pending:
+        for (a, C) in zip(polys, sponge.squeeze_block()):
+            if len(a) == 256:
+                continue
+            for i in range(0, 168, 3):
+                d1 = C[i] + 256 * (C[i + 1] & 15)
+                d2 = (C[i + 1] >> 4) + 16 * C[i + 2]
+                if d1 < 3329:
+                    a.append(d1)
+                if d2 < 3329 and len(a) < 256:
+                    a.append(d2)
+                if len(a) == 256:
+                    pending -= 1
+                    break
+    return polys
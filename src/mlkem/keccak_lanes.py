@@ -0,0 +1,271 @@
+"""
+Keccak-f[1600] sobre palabras (lanes) de 64 bits.
+
+Es la misma permutación que keccak.Keccak_f(1600), pero el estado se representa como 25 enteros
+de 64 bits en lugar de 1600 bits sueltos, y la entrada y la salida son bytes. Es el núcleo de las
+funciones hash del motor optimizado (ver engine.py).
+
+Casi todas las entradas de ML-KEM son cortas y de longitud fija (G: 33 o 64 bytes, PRF: 33, XOF: 34)
+y caben con el padding en un solo bloque. Para ellas, sha3_256, sha3_512, shake128 y shake256 (y
+Sponge.single_block) construyen el bloque con una plantilla de padding precalculada por tasa,
+dominio y longitud y lo cargan en el estado con un único struct.unpack, sin pasar por la absorción
+incremental de Sponge. Las entradas largas (H(ek), J(z || c)) siguen la vía general.
+"""
+import struct
+from functools import lru_cache
+
+MASK = (1 << 64) - 1
+
+# Constantes de ronda RC de ι para las 24 rondas de Keccak-f[1600]
+ROUND_CONSTANTS = [
+    0x0000000000000001, 0x0000000000008082, 0x800000000000808A, 0x8000000080008000,
+    0x000000000000808B, 0x0000000080000001, 0x8000000080008081, 0x8000000000008009,
+    0x000000000000008A, 0x0000000000000088, 0x0000000080008009, 0x000000008000000A,
+    0x000000008000808B, 0x800000000000008B, 0x8000000000008089, 0x8000000000008003,
+    0x8000000000008002, 0x8000000000000080, 0x000000000000800A, 0x800000008000000A,
+    0x8000000080008081, 0x8000000000008080, 0x0000000080000001, 0x8000000080008008,
+]
+
+def _rho_pi_schedule():
+    """
+    Combina ρ y π en una única lista de (origen, destino, rotación) sobre índices x + 5*y.
+
+    Las rotaciones se obtienen con la misma recurrencia que Keccak_p.__rho, y π lleva la palabra
+    (x, y) a la posición (y, 2x + 3y).
+    """
+    rotations = [0] * 25
+    (x, y) = (1, 0)
+    for t in range(24):
+        rotations[x + 5 * y] = ((t + 1) * (t + 2) // 2) % 64
+        (x, y) = (y, (2 * x + 3 * y) % 5)
+
+    schedule = []
+    for x in range(5):
+        for y in range(5):
+            schedule.append((x + 5 * y, y + 5 * ((2 * x + 3 * y) % 5), rotations[x + 5 * y]))
+    return schedule
+
+
+RHO_PI = _rho_pi_schedule()
+
+def keccak_f1600(A):
+    """
+    Aplica las 24 rondas de Keccak-f[1600] al estado A en su sitio.
+
+    Entrada:
+    - A: lista de 25 enteros de 64 bits, la palabra (x, y) en la posición x + 5*y
+    """
+    B = [0] * 25
+    for rc in ROUND_CONSTANTS:
+        # θ: paridad de columnas y mezcla con las columnas vecinas
+        C0 = A[0] ^ A[5] ^ A[10] ^ A[15] ^ A[20]
+        C1 = A[1] ^ A[6] ^ A[11] ^ A[16] ^ A[21]
+        C2 = A[2] ^ A[7] ^ A[12] ^ A[17] ^ A[22]
+        C3 = A[3] ^ A[8] ^ A[13] ^ A[18] ^ A[23]
+        C4 = A[4] ^ A[9] ^ A[14] ^ A[19] ^ A[24]
+        D = (C4 ^ (((C1 << 1) | (C1 >> 63)) & MASK),
+             C0 ^ (((C2 << 1) | (C2 >> 63)) & MASK),
+             C1 ^ (((C3 << 1) | (C3 >> 63)) & MASK),
+             C2 ^ (((C4 << 1) | (C4 >> 63)) & MASK),
+             C3 ^ (((C0 << 1) | (C0 >> 63)) & MASK))
+
+        # ρ y π: rotación de cada palabra y permutación de posiciones
+        for (src, dst, r) in RHO_PI:
+            a = A[src] ^ D[src % 5]
+            B[dst] = ((a << r) | (a >> (64 - r))) & MASK if r else a
+
+        # χ: paso no lineal por filas
+        for y in range(0, 25, 5):
+            b0, b1, b2, b3, b4 = B[y], B[y + 1], B[y + 2], B[y + 3], B[y + 4]
+            A[y] = b0 ^ (~b1 & b2)
+            A[y + 1] = b1 ^ (~b2 & b3)
+            A[y + 2] = b2 ^ (~b3 & b4)
+            A[y + 3] = b3 ^ (~b4 & b0)
+            A[y + 4] = b4 ^ (~b0 & b1)
+
+        # ι: constante de ronda
+        A[0] ^= rc
+
+
+# Conversión entre un bloque de rate bytes y sus rate/8 palabras de 64 bits
+_BLOCKS = {rate: struct.Struct(f"<{rate // 8}Q") for rate in (72, 136, 168)}
+
+@lru_cache(maxsize=None)
+def _padding(rate, suffix, length):
+    """
+    Plantilla de padding pad10*1, con los bits de dominio, para un mensaje de length < rate bytes.
+
+    Salida:
+    - los rate - length bytes que completan el único bloque del mensaje
+    """
+    assert(0 <= length < rate)
+    padding = bytearray(rate - length)
+    padding[0] ^= suffix
+    padding[-1] ^= 0x80
+    return bytes(padding)
+
+
+def _absorb_single_block(rate, suffix, data):
+    """
+    Estado de Keccak tras absorber un mensaje que cabe en un solo bloque (len(data) < rate).
+    """
+    A = list(_BLOCKS[rate].unpack(bytes(data) + _padding(rate, suffix, len(data))))
+    A += [0] * (25 - len(A))
+    keccak_f1600(A)
+    return A
+
+
+def _squeeze(rate, A, n):
+    """
+    n bytes de salida a partir del estado A recién absorbido (A se modifica si n > rate).
+    """
+    block = _BLOCKS[rate]
+    words = rate // 8
+    out = block.pack(*A[:words])
+    while len(out) < n:
+        keccak_f1600(A)
+        out += block.pack(*A[:words])
+    return out[:n]
+
+
+class Sponge:
+    """
+    Esponja Keccak[c] sobre bytes con absorción y extracción incrementales.
+
+    Entrada:
+    - rate: tasa en bytes (168 para SHAKE128, 136 para SHAKE256 y SHA3-256, 72 para SHA3-512)
+    - suffix: bits de dominio junto con el primer bit del padding pad10*1, como byte
+      (0x06 para SHA-3, 0x1F para SHAKE)
+    """
+
+    def __init__(self, rate, suffix):
+        self.__rate = rate
+        self.__suffix = suffix
+        self.__A = [0] * 25
+        self.__buffer = bytearray()     # Bytes absorbidos que aún no completan un bloque
+        self.__out = b""                # Bytes extraídos del bloque actual aún no entregados
+        self.__squeezing = False
+
+    @classmethod
+    def single_block(cls, rate, suffix, data):
+        """
+        Esponja ya en fase de extracción tras absorber data (cualquier objeto bytes-like), por la vía
+        de un solo bloque si data cabe en él y por la general en otro caso.
+        """
+        sponge = cls(rate, suffix)
+        if len(data) >= rate:
+            sponge.absorb(data)
+            return sponge
+        sponge.__A = _absorb_single_block(rate, suffix, data)
+        sponge.__buffer = None
+        sponge.__squeezing = True
+        sponge.__out = sponge.__block_bytes()
+        return sponge
+
+    def __absorb_block(self, block, offset=0):
+        A = self.__A
+        for i in range(self.__rate // 8):
+            A[i] ^= int.from_bytes(block[offset + 8 * i : offset + 8 * i + 8], 'little')
+        keccak_f1600(A)
+
+    def absorb(self, data):
+        """
+        Absorbe data (cualquier objeto bytes-like); puede llamarse varias veces antes de extraer.
+        """
+        assert(not self.__squeezing)
+        data = memoryview(data).cast('B')
+        rate = self.__rate
+        pos = 0
+
+        # Se completa primero el bloque parcial pendiente
+        if self.__buffer:
+            take = min(rate - len(self.__buffer), len(data))
+            self.__buffer += data[:take]
+            pos = take
+            if len(self.__buffer) < rate:
+                return
+            self.__absorb_block(self.__buffer)
+            self.__buffer = bytearray()
+
+        # Bloques completos directamente desde la entrada, sin copiarlos
+        while len(data) - pos >= rate:
+            self.__absorb_block(data, pos)
+            pos += rate
+        self.__buffer += data[pos:]
+
+    def __finish(self):
+        """
+        Aplica el padding pad10*1 con los bits de dominio y absorbe el último bloque.
+        """
+        block = self.__buffer + bytes(self.__rate - len(self.__buffer))
+        block[len(self.__buffer)] ^= self.__suffix
+        block[self.__rate - 1] ^= 0x80
+        self.__absorb_block(block)
+        self.__buffer = None
+        self.__squeezing = True
+        self.__out = self.__block_bytes()
+
+    def __block_bytes(self):
+        return _BLOCKS[self.__rate].pack(*self.__A[:self.__rate // 8])
+
+    def squeeze(self, n):
+        """
+        Extrae los siguientes n bytes de salida (las llamadas sucesivas continúan el flujo).
+        """
+        if not self.__squeezing:
+            self.__finish()
+
+        parts = []
+        while n > 0:
+            if not self.__out:
+                keccak_f1600(self.__A)
+                self.__out = self.__block_bytes()
+            take = min(n, len(self.__out))
+            parts.append(self.__out[:take])
+            self.__out = self.__out[take:]
+            n -= take
+        return b"".join(parts)
+
+
+def sha3_256(data):
+    """
+    SHA3-256 de data (bytes-like); devuelve 32 bytes.
+    """
+    if len(data) < 136:
+        return _squeeze(136, _absorb_single_block(136, 0x06, data), 32)
+    sponge = Sponge(136, 0x06)
+    sponge.absorb(data)
+    return sponge.squeeze(32)
+
+
+def sha3_512(data):
+    """
+    SHA3-512 de data (bytes-like); devuelve 64 bytes.
+    """
+    if len(data) < 72:
+        return _squeeze(72, _absorb_single_block(72, 0x06, data), 64)
+    sponge = Sponge(72, 0x06)
+    sponge.absorb(data)
+    return sponge.squeeze(64)
+
+
+def shake128(data, n):
+    """
+    SHAKE128 de data (bytes-like) con n bytes de salida.
+    """
+    if len(data) < 168:
+        return _squeeze(168, _absorb_single_block(168, 0x1F, data), n)
+    sponge = Sponge(168, 0x1F)
+    sponge.absorb(data)
+    return sponge.squeeze(n)
+
+
+def shake256(data, n):
+    """
+    SHAKE256 de data (bytes-like) con n bytes de salida.
+    """
+    if len(data) < 136:
+        return _squeeze(136, _absorb_single_block(136, 0x1F, data), n)
+    sponge = Sponge(136, 0x1F)
+    sponge.absorb(data)
+    return sponge.squeeze(n)
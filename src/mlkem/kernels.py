@@ -0,0 +1,322 @@
+"""
+Núcleos optimizados del motor "optimized" (ver engine.py).
+
+Cada función produce exactamente el mismo resultado que su equivalente de referencia en keccak.py,
+sampling.py, ntt.py o conversions.py, pero trabaja sobre bytes y palabras en lugar de listas de
+bits y evita recalcular lo que puede tabularse.
+"""
+from functools import lru_cache
+from .keccak_lanes import Sponge, sha3_256, sha3_512, shake256
+from .conversions import Compress, Decompress
+from .ntt import zetas, zetas_2
+from .profiling import instrumented
+from . import swar
+
+q = 3329
+
+# ---------------------------------------------------------------------------
+# Funciones hash (FIPS 203, sección 4.1)
+# ---------------------------------------------------------------------------
+
+@instrumented("H")
+def H(s):
+    """
+    H(s) = SHA3-256(s); devuelve 32 bytes.
+    """
+    return sha3_256(s)
+
+
+@instrumented("J")
+def J(s):
+    """
+    J(s) = SHAKE256(s, 8·32); devuelve 32 bytes.
+    """
+    return shake256(s, 32)
+
+
+@instrumented("G")
+def G(c):
+    """
+    G(c) = SHA3-512(c) partido en dos mitades de 32 bytes.
+    """
+    g = sha3_512(c)
+    return g[:32], g[32:]
+
+
+@instrumented("PRF")
+def PRF(eta, s, b):
+    """
+    PRF_eta(s, b) = SHAKE256(s || b, 8·64·eta); devuelve 64·eta bytes.
+    """
+    assert(eta == 2 or eta == 3)
+    assert(len(s) == 32)
+    assert(0 <= b <= 255)
+
+    return shake256(bytes(s) + bytes([b]), 64 * eta)
+
+
+class XOF:
+    """
+    XOF de FIPS 203 (SHAKE128) con la misma interfaz que keccak.XOF: absorb(bytes) y squeeze(l).
+    """
+
+    def __init__(self):
+        self.__sponge = Sponge(168, 0x1F)
+
+    def absorb(self, N):
+        self.__sponge.absorb(bytes(N))
+
+    def squeeze(self, l):
+        return self.__sponge.squeeze(l)
+
+
+# ---------------------------------------------------------------------------
+# Muestreo (FIPS 203, sección 4.2.2)
+# ---------------------------------------------------------------------------
+
+@instrumented("SampleNTT")
+def SampleNTT(B):
+    """
+    Algoritmo 7 (SampleNTT) extrayendo bloques completos de 168 bytes (56 grupos de 3 bytes)
+    en lugar de 3 bytes por iteración.
+    """
+    assert(len(B) == 34)
+
+    xof = Sponge.single_block(168, 0x1F, B)     # rho || j || i cabe en un bloque
+
+    a = []
+    while True:
+        C = xof.squeeze(168)
+        for i in range(0, 168, 3):
+            d1 = C[i] + 256 * (C[i + 1] & 15)
+            d2 = (C[i + 1] >> 4) + 16 * C[i + 2]
+            if d1 < q:
+                a.append(d1)
+                if len(a) == 256:
+                    return a
+            if d2 < q:
+                a.append(d2)
+                if len(a) == 256:
+                    return a
+
+
+@lru_cache(maxsize=None)
+def _cbd_table(eta):
+    """
+    Tabla de 2^(2·eta) entradas: para cada grupo de 2·eta bits, el coeficiente (x - y) mod q, donde x
+    es el número de unos en los eta bits bajos e y en los eta bits altos.
+    """
+    low = (1 << eta) - 1
+    return [(bin(v & low).count("1") - bin(v >> eta).count("1")) % q for v in range(1 << (2 * eta))]
+
+
+@instrumented("SamplePolyCBD")
+def SamplePolyCBD(eta, B):
+    """
+    Algoritmo 8 (SamplePolyCBD) con una tabla por grupo de 2·eta bits.
+    """
+    assert(eta == 2 or eta == 3)
+    assert(len(B) == 64 * eta)
+
+    T = _cbd_table(eta)
+    if eta == 2:
+        # Cada byte contiene dos coeficientes de 4 bits
+        f = []
+        for b in bytes(B):
+            f.append(T[b & 15])
+            f.append(T[b >> 4])
+        return f
+
+    # eta = 3: cada grupo de 3 bytes contiene cuatro coeficientes de 6 bits
+    f = []
+    for i in range(0, 192, 3):
+        w = B[i] | (B[i + 1] << 8) | (B[i + 2] << 16)
+        f.append(T[w & 63])
+        f.append(T[(w >> 6) & 63])
+        f.append(T[(w >> 12) & 63])
+        f.append(T[w >> 18])
+    return f
+
+
+# ---------------------------------------------------------------------------
+# NTT y aritmética en T_q (FIPS 203, sección 4.3)
+# ---------------------------------------------------------------------------
+
+def _ntt_schedule(inverse):
+    """
+    Lista de capas (l, [(start, zeta), ...]) en el orden en que las recorren NTT o INTT.
+    """
+    layers = []
+    if not inverse:
+        (i, l) = (1, 128)
+        while l >= 2:
+            layers.append((l, [(start, zetas[i + n]) for (n, start) in enumerate(range(0, 256, 2 * l))]))
+            i += 256 // (2 * l)
+            l //= 2
+    else:
+        (i, l) = (127, 2)
+        while l <= 128:
+            layers.append((l, [(start, zetas[i - n]) for (n, start) in enumerate(range(0, 256, 2 * l))]))
+            i -= 256 // (2 * l)
+            l *= 2
+    return layers
+
+
+_NTT_LAYERS = _ntt_schedule(False)
+_INTT_LAYERS = _ntt_schedule(True)
+
+@instrumented("NTT")
+def NTT(f):
+    """
+    Algoritmo 9 (NTT): cada grupo de mariposas se calcula con listas por comprensión sobre
+    cortes de la lista en lugar de coeficiente a coeficiente.
+    """
+    assert(len(f) == 256)
+
+    f = list(f)
+    for (l, blocks) in _NTT_LAYERS:
+        for (start, zeta) in blocks:
+            lo = f[start : start + l]
+            t = [(zeta * x) % q for x in f[start + l : start + 2 * l]]
+            f[start : start + l] = [(a + b) % q for (a, b) in zip(lo, t)]
+            f[start + l : start + 2 * l] = [(a - b) % q for (a, b) in zip(lo, t)]
+    return f
+
+
+@instrumented("INTT")
+def INTT(f_gorro):
+    """
+    Algoritmo 10 (NTT^{-1}) con la misma técnica que NTT.
+    """
+    assert(len(f_gorro) == 256)
+
+    f = list(f_gorro)
+    for (l, blocks) in _INTT_LAYERS:
+        for (start, zeta) in blocks:
+            lo = f[start : start + l]
+            hi = f[start + l : start + 2 * l]
+            f[start : start + l] = [(a + b) % q for (a, b) in zip(lo, hi)]
+            f[start + l : start + 2 * l] = [(zeta * (b - a)) % q for (a, b) in zip(lo, hi)]
+    return [(x * 3303) % q for x in f]
+
+
+@instrumented("MultiplyNTTs")
+def MultiplyNTTs(f_gorro, g_gorro):
+    """
+    Algoritmo 11 (MultiplyNTTs) con BaseCaseMultiply integrado en el bucle.
+    """
+    assert(len(f_gorro) == 256 and len(g_gorro) == 256)
+
+    h = [0] * 256
+    for i in range(128):
+        (a0, a1, b0, b1) = (f_gorro[2 * i], f_gorro[2 * i + 1], g_gorro[2 * i], g_gorro[2 * i + 1])
+        h[2 * i] = (a0 * b0 + a1 * b1 * zetas_2[i]) % q
+        h[2 * i + 1] = (a0 * b1 + a1 * b0) % q
+    return h
+
+
+def SumNTTs(f_gorro, g_gorro):
+    """
+    Suma coeficiente a coeficiente módulo q.
+    """
+    return [(x + y) % q for (x, y) in zip(f_gorro, g_gorro)]
+
+
+def SubtractNTTs(f_gorro, g_gorro):
+    """
+    Resta coeficiente a coeficiente módulo q.
+    """
+    return [(x - y) % q for (x, y) in zip(f_gorro, g_gorro)]
+
+
+def SumManyNTTs(polys):
+    """
+    Suma módulo q de varios polinomios con aritmética SWAR (swar.py): se empaqueta cada sumando,
+    se suman los enteros y se reduce una sola vez. Para dos sumandos la conversión no compensa y se
+    usa SumNTTs.
+    """
+    if len(polys) <= 2:
+        return polys[0] if len(polys) == 1 else SumNTTs(polys[0], polys[1])
+    return swar.unpack(swar.sum_mod([swar.pack(f) for f in polys]))
+
+
+# ---------------------------------------------------------------------------
+# Codificación y compresión (FIPS 203, sección 4.2.1)
+# ---------------------------------------------------------------------------
+
+@instrumented("ByteEncode")
+def ByteEncode_into(d, F, out, offset=0):
+    """
+    Algoritmo 5 (ByteEncode): cada grupo de 8 enteros de d bits forma exactamente d bytes, que se
+    empaquetan en una palabra y se escriben de una vez en out.
+    """
+    assert(len(F) == 256)
+    assert(1 <= d <= 12)
+    assert(len(out) >= offset + 32 * d)
+
+    if d == 12:
+        # Claves: conversión directa de carriles de 16 bits a grupos de 12 bits (swar.to_bytes12)
+        out[offset : offset + 384] = swar.to_bytes12(swar.pack(F))
+        return
+
+    mask = (1 << d) - 1
+    for i in range(32):
+        w = 0
+        for j in range(7, -1, -1):
+            w = (w << d) | (F[8 * i + j] & mask)
+        out[offset + d * i : offset + d * (i + 1)] = w.to_bytes(d, 'little')
+
+
+@instrumented("ByteDecode")
+def ByteDecode(d, B):
+    """
+    Algoritmo 6 (ByteDecode): cada grupo de d bytes se lee como una palabra de la que se extraen
+    8 enteros de d bits.
+    """
+    assert(len(B) == 32 * d)
+    assert(1 <= d <= 12)
+
+    if d == 12:
+        # Claves: grupos de 12 bits a carriles de 16 bits (swar.from_bytes12) y reducción módulo q por carriles
+        return swar.unpack(swar.reduce_once(swar.from_bytes12(B)))
+
+    mask = (1 << d) - 1
+    F = []
+    for i in range(32):
+        w = int.from_bytes(B[d * i : d * (i + 1)], 'little')
+        for _ in range(8):
+            F.append(w & mask)
+            w >>= d
+    return F
+
+
+@lru_cache(maxsize=None)
+def _compress_table(d):
+    """
+    Tabla de q entradas con Compress_d(x) para cada x en [0, q), calculada con la función de referencia.
+    """
+    return [Compress(d, x) for x in range(q)]
+
+
+@lru_cache(maxsize=None)
+def _decompress_table(d):
+    """
+    Tabla de 2^d entradas con Decompress_d(y), calculada con la función de referencia.
+    """
+    return [Decompress(d, y) for y in range(1 << d)]
+
+
+def Compress_poly(d, F):
+    """
+    Compress_d aplicado a cada coeficiente de F mediante una tabla.
+    """
+    T = _compress_table(d)
+    return [T[x] for x in F]
+
+
+def Decompress_poly(d, F):
+    """
+    Decompress_d aplicado a cada coeficiente de F mediante una tabla.
+    """
+    T = _decompress_table(d)
+    return [T[y] for y in F]
@@ -0,0 +1,280 @@
+import fcntl
+import mmap
+import os
+import struct
+import threading
+import weakref
+
+# Reserva persistente de pares de claves ya generados, de un solo uso, en un fichero proyectado
+# en memoria y compartible entre procesos.
+#
+# Formato del fichero (todos los enteros en little-endian):
+#
+#   cabecera (64 bytes):
+#     magic (8) | versión (u16) | k (u8) | relleno (u8) | tamaño de registro (u32) | capacidad (u64)
+#     | cabeza (u64) | cola (u64) | relleno
+#   capacidad registros de tamaño fijo, a partir del byte 64, usados como buffer circular:
+#     dk (768*k + 96 bytes; ek se obtiene de dk, que la contiene)
+#
+# Los pares disponibles son los de los índices [cabeza, cola); el registro del índice i está en la
+# posición i % capacidad. Cabeza y cola solo crecen, por lo que un par consumido no se vuelve a
+# entregar nunca, ni siquiera tras reiniciar: al consumirlo se avanza la cabeza (y se sincroniza con
+# disco) antes de borrar el registro, de modo que una caída entre ambos pasos solo puede dejar en el
+# fichero un registro fuera de [cabeza, cola), nunca uno disponible ya borrado. Un registro
+# disponible que está a cero (fichero dañado) se descarta en lugar de entregarse.
+MAGIC = b"MLKEMKP1"
+VERSION = 1
+HEADER = struct.Struct("<8sHBBIQQQ")
+HEADER_SIZE = 64
+_HEAD_TAIL = struct.Struct("<QQ")
+_HEAD_OFFSET = 24
+
+# Todos los pools abiertos, para rehacer sus cerrojos en los procesos hijos tras un fork
+_open_pools = weakref.WeakSet()
+
+def _after_fork_in_child():
+    for pool in list(_open_pools):
+        pool._KeyPool__thread_lock = threading.Lock()
+        pool._KeyPool__reopen()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def create_keypool(path, param_set, capacity):
+    """
+    Crea un fichero de reserva de claves vacío.
+
+    Entrada:
+    - path: ruta del fichero a crear (falla si ya existe, para no descartar claves sin querer)
+    - param_set: nivel de seguridad (512, 768 o 1024)
+    - capacity: número máximo de pares de claves almacenados a la vez
+    """
+    assert(param_set in (512, 768, 1024))
+    assert(capacity >= 1)
+    k = param_set // 256
+    record_size = 768 * k + 96
+    fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_EXCL, 0o600)
+    with open(fd, "r+b") as f:
+        f.truncate(HEADER_SIZE + capacity * record_size)
+        f.write(HEADER.pack(MAGIC, VERSION, k, 0, record_size, capacity, 0, 0))
+
+
+class KeyPool:
+    """
+    Reserva de pares de claves de un solo uso guardada en un fichero proyectado con mmap.
+
+    Varios procesos (y varios hilos de cada uno) pueden abrir el mismo fichero y consumir o reponer
+    pares a la vez: las operaciones sobre la cabecera se serializan con un cerrojo flock sobre el
+    fichero, de modo que cada par se entrega a un único consumidor. Al reiniciar un servicio, o en un
+    proceso hijo recién creado, basta con abrir el fichero para tener claves disponibles al momento.
+
+    El cerrojo pertenece a la descripción de fichero abierta por cada instancia, no al proceso (no se
+    usan cerrojos de registro POSIX, que se pierden al cerrar cualquier descriptor del fichero en el
+    proceso), así que varias instancias sobre la misma ruta en un mismo proceso se excluyen entre sí y
+    cerrar una no afecta a las demás. Tras un fork el hijo vuelve a abrir el fichero por su ruta para
+    no compartir el cerrojo del padre: si la ruta se ha sustituido entretanto, la instancia heredada
+    deja de poder usarse (OSError) y hay que abrir otra. flock no es fiable sobre sistemas de ficheros
+    en red, donde el fichero debe usarse desde una sola máquina.
+    """
+
+    def __init__(self, path, durable=True):
+        """
+        Entrada:
+        - path: ruta de un fichero creado con create_keypool
+        - durable: sincronizar con disco la cabecera y el registro tras cada consumo y cada
+          reposición, para que un corte de alimentación no pueda hacer reutilizar un par ya entregado
+          ni dejar en disco la clave privada de un par consumido
+        """
+        self.__path = path
+        self.__file = open(path, "r+b")
+        stat = os.fstat(self.__file.fileno())
+        self.__inode = (stat.st_dev, stat.st_ino)
+        self.__mmap = mmap.mmap(self.__file.fileno(), 0)
+        self.__durable = durable
+        self.__thread_lock = threading.Lock()
+
+        if len(self.__mmap) < HEADER_SIZE:
+            self.close()
+            raise ValueError("fichero de reserva de claves truncado")
+        (magic, version, k, _, record_size, capacity, _, _) = HEADER.unpack_from(self.__mmap)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError("el fichero no es una reserva de claves ML-KEM compatible")
+        if k not in (2, 3, 4) or record_size != 768 * k + 96 or len(self.__mmap) < HEADER_SIZE + capacity * record_size:
+            self.close()
+            raise ValueError("reserva de claves corrupta")
+        self.__k = k
+        self.__record_size = record_size
+        self.__capacity = capacity
+        self.__empty_record = bytes(record_size)
+        _open_pools.add(self)
+
+    @property
+    def param_set(self):
+        """
+        Nivel de seguridad de las claves de la reserva (512, 768 o 1024).
+        """
+        return 256 * self.__k
+
+    @property
+    def capacity(self):
+        return self.__capacity
+
+    def __reopen(self):
+        """
+        Vuelve a abrir el fichero en un proceso hijo recién creado, para que su cerrojo no sea el de la
+        descripción de fichero heredada del padre. La proyección heredada sigue siendo válida.
+        """
+        if self.__file is None:
+            return
+        # Cerrar la copia heredada no libera el cerrojo del padre, que sigue abriendo esa descripción
+        self.__file.close()
+        self.__file = None
+        try:
+            file = open(self.__path, "r+b")
+        except OSError:
+            return
+        stat = os.fstat(file.fileno())
+        if (stat.st_dev, stat.st_ino) != self.__inode:
+            file.close()
+            return
+        self.__file = file
+
+    def __lock(self):
+        """
+        Toma el cerrojo del fichero: primero entre hilos de la instancia y después entre descripciones
+        de fichero abiertas (otras instancias y otros procesos).
+        """
+        self.__thread_lock.acquire()
+        try:
+            if self.__file is None:
+                raise OSError("el fichero de la reserva de claves se ha sustituido o no se pudo reabrir")
+            fcntl.flock(self.__file.fileno(), fcntl.LOCK_EX)
+        except BaseException:
+            self.__thread_lock.release()
+            raise
+
+    def __unlock(self):
+        try:
+            fcntl.flock(self.__file.fileno(), fcntl.LOCK_UN)
+        finally:
+            self.__thread_lock.release()
+
+    def __slot(self, index):
+        pos = HEADER_SIZE + (index % self.__capacity) * self.__record_size
+        return (pos, pos + self.__record_size)
+
+    def __flush_record(self, start, end):
+        """
+        Sincroniza con disco un registro (flush exige un desplazamiento alineado).
+        """
+        aligned = start - start % mmap.ALLOCATIONGRANULARITY
+        self.__mmap.flush(aligned, end - aligned)
+
+    def __len__(self):
+        """
+        Número de pares disponibles.
+        """
+        self.__lock()
+        try:
+            (head, tail) = _HEAD_TAIL.unpack_from(self.__mmap, _HEAD_OFFSET)
+        finally:
+            self.__unlock()
+        return tail - head
+
+    def take(self):
+        """
+        Consume un par de claves de la reserva.
+
+        Salida:
+        - (ek, dk) como bytes, o None si la reserva está vacía
+        """
+        self.__lock()
+        try:
+            while True:
+                (head, tail) = _HEAD_TAIL.unpack_from(self.__mmap, _HEAD_OFFSET)
+                if head == tail:
+                    return None
+                (start, end) = self.__slot(head)
+                dk = self.__mmap[start:end]
+                # Primero se publica el consumo y después se borra el registro
+                _HEAD_TAIL.pack_into(self.__mmap, _HEAD_OFFSET, head + 1, tail)
+                if self.__durable:
+                    self.__mmap.flush(0, HEADER_SIZE)
+                self.__mmap[start:end] = self.__empty_record
+                if self.__durable:
+                    self.__flush_record(start, end)
+                if dk != self.__empty_record:
+                    break
+        finally:
+            self.__unlock()
+
+        k = self.__k
+        return dk[384 * k : 768 * k + 32], dk
+
+    def take_or_generate(self, ml_kem):
+        """
+        Consume un par de la reserva o, si está vacía, genera uno nuevo con ml_kem.KeyGen.
+        """
+        pair = self.take()
+        return ml_kem.KeyGen() if pair is None else pair
+
+    def refill(self, ml_kem, count=None):
+        """
+        Genera pares de claves nuevos y los añade a la reserva.
+
+        Cada par se genera fuera del cerrojo (KeyGen es lento) y solo se copia a su registro y se
+        publica avanzando la cola con el cerrojo tomado, así que los consumidores no esperan.
+
+        Entrada:
+        - ml_kem: instancia de ML_KEM (o ML_KEM_512/768/1024) del nivel de seguridad de la reserva
+        - count: número de pares a añadir (por defecto, hasta llenar la reserva)
+
+        Salida:
+        - número de pares añadidos
+        """
+        k = self.__k
+        ek = bytearray(384 * k + 32)
+        dk = bytearray(self.__record_size)
+        added = 0
+        while count is None or added < count:
+            if len(self) >= self.__capacity:
+                break
+            ml_kem.KeyGen_into(ek, dk)
+
+            self.__lock()
+            try:
+                (head, tail) = _HEAD_TAIL.unpack_from(self.__mmap, _HEAD_OFFSET)
+                if tail - head >= self.__capacity:
+                    break       # Otro proceso la ha llenado mientras tanto
+                (start, end) = self.__slot(tail)
+                self.__mmap[start:end] = dk
+                if self.__durable:
+                    self.__flush_record(start, end)
+                _HEAD_TAIL.pack_into(self.__mmap, _HEAD_OFFSET, head, tail + 1)
+                if self.__durable:
+                    self.__mmap.flush(0, HEADER_SIZE)
+            finally:
+                self.__unlock()
+            added += 1
+
+        dk[:] = bytes(len(dk))
+        return added
+
+    def close(self):
+        """
+        Libera la proyección en memoria y cierra el fichero.
+        """
+        if self.__mmap is not None:
+            self.__mmap.close()
+            self.__mmap = None
+            if self.__file is not None:
+                self.__file.close()
+        _open_pools.discard(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,365 @@
+import mmap
+import struct
+from hashlib import blake2b
+from .conversions import bytes_view
+
+# Formato del fichero (todos los enteros en little-endian):
+#
+#   cabecera (64 bytes):
+#     magic (8) | versión (u16) | k (u8) | campos (u8) | tamaño del id (u16) | tamaño de registro (u32)
+#     | número de registros (u64) | desplazamiento del índice (u64) | entradas del índice (u64) | relleno
+#   registros de tamaño fijo, a partir del byte 64:
+#     id | ek (si FIELD_EK) | dk (si FIELD_DK) | semilla d || z (si FIELD_SEED)
+#   índice: tabla hash de direccionamiento abierto (sondeo lineal) con entradas id | nº de registro + 1 (u64),
+#     donde 0 indica una entrada vacía
+MAGIC = b"MLKEMKR1"
+VERSION = 1
+HEADER = struct.Struct("<8sHBBHIQQQ")
+HEADER_SIZE = 64
+
+FIELD_EK = 1
+FIELD_DK = 2
+FIELD_SEED = 4
+
+def _field_sizes(k):
+    """
+    Devuelve los tamaños en bytes de ek, dk y semilla para el parámetro k.
+    """
+    return {FIELD_EK: 384 * k + 32, FIELD_DK: 768 * k + 96, FIELD_SEED: 64}
+
+
+def _k_for(param_set):
+    """
+    Convierte un nivel de seguridad (512, 768 o 1024) en el parámetro k del esquema.
+    """
+    assert(param_set in (512, 768, 1024))
+    return param_set // 256
+
+
+def _slot(key_id, entries):
+    """
+    Posición inicial de key_id en la tabla hash del índice (entries es potencia de 2).
+    """
+    return int.from_bytes(blake2b(key_id, digest_size=8).digest(), 'little') & (entries - 1)
+
+
+class _Layout:
+    """
+    Disposición de los registros de un anillo de claves: tamaño y desplazamiento de cada campo.
+    """
+
+    def __init__(self, k, fields, id_size):
+        assert(k in (2, 3, 4))
+        assert(fields != 0 and fields & ~(FIELD_EK | FIELD_DK | FIELD_SEED) == 0)
+        assert(1 <= id_size <= 255)
+        self.k = k
+        self.fields = fields
+        self.id_size = id_size
+        self.offsets = {}
+
+        pos = id_size
+        for (field, size) in _field_sizes(k).items():
+            if fields & field:
+                self.offsets[field] = (pos, pos + size)
+                pos += size
+        self.record_size = pos
+
+    def normalize_id(self, key_id):
+        """
+        Convierte key_id (str o bytes) en un identificador de tamaño fijo rellenado con ceros.
+
+        Los identificadores no pueden contener bytes nulos: con el relleno, b"a" y b"a\x00" serían
+        el mismo identificador.
+        """
+        if isinstance(key_id, str):
+            key_id = key_id.encode()
+        key_id = bytes(key_id)
+        assert(len(key_id) <= self.id_size and b"\x00" not in key_id)
+        return key_id.ljust(self.id_size, b"\x00")
+
+
+class KeyringWriter:
+    """
+    Escritor en streaming de un anillo de claves: los registros se escriben en disco conforme se
+    añaden y el índice se construye al cerrar recorriendo el propio fichero, sin cargarlo en memoria.
+    """
+
+    def __init__(self, path, param_set, fields=FIELD_EK | FIELD_DK, id_size=16):
+        """
+        Entrada:
+        - path: ruta del fichero a crear (se sobrescribe si existe)
+        - param_set: nivel de seguridad (512, 768 o 1024)
+        - fields: combinación de FIELD_EK, FIELD_DK y FIELD_SEED que contiene cada registro
+        - id_size: tamaño fijo en bytes de los identificadores de clave
+        """
+        self.__layout = _Layout(_k_for(param_set), fields, id_size)
+        self.__file = open(path, "wb+")
+        self.__file.write(bytes(HEADER_SIZE))
+        self.__count = 0
+
+    def add(self, key_id, ek=None, dk=None, seed=None):
+        """
+        Añade un registro al final del fichero.
+
+        Entrada:
+        - key_id: identificador de la clave (str o bytes de como mucho id_size bytes, sin bytes nulos)
+        - ek, dk, seed: campos del registro; deben darse exactamente los declarados en fields
+        """
+        layout = self.__layout
+        values = {FIELD_EK: ek, FIELD_DK: dk, FIELD_SEED: seed}
+
+        self.__file.write(layout.normalize_id(key_id))
+        for (field, size) in _field_sizes(layout.k).items():
+            value = values[field]
+            assert((value is not None) == bool(layout.fields & field))
+            if value is not None:
+                value = bytes_view(value)
+                assert(len(value) == size)
+                self.__file.write(value)
+        self.__count += 1
+
+    def add_many(self, records):
+        """
+        Importa en bloque registros de un iterable, sin materializarlo.
+
+        Entrada:
+        - records: iterable de tuplas (key_id, ek, dk, seed), con None en los campos no declarados
+        """
+        for (key_id, ek, dk, seed) in records:
+            self.add(key_id, ek, dk, seed)
+
+    def close(self):
+        """
+        Construye el índice hash al final del fichero y completa la cabecera.
+        """
+        if self.__file is None:
+            return
+        layout = self.__layout
+        f = self.__file
+        self.__file = None
+
+        try:
+            # Tabla con al menos el doble de entradas que registros (factor de carga <= 1/2)
+            entries = 1
+            while entries < 2 * self.__count:
+                entries *= 2
+            entry_size = layout.id_size + 8
+            index_offset = HEADER_SIZE + self.__count * layout.record_size
+            index_offset += (-index_offset) % 8
+
+            f.flush()
+            f.truncate(index_offset + entries * entry_size)
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, VERSION, layout.k, layout.fields, layout.id_size, layout.record_size,
+                                self.__count, index_offset, entries))
+            f.flush()
+
+            # El índice se rellena sobre el fichero proyectado en memoria, leyendo los identificadores
+            # de los registros ya escritos
+            with mmap.mmap(f.fileno(), 0) as mm:
+                for n in range(self.__count):
+                    pos = HEADER_SIZE + n * layout.record_size
+                    key_id = mm[pos : pos + layout.id_size]
+                    slot = _slot(key_id, entries)
+                    while True:
+                        e = index_offset + slot * entry_size
+                        if int.from_bytes(mm[e + layout.id_size : e + entry_size], 'little') == 0:
+                            mm[e : e + entry_size] = key_id + (n + 1).to_bytes(8, 'little')
+                            break
+                        if mm[e : e + layout.id_size] == key_id:
+                            raise ValueError("identificador de clave duplicado en el anillo: %r" % key_id)
+                        slot = (slot + 1) & (entries - 1)
+                mm.flush()
+        finally:
+            f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        elif self.__file is not None:
+            self.__file.close()
+            self.__file = None
+
+
+class Keyring:
+    """
+    Lector de un anillo de claves mediante mmap.
+
+    Abrir el fichero es O(1) independientemente del número de claves, y cada búsqueda devuelve una
+    memoryview sobre el propio fichero proyectado (sin copia) que puede pasarse directamente a
+    Encaps o Decaps. Las vistas devueltas deben liberarse antes de cerrar el anillo.
+    """
+
+    def __init__(self, path):
+        """
+        Entrada:
+        - path: ruta de un fichero creado con KeyringWriter
+        """
+        with open(path, "rb") as f:
+            self.__mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.__view = memoryview(self.__mmap)
+
+        if len(self.__view) < HEADER_SIZE:
+            self.close()
+            raise ValueError("fichero de anillo de claves truncado")
+        (magic, version, k, fields, id_size, record_size, count, index_offset, entries) = HEADER.unpack_from(self.__view)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError("el fichero no es un anillo de claves ML-KEM compatible")
+
+        self.__layout = _Layout(k, fields, id_size)
+        if (record_size != self.__layout.record_size or entries < 1 or entries & (entries - 1)
+                or len(self.__view) < index_offset + entries * (id_size + 8)):
+            self.close()
+            raise ValueError("anillo de claves corrupto")
+        self.__count = count
+        self.__index_offset = index_offset
+        self.__entries = entries
+
+    @property
+    def param_set(self):
+        """
+        Nivel de seguridad de las claves del anillo (512, 768 o 1024).
+        """
+        return 256 * self.__layout.k
+
+    @property
+    def fields(self):
+        """
+        Campos presentes en cada registro (combinación de FIELD_EK, FIELD_DK y FIELD_SEED).
+        """
+        return self.__layout.fields
+
+    @property
+    def id_size(self):
+        """
+        Tamaño fijo en bytes de los identificadores de clave.
+        """
+        return self.__layout.id_size
+
+    def __len__(self):
+        return self.__count
+
+    def __record(self, n):
+        pos = HEADER_SIZE + n * self.__layout.record_size
+        return self.__view[pos : pos + self.__layout.record_size]
+
+    def __find(self, key_id):
+        """
+        Busca key_id en el índice y devuelve el número de registro, o -1 si no está.
+
+        El sondeo recorre como mucho la tabla entera: un índice correcto siempre tiene entradas vacías,
+        así que uno lleno es un fichero corrupto.
+        """
+        layout = self.__layout
+        key_id = layout.normalize_id(key_id)
+        entry_size = layout.id_size + 8
+        slot = _slot(key_id, self.__entries)
+        for _ in range(self.__entries):
+            e = self.__index_offset + slot * entry_size
+            n = int.from_bytes(self.__view[e + layout.id_size : e + entry_size], 'little')
+            if n == 0:
+                return -1
+            if self.__view[e : e + layout.id_size] == key_id:
+                if n > self.__count:
+                    raise ValueError("índice del anillo de claves corrupto")
+                return n - 1
+            slot = (slot + 1) & (self.__entries - 1)
+        raise ValueError("índice del anillo de claves corrupto")
+
+    def __contains__(self, key_id):
+        return self.__find(key_id) >= 0
+
+    def record(self, key_id):
+        """
+        Devuelve el registro completo (id y campos) asociado a key_id como memoryview.
+        """
+        n = self.__find(key_id)
+        if n < 0:
+            raise KeyError(key_id)
+        return self.__record(n)
+
+    def __field(self, key_id, field):
+        assert(self.__layout.fields & field)
+        (start, end) = self.__layout.offsets[field]
+        return self.record(key_id)[start:end]
+
+    def ek(self, key_id):
+        """
+        Clave pública asociada a key_id (memoryview sin copia).
+        """
+        return self.__field(key_id, FIELD_EK)
+
+    def dk(self, key_id):
+        """
+        Clave privada extendida asociada a key_id (memoryview sin copia).
+        """
+        return self.__field(key_id, FIELD_DK)
+
+    def seed(self, key_id):
+        """
+        Semilla d || z asociada a key_id (memoryview sin copia).
+        """
+        return self.__field(key_id, FIELD_SEED)
+
+    def __iter__(self):
+        """
+        Exportación en streaming: recorre los registros en el orden en que se escribieron.
+
+        Salida:
+        - tuplas (key_id, ek, dk, seed) de memoryviews, con None en los campos no presentes (key_id
+          sin el relleno de ceros)
+        """
+        layout = self.__layout
+        for n in range(self.__count):
+            rec = self.__record(n)
+            values = []
+            for field in (FIELD_EK, FIELD_DK, FIELD_SEED):
+                if layout.fields & field:
+                    (start, end) = layout.offsets[field]
+                    values.append(rec[start:end])
+                else:
+                    values.append(None)
+            # El identificador sin el relleno de ceros
+            key_id = rec[:layout.id_size]
+            length = bytes(key_id).find(b"\x00")
+            yield (key_id if length < 0 else key_id[:length], *values)
+
+    def close(self):
+        """
+        Libera la proyección en memoria del fichero.
+        """
+        if self.__mmap is not None:
+            self.__view.release()
+            self.__mmap.close()
+            self.__mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def export_keyring(src_path, dst_path, fields=None):
+    """
+    Copia en streaming un anillo de claves en otro, opcionalmente con un subconjunto de los campos.
+
+    Entrada:
+    - src_path: anillo de origen
+    - dst_path: anillo de destino
+    - fields: campos a conservar (por defecto, los mismos que el origen)
+    """
+    with Keyring(src_path) as src:
+        fields = src.fields if fields is None else fields
+        assert(fields & src.fields == fields)
+        with KeyringWriter(dst_path, src.param_set, fields, src.id_size) as dst:
+            for (key_id, ek, dk, seed) in src:
+                dst.add(key_id,
+                        ek if fields & FIELD_EK else None,
+                        dk if fields & FIELD_DK else None,
+                        seed if fields & FIELD_SEED else None)
+                del key_id, ek, dk, seed
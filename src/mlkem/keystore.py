@@ -0,0 +1,139 @@
+from collections import OrderedDict
+from threading import Lock
+from .conversions import bytes_view
+
+class SeedKeyStore:
+    """
+    Almacén compacto de claves ML-KEM que solo conserva la semilla (d || z) de cada par.
+
+    Una clave privada de ML-KEM-1024 ocupa 3168 bytes, pero está determinada por los 64 bytes de
+    su semilla. Este almacén guarda únicamente las semillas y reconstruye las claves bajo demanda,
+    manteniendo delante una caché LRU acotada de claves ya expandidas (y validadas), de forma que
+    las claves más usadas no pagan ningún coste adicional.
+
+    Las semillas se guardan en cualquier objeto con interfaz de diccionario (por defecto un dict en
+    memoria); basta pasar, por ejemplo, un dbm.open(...) para que persistan en disco.
+    """
+
+    def __init__(self, ml_kem, seeds=None, cache_size=1024):
+        """
+        Entrada:
+        - ml_kem: instancia de ML_KEM, ML_KEM_512, ML_KEM_768 o ML_KEM_1024
+        - seeds: diccionario identificador -> semilla de 64 bytes (por defecto, uno vacío en memoria)
+        - cache_size: número máximo de pares de claves expandidos que se mantienen en caché
+        """
+        assert(cache_size >= 0)
+        self.__ml_kem = ml_kem
+        self.__seeds = {} if seeds is None else seeds
+        self.__cache_size = cache_size
+        self.__cache = OrderedDict()    # identificador -> (ValidatedEK, ValidatedDK)
+        self.__lock = Lock()
+
+    def generate(self, key_id):
+        """
+        Genera un nuevo par de claves, guardando solo su semilla bajo key_id.
+
+        Entrada:
+        - key_id: identificador de la clave (str o bytes si el almacén es persistente)
+
+        Salida:
+        - ek: clave pública del nuevo par (bytes)
+        """
+        seed = self.__ml_kem.KeyGen_seed()
+        self.add(key_id, seed)
+
+        return self.ek(key_id)
+
+    def add(self, key_id, seed):
+        """
+        Añade (o sustituye) la semilla asociada a key_id.
+
+        Entrada:
+        - key_id: identificador de la clave
+        - seed: 64 bytes (d || z)
+        """
+        seed = bytes(bytes_view(seed))
+        assert(len(seed) == 64)
+
+        with self.__lock:
+            self.__seeds[key_id] = seed
+            self.__cache.pop(key_id, None)
+
+    def remove(self, key_id):
+        """
+        Elimina la semilla asociada a key_id y su entrada en la caché.
+        """
+        with self.__lock:
+            del self.__seeds[key_id]
+            self.__cache.pop(key_id, None)
+
+    def seed(self, key_id):
+        """
+        Devuelve la semilla de 64 bytes asociada a key_id.
+        """
+        return bytes(self.__seeds[key_id])
+
+    def __contains__(self, key_id):
+        return key_id in self.__seeds
+
+    def __len__(self):
+        return len(self.__seeds)
+
+    def expanded(self, key_id):
+        """
+        Devuelve el par de claves expandido asociado a key_id, reconstruyéndolo si no está en caché.
+
+        Entrada:
+        - key_id: identificador de la clave
+
+        Salida:
+        - ValidatedEK y ValidatedDK, que pueden pasarse directamente a Encaps y Decaps
+        """
+        with self.__lock:
+            keys = self.__cache.get(key_id)
+            if keys is not None:
+                self.__cache.move_to_end(key_id)
+                return keys
+            seed = self.__seeds[key_id]
+
+        # La expansión (KeyGen determinista) se hace fuera del cerrojo
+        keys = self.__ml_kem.expand_seed(seed)
+
+        if self.__cache_size > 0:
+            with self.__lock:
+                self.__cache[key_id] = keys
+                self.__cache.move_to_end(key_id)
+                while len(self.__cache) > self.__cache_size:
+                    self.__cache.popitem(last=False)
+
+        return keys
+
+    def ek(self, key_id):
+        """
+        Devuelve la clave pública (bytes) asociada a key_id.
+        """
+        return self.expanded(key_id)[0].ek
+
+    def dk(self, key_id):
+        """
+        Devuelve la clave privada extendida (bytes) asociada a key_id.
+        """
+        return self.expanded(key_id)[1].dk
+
+    def Encaps(self, key_id):
+        """
+        Encapsula con la clave pública asociada a key_id.
+
+        Salida:
+        - K, c como en ML_KEM.Encaps
+        """
+        return self.__ml_kem.Encaps(self.expanded(key_id)[0])
+
+    def Decaps(self, key_id, c):
+        """
+        Desencapsula c con la clave privada asociada a key_id.
+
+        Salida:
+        - K' como en ML_KEM.Decaps
+        """
+        return self.__ml_kem.Decaps(self.expanded(key_id)[1], c)
@@ -0,0 +1,137 @@
+"""
+Multiplicación en R_q = Z_q[X]/(X^256 + 1) por sustitución de Kronecker.
+
+Un polinomio se empaqueta en un único entero evaluándolo en X = 2^w (cada coeficiente ocupa una
+palabra de w bits). El producto de dos polinomios es entonces una sola multiplicación de enteros
+grandes, que CPython hace en C (Karatsuba), y los coeficientes del producto se leen de nuevo
+palabra a palabra.
+
+- Los coeficientes se toman centrados en [-(q-1)/2, (q-1)/2], así que cada polinomio se empaqueta
+  como la diferencia de dos enteros (parte positiva y negativa) y los productos quedan pequeños.
+- La reducción módulo X^256 + 1 es una reducción módulo 2^(256·w) + 1 del entero empaquetado
+  (X^256 = 2^(256·w) ≡ -1), seguida de sumar a cada palabra un múltiplo de q que la deja positiva.
+- La anchura de palabra se elige a partir de una cota de los coeficientes del resultado: 32 bits
+  cuando cabe (siempre para un producto suelto, y para ŝᵀ·u con s de ruido pequeño) y 64 si no.
+
+Los operandos están en el dominio normal, no en el NTT. En ML-KEM las matrices y claves están
+definidas en el dominio NTT, así que esta vía solo compensa donde un operando tendría que
+transformarse de todas formas (el producto ŝᵀ·u de K-PKE.Decrypt, ver Engine.NTT_vector_dot).
+"""
+from array import array
+from .profiling import instrumented
+
+q = 3329
+N = 256
+_HALF = q // 2
+
+class _Width:
+    """
+    Constantes de empaquetado para palabras de w bits.
+    """
+
+    def __init__(self, w, typecode):
+        assert(array(typecode).itemsize * 8 == w)
+        self.typecode = typecode
+        self.shift = N * w
+        self.mask = (1 << self.shift) - 1
+        self.modulus = (1 << self.shift) + 1
+        # Múltiplo de q que se suma a cada palabra; las palabras con signo deben quedar en (-bias, bias)
+        self.bias_digit = q * ((1 << (w - 1)) // q)
+        self.bias = int.from_bytes(array(typecode, [self.bias_digit] * N).tobytes(), 'little')
+        self.limit = min(self.bias_digit, (1 << w) - self.bias_digit)
+
+
+_WIDTHS = (_Width(32, 'I'), _Width(64, 'Q'))
+
+def _split(f):
+    """
+    Separa un polinomio con coeficientes en [0, q) en partes positiva y negativa de su forma centrada.
+
+    Salida:
+    - pos, neg: listas de coeficientes no negativos con f ≡ pos - neg
+    - bound: máximo valor absoluto de los coeficientes centrados
+    """
+    pos = [x if x <= _HALF else 0 for x in f]
+    neg = [q - x if x > _HALF else 0 for x in f]
+    return pos, neg, max(max(pos), max(neg))
+
+
+def _pack(parts, width):
+    """
+    Entero que representa pos - neg evaluado en X = 2^w.
+    """
+    (pos, neg, _) = parts
+    tc = width.typecode
+    return int.from_bytes(array(tc, pos).tobytes(), 'little') - int.from_bytes(array(tc, neg).tobytes(), 'little')
+
+
+def _width_for(bound):
+    """
+    Anchura de palabra en la que caben coeficientes de valor absoluto hasta bound.
+    """
+    for width in _WIDTHS:
+        if bound < width.limit:
+            return width
+    raise ValueError("coeficientes fuera de rango para la sustitución de Kronecker")
+
+
+def _fold(P, width):
+    """
+    Reduce un producto empaquetado módulo X^256 + 1 y q.
+
+    Entrada:
+    - P: entero que representa un polinomio de grado < 511 evaluado en X = 2^w, cuyos coeficientes,
+      una vez reducidos módulo X^256 + 1, tienen valor absoluto menor que width.limit
+
+    Salida:
+    - lista de 256 coeficientes en [0, q)
+    """
+    # (P & mask) - (P >> shift) ≡ P (mod 2^shift + 1), y la reducción final solo resta unos pocos múltiplos
+    folded = ((P & width.mask) - (P >> width.shift) + width.bias) % width.modulus
+    words = array(width.typecode)
+    words.frombytes(folded.to_bytes(width.shift // 8, 'little'))
+    return [x % q for x in words]
+
+
+@instrumented("PolyMultiply")
+def poly_multiply(f, g):
+    """
+    Producto f·g en R_q.
+
+    Entrada:
+    - f, g: polinomios de 256 coeficientes en [0, q)
+
+    Salida:
+    - lista de 256 coeficientes en [0, q)
+    """
+    return inner_product([f], [g])
+
+
+@instrumented("PolyInnerProduct")
+def inner_product(fs, gs):
+    """
+    Producto escalar Σ fs[i]·gs[i] en R_q, con una sola reducción al final.
+
+    Entrada:
+    - fs, gs: listas de la misma longitud de polinomios con coeficientes en [0, q)
+
+    Salida:
+    - lista de 256 coeficientes en [0, q)
+    """
+    assert(len(fs) == len(gs) and len(fs) >= 1)
+    fs = [_split(f) for f in fs]
+    gs = [_split(g) for g in gs]
+    # Cota del valor absoluto de cada coeficiente del resultado antes de reducir módulo q
+    width = _width_for(sum(N * f[2] * g[2] for (f, g) in zip(fs, gs)))
+
+    total = 0
+    for (f, g) in zip(fs, gs):
+        total += _pack(f, width) * _pack(g, width)
+    return _fold(total, width)
+
+
+def matrix_vector_multiply(A, s):
+    """
+    Producto matriz-vector A·s en R_q^k (dominio normal).
+    """
+    return [inner_product(row, s) for row in A]
@@ -0,0 +1,469 @@
+"""
+Generador de carga para ML-KEM: latencias bajo concurrencia en lugar de tiempos aislados.
+
+Varios trabajadores (hilos, procesos o tareas de asyncio) repiten en bucle cerrado una operación
+(KeyGen, Encaps, Decaps o un intercambio completo) durante un tiempo fijo, a la máxima velocidad o
+a un ritmo objetivo repartido entre ellos. El resultado incluye:
+
+- rendimiento (operaciones por segundo) y percentiles p50, p90, p99 y p99.9 de latencia;
+- una serie temporal por intervalos con rendimiento, p99 y uso de CPU;
+- el histograma completo en el formato de percentiles de HdrHistogram (.hgrm);
+- con sweep, la misma medida para varios niveles de concurrencia y el punto de saturación.
+
+Con un ritmo objetivo, la latencia se mide desde el instante en que debía empezar cada operación y
+no desde que empieza de verdad: si el sistema se satura, el retraso acumulado aparece en la latencia
+en lugar de esconderse (omisión coordinada).
+
+Uso: python -m mlkem.loadgen run   [--operation handshake] [--mode threads] [--concurrency 4] [--rate 50]
+     python -m mlkem.loadgen sweep [--operation encaps] [--mode processes] [--concurrency 1,2,4,8]
+"""
+import argparse
+import asyncio
+import math
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from .ML_KEM import ML_KEM_512, ML_KEM_768, ML_KEM_1024
+from .engine import get_engine, engines
+
+PARAM_SETS = {512: ML_KEM_512, 768: ML_KEM_768, 1024: ML_KEM_1024}
+OPERATIONS = ("keygen", "encaps", "decaps", "handshake")
+MODES = ("threads", "processes", "asyncio")
+PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+
+class Histogram:
+    """
+    Histograma de latencias con precisión relativa fija, como HdrHistogram.
+
+    Los valores se guardan en microsegundos enteros. Hasta 2^sub_bucket_bits cada valor tiene su
+    propio cubo; por encima, cada potencia de dos se divide en 2^(sub_bucket_bits - 1) cubos, de modo
+    que el error relativo nunca supera 10^-digits. Los cubos vacíos no ocupan memoria.
+    """
+
+    def __init__(self, digits=3):
+        """
+        Entrada:
+        - digits: cifras significativas que se conservan (1 a 5)
+        """
+        assert(1 <= digits <= 5)
+        self.digits = digits
+        self.sub_bucket_bits = math.ceil(math.log2(2 * 10 ** digits))
+        self.counts = {}
+        self.total = 0
+        self.min = None
+        self.max = 0
+        self.sum = 0
+        self.sum_squares = 0
+
+    def __index(self, value):
+        shift = max(0, value.bit_length() - self.sub_bucket_bits)
+        return (shift << (self.sub_bucket_bits - 1)) + (value >> shift)
+
+    def __highest_equivalent(self, index):
+        """
+        Mayor valor que cae en el cubo index.
+        """
+        half = 1 << (self.sub_bucket_bits - 1)
+        if index < 2 * half:
+            return index
+        shift = index // half - 1
+        return ((index - shift * half + 1) << shift) - 1
+
+    def record(self, seconds):
+        """
+        Anota una latencia en segundos.
+        """
+        value = max(0, round(seconds * 1e6))
+        index = self.__index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.total += 1
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = max(self.max, value)
+        self.sum += value
+        self.sum_squares += value * value
+
+    def merge(self, other):
+        """
+        Añade a este histograma los valores de otro con la misma precisión.
+        """
+        assert(other.digits == self.digits)
+        for (index, count) in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        if other.total:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        self.sum += other.sum
+        self.sum_squares += other.sum_squares
+        return self
+
+    def value_at_percentile(self, p):
+        """
+        Latencia (segundos) por debajo de la cual queda el p por ciento de las operaciones.
+        """
+        if not self.total:
+            return 0.0
+        target = max(1, math.ceil(p / 100 * self.total))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return min(self.__highest_equivalent(index), self.max) / 1e6
+        return self.max / 1e6
+
+    def mean(self):
+        return self.sum / self.total / 1e6 if self.total else 0.0
+
+    def stddev(self):
+        if not self.total:
+            return 0.0
+        mean = self.sum / self.total
+        return math.sqrt(max(0.0, self.sum_squares / self.total - mean * mean)) / 1e6
+
+    def percentile_distribution(self, ticks_per_half_distance=5):
+        """
+        Distribución de percentiles en el formato de texto de HdrHistogram (valores en milisegundos),
+        que entienden las herramientas de representación de ficheros .hgrm.
+        """
+        lines = [f"{'Value':>12} {'Percentile':>14} {'TotalCount':>10} {'1/(1-Percentile)':>14}", ""]
+        if self.total:
+            ordered = sorted(self.counts.items())
+            position = 0
+            seen = 0
+            half = 0
+            while True:
+                start = 1 - 0.5 ** half
+                step = 0.5 ** half / 2 / ticks_per_half_distance
+                for tick in range(ticks_per_half_distance):
+                    p = start + tick * step
+                    target = max(1, math.ceil(p * self.total))
+                    while seen < target:
+                        seen += ordered[position][1]
+                        position += 1
+                    value = min(self.__highest_equivalent(ordered[position - 1][0]), self.max) / 1e3
+                    if seen == self.total:
+                        break
+                    lines.append(f"{value:12.3f} {p:2.12f} {seen:10d} {1 / (1 - p):14.2f}")
+                if seen == self.total:
+                    break
+                half += 1
+                if half > 8 * ticks_per_half_distance:
+                    break
+            lines.append(f"{self.max / 1e3:12.3f} {1.0:2.12f} {self.total:10d}")
+        lines.append(f"#[Mean    = {self.mean() * 1e3:12.3f}, StdDeviation   = {self.stddev() * 1e3:12.3f}]")
+        lines.append(f"#[Max     = {self.max / 1e3:12.3f}, Total count    = {self.total:12d}]")
+        lines.append(f"#[Buckets = {len(self.counts):12d}, SubBuckets     = {1 << self.sub_bucket_bits:12d}]")
+        return "\n".join(lines) + "\n"
+
+
+def prepare(param_set, operation, engine=None):
+    """
+    Construye la función sin argumentos que ejecuta una operación, con sus claves ya generadas.
+
+    Entrada:
+    - param_set: nivel de seguridad (512, 768 o 1024)
+    - operation: "keygen", "encaps", "decaps" o "handshake" (KeyGen + Encaps + Decaps)
+    - engine: motor de cálculo (nombre o None)
+    """
+    assert(operation in OPERATIONS)
+    ml_kem = PARAM_SETS[param_set](engine=engine)
+    (ek, dk) = ml_kem.KeyGen()
+    (K, c) = ml_kem.Encaps(ek)
+    if operation == "keygen":
+        return ml_kem.KeyGen
+    if operation == "encaps":
+        return lambda: ml_kem.Encaps(ek)
+    if operation == "decaps":
+        return lambda: ml_kem.Decaps(dk, c)
+
+    def handshake():
+        (ek, dk) = ml_kem.KeyGen()
+        (K, c) = ml_kem.Encaps(ek)
+        assert(ml_kem.Decaps(dk, c) == K)
+    return handshake
+
+
+class _Recorder:
+    """
+    Anotaciones de un trabajador: un histograma y el tiempo de CPU consumido por intervalo.
+
+    Cada trabajador tiene el suyo, así que anotar no necesita cerrojos; se suman al terminar.
+    """
+
+    def __init__(self, duration, interval, cpu_clock):
+        self.interval = interval
+        # Una operación que termina después del final cuenta en el último intervalo
+        self.last_slot = math.ceil(duration / interval) - 1
+        self.elapsed = 0.0              # Hasta el final de la última operación
+        self.histograms = {}            # intervalo -> Histogram
+        self.cpu = {}                   # intervalo -> segundos de CPU
+        self.__cpu_clock = cpu_clock
+        self.__cpu_last = cpu_clock()
+
+    def __slot(self, t):
+        return min(int(t // self.interval), self.last_slot)
+
+    def record(self, start, intended, done):
+        slot = self.__slot(done - start)
+        histogram = self.histograms.get(slot)
+        if histogram is None:
+            histogram = self.histograms[slot] = Histogram()
+        histogram.record(done - intended)
+
+        # El tiempo de CPU desde la anotación anterior se reparte entre los intervalos que abarca
+        (t0, t1) = (self.elapsed, done - start)
+        cpu = self.__cpu_clock()
+        spent = cpu - self.__cpu_last
+        self.__cpu_last = cpu
+        for n in range(self.__slot(t0), slot + 1):
+            lo = max(t0, n * self.interval)
+            hi = t1 if n == self.last_slot else min(t1, (n + 1) * self.interval)
+            share = spent * (hi - lo) / (t1 - t0) if t1 > t0 else spent
+            self.cpu[n] = self.cpu.get(n, 0.0) + share
+        self.elapsed = max(self.elapsed, t1)
+
+    def result(self):
+        return (self.histograms, self.cpu, self.elapsed)
+
+
+def _worker_loop(fn, duration, interval, rate, cpu_clock, barrier=None):
+    """
+    Bucle cerrado de un trabajador síncrono (hilo o proceso).
+
+    Con rate (operaciones por segundo de este trabajador), cada operación tiene un instante de
+    inicio previsto y su latencia se cuenta desde él; sin rate, se encadenan sin pausa.
+    """
+    recorder = _Recorder(duration, interval, cpu_clock)
+    if barrier is not None:
+        barrier.wait()
+    start = time.perf_counter()
+    end = start + duration
+    n = 0
+    while True:
+        now = time.perf_counter()
+        intended = now if rate is None else start + n / rate
+        if intended >= end:
+            break
+        if intended > now:
+            time.sleep(intended - now)
+        fn()
+        recorder.record(start, intended, time.perf_counter())
+        n += 1
+    return recorder.result()
+
+
+# Barrera de arranque de los procesos trabajadores (se hereda al crear el pool, no viaja con cada tarea)
+_barrier = None
+
+def _init_process(barrier):
+    global _barrier
+    _barrier = barrier
+
+
+def _process_worker(param_set, operation, engine_name, duration, interval, rate):
+    fn = prepare(param_set, operation, engine_name)
+    fn()        # Calentamiento: tablas y cachés de validación
+    return _worker_loop(fn, duration, interval, rate, time.process_time, _barrier)
+
+
+async def _async_worker(fn, duration, interval, rate, start, recorder):
+    """
+    Tarea de asyncio: las operaciones se ejecutan en el propio bucle de eventos, como en un servidor
+    asyncio que no las delega a hilos, así que la concurrencia se convierte en espera en el bucle.
+    Todas las tareas comparten el hilo del bucle y, por tanto, el mismo _Recorder.
+    """
+    end = start + duration
+    n = 0
+    while True:
+        now = time.perf_counter()
+        intended = now if rate is None else start + n / rate
+        if intended >= end:
+            break
+        await asyncio.sleep(max(0.0, intended - now))
+        fn()
+        recorder.record(start, intended, time.perf_counter())
+        n += 1
+
+
+def _run_workers(param_set, operation, mode, concurrency, duration, interval, rate, engine, context):
+    """
+    Lanza los trabajadores y devuelve la lista de anotaciones (histogramas y CPU por intervalo).
+    """
+    per_worker_rate = None if rate is None else rate / concurrency
+    if mode == "processes":
+        context = multiprocessing.get_context(context)
+        barrier = context.Barrier(concurrency)
+        args = (param_set, operation, get_engine(engine).name, duration, interval, per_worker_rate)
+        with context.Pool(concurrency, initializer=_init_process, initargs=(barrier,)) as pool:
+            return pool.starmap(_process_worker, [args] * concurrency)
+
+    fn = prepare(param_set, operation, engine)
+    fn()
+    if mode == "threads":
+        barrier = threading.Barrier(concurrency)
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="mlkem-load") as executor:
+            futures = [executor.submit(_worker_loop, fn, duration, interval, per_worker_rate, time.thread_time, barrier)
+                       for _ in range(concurrency)]
+            return [future.result() for future in futures]
+
+    assert(mode == "asyncio")
+
+    async def main():
+        recorder = _Recorder(duration, interval, time.thread_time)
+        start = time.perf_counter()
+        await asyncio.gather(*[_async_worker(fn, duration, interval, per_worker_rate, start, recorder)
+                               for _ in range(concurrency)])
+        return [recorder.result()]
+    return asyncio.run(main())
+
+
+def run(param_set=768, operation="handshake", mode="threads", concurrency=4, duration=10.0, interval=1.0,
+        rate=None, engine=None, context=None):
+    """
+    Ejecuta una prueba de carga.
+
+    Entrada:
+    - param_set: nivel de seguridad (512, 768 o 1024)
+    - operation: "keygen", "encaps", "decaps" o "handshake"
+    - mode: "threads", "processes" o "asyncio"
+    - concurrency: número de trabajadores
+    - duration: segundos de medición
+    - interval: segundos de cada intervalo de la serie temporal
+    - rate: operaciones por segundo en total (None: tan rápido como se pueda)
+    - engine: motor de cálculo (nombre o None)
+    - context: contexto de multiprocessing para el modo "processes"
+
+    Salida:
+    - diccionario con la configuración, "throughput" (op/s), "latency" (percentil -> segundos, y
+      media y máximo), "intervals" (lista de diccionarios con t, throughput, p50, p99 y cpu, esta
+      como fracción de todos los núcleos) e "histogram" (Histogram con todas las latencias)
+    """
+    assert(mode in MODES and concurrency >= 1 and duration > 0 and interval > 0)
+    assert(rate is None or rate > 0)
+    results = _run_workers(param_set, operation, mode, concurrency, duration, interval, rate, engine, context)
+
+    total = Histogram()
+    by_slot = {}
+    cpu = {}
+    # La última operación de cada trabajador puede terminar después de duration
+    elapsed = max([duration] + [result[2] for result in results])
+    for (histograms, cpu_by_slot, _) in results:
+        for (slot, histogram) in histograms.items():
+            by_slot.setdefault(slot, Histogram()).merge(histogram)
+            total.merge(histogram)
+        for (slot, seconds) in cpu_by_slot.items():
+            cpu[slot] = cpu.get(slot, 0.0) + seconds
+
+    cores = os.cpu_count() or 1
+    intervals = []
+    for slot in sorted(by_slot):
+        # El último intervalo va hasta el final de la última operación
+        length = elapsed - slot * interval if slot == max(by_slot) else interval
+        histogram = by_slot[slot]
+        intervals.append({"t": slot * interval, "throughput": histogram.total / length,
+                          "p50": histogram.value_at_percentile(50), "p99": histogram.value_at_percentile(99),
+                          "cpu": cpu.get(slot, 0.0) / length / cores})
+
+    latency = {p: total.value_at_percentile(p) for p in PERCENTILES}
+    latency["mean"] = total.mean()
+    latency["max"] = total.max / 1e6
+    return {"param_set": param_set, "operation": operation, "mode": mode, "concurrency": concurrency,
+            "rate": rate, "engine": get_engine(engine).name, "duration": duration,
+            "operations": total.total, "throughput": total.total / elapsed, "latency": latency,
+            "cpu": sum(cpu.values()) / elapsed / cores, "intervals": intervals, "histogram": total}
+
+
+def sweep(concurrencies, threshold=0.05, **options):
+    """
+    Repite run con niveles de concurrencia crecientes y localiza el punto de saturación.
+
+    Entrada:
+    - concurrencies: lista creciente de niveles de concurrencia
+    - threshold: mejora relativa mínima de rendimiento para considerar que un nivel aún no satura
+    - options: argumentos de run (param_set, operation, mode, duration, ...)
+
+    Salida:
+    - (resultados de cada nivel, concurrencia de saturación): el último nivel que mejora el
+      rendimiento del anterior en más de threshold
+    """
+    results = []
+    saturation = None
+    for concurrency in concurrencies:
+        result = run(concurrency=concurrency, **options)
+        if results and saturation is None and result["throughput"] < results[-1]["throughput"] * (1 + threshold):
+            saturation = results[-1]["concurrency"]
+        results.append(result)
+    if saturation is None and results:
+        saturation = results[-1]["concurrency"]
+    return results, saturation
+
+
+def format_seconds(t):
+    return f"{t * 1e3:.2f} ms"
+
+
+def summary(result):
+    """
+    Resumen en texto de un resultado de run.
+    """
+    latency = result["latency"]
+    target = "" if result["rate"] is None else f", {result['rate']:g} op/s objetivo"
+    lines = [f"ML-KEM-{result['param_set']} {result['operation']}, {result['mode']} x{result['concurrency']}"
+             f"{target}, motor {result['engine']}",
+             f"  {result['operations']} operaciones en {result['duration']:.1f} s: {result['throughput']:.2f} op/s, "
+             f"CPU {100 * result['cpu']:.1f} % de {os.cpu_count()} núcleos",
+             "  latencia: " + ", ".join(f"p{p:g} {format_seconds(latency[p])}" for p in PERCENTILES)
+             + f", media {format_seconds(latency['mean'])}, máx. {format_seconds(latency['max'])}",
+             f"  {'t (s)':>7} {'op/s':>9} {'p50':>10} {'p99':>10} {'CPU':>7}"]
+    for row in result["intervals"]:
+        lines.append(f"  {row['t']:>7.1f} {row['throughput']:>9.2f} {format_seconds(row['p50']):>10} "
+                     f"{format_seconds(row['p99']):>10} {100 * row['cpu']:>6.1f}%")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """
+    Prueba de carga (run) o barrido de concurrencia (sweep).
+    """
+    parser = argparse.ArgumentParser(prog="python -m mlkem.loadgen", description="Generador de carga para ML-KEM")
+    parser.add_argument("command", choices=("run", "sweep"))
+    parser.add_argument("--param-set", type=int, choices=sorted(PARAM_SETS), default=768)
+    parser.add_argument("--operation", choices=OPERATIONS, default="handshake")
+    parser.add_argument("--mode", choices=MODES, default="threads")
+    parser.add_argument("--concurrency", default=None, help="trabajadores (run) o lista separada por comas (sweep)")
+    parser.add_argument("--rate", type=float, default=None, help="operaciones por segundo en total (por defecto, sin límite)")
+    parser.add_argument("--duration", type=float, default=10.0, help="segundos de cada medición")
+    parser.add_argument("--interval", type=float, default=1.0, help="segundos de cada intervalo de la serie temporal")
+    parser.add_argument("--engine", default=None, choices=engines(), help="motor de cálculo (por defecto, MLKEM_ENGINE)")
+    parser.add_argument("--hgrm", default=None, help="fichero donde guardar la distribución de percentiles (run)")
+    parser.add_argument("--threshold", type=float, default=0.05, help="mejora mínima de rendimiento (sweep)")
+    args = parser.parse_args(argv)
+
+    options = {"param_set": args.param_set, "operation": args.operation, "mode": args.mode,
+               "duration": args.duration, "interval": args.interval, "rate": args.rate, "engine": args.engine}
+    print(f"Python {sys.version.split()[0]}, {os.cpu_count()} núcleos")
+
+    if args.command == "run":
+        result = run(concurrency=int(args.concurrency or 4), **options)
+        print(summary(result))
+        if args.hgrm:
+            with open(args.hgrm, "w") as f:
+                f.write(result["histogram"].percentile_distribution())
+        return 0
+
+    concurrencies = [int(x) for x in (args.concurrency or "1,2,4,8").split(",") if x]
+    (results, saturation) = sweep(concurrencies, args.threshold, **options)
+    print(f"{'concurrencia':>12} {'op/s':>9} {'p50':>10} {'p99':>10} {'p99.9':>10} {'CPU':>7}")
+    for result in results:
+        latency = result["latency"]
+        print(f"{result['concurrency']:>12} {result['throughput']:>9.2f} {format_seconds(latency[50.0]):>10} "
+              f"{format_seconds(latency[99.0]):>10} {format_seconds(latency[99.9]):>10} {100 * result['cpu']:>6.1f}%")
+    print(f"saturación a partir de {saturation} trabajadores")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,200 @@
+"""
+Métricas de producción de ML-KEM: contadores de operaciones y de errores, rechazos implícitos e
+histogramas de latencia por operación y nivel de seguridad, exportables en el formato de texto de
+Prometheus.
+
+    from mlkem import ML_KEM_768
+    from mlkem.metrics import REGISTRY, serve
+
+    kem = ML_KEM_768(metrics=REGISTRY)
+    serve(REGISTRY, port=9464)          # http://127.0.0.1:9464/metrics
+
+El registro no toma ningún cerrojo al anotar: cada hilo escribe en su propia partición (creada la
+primera vez que el hilo anota algo) y la exportación suma las particiones. Las particiones de hilos
+ya terminados se conservan, para que los contadores nunca retrocedan.
+"""
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Límites superiores (segundos) de los cubos del histograma de latencia
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+class _Shard:
+    """
+    Partición de un hilo: contadores y (cubos, suma) de los histogramas, indexados por (operación, nivel).
+    """
+
+    def __init__(self):
+        self.operations = {}
+        self.errors = {}
+        self.rejections = {}
+        self.latencies = {}     # (operación, nivel) -> [cuentas por cubo (+Inf al final), suma]
+
+
+class _Timer:
+    """
+    Contexto que mide una operación y la anota al salir (como error si termina con una excepción).
+    """
+
+    def __init__(self, metrics, operation, param_set):
+        self.__metrics = metrics
+        self.__key = (operation, param_set)
+
+    def __enter__(self):
+        self.__start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.__metrics._record(self.__key, time.perf_counter() - self.__start, exc_type is not None)
+        return False
+
+
+class Metrics:
+    """
+    Registro de métricas de ML-KEM con particiones por hilo.
+    """
+
+    def __init__(self, buckets=BUCKETS):
+        """
+        Entrada:
+        - buckets: límites superiores crecientes (segundos) de los cubos del histograma de latencia
+        """
+        assert(list(buckets) == sorted(buckets) and len(buckets) >= 1)
+        self.__buckets = tuple(buckets)
+        self.__local = threading.local()
+        self.__shards = []
+        self.__shards_lock = threading.Lock()   # Solo para registrar una partición nueva
+
+    def __shard(self):
+        shard = getattr(self.__local, "shard", None)
+        if shard is None:
+            shard = self.__local.shard = _Shard()
+            with self.__shards_lock:
+                self.__shards.append(shard)
+        return shard
+
+    def time(self, operation, param_set):
+        """
+        Contexto que anota una operación con su latencia.
+
+        Entrada:
+        - operation: "KeyGen", "Encaps" o "Decaps"
+        - param_set: nivel de seguridad (512, 768 o 1024)
+        """
+        return _Timer(self, operation, param_set)
+
+    def _record(self, key, elapsed, error):
+        shard = self.__shard()
+        if error:
+            shard.errors[key] = shard.errors.get(key, 0) + 1
+            return
+        shard.operations[key] = shard.operations.get(key, 0) + 1
+        histogram = shard.latencies.get(key)
+        if histogram is None:
+            histogram = shard.latencies[key] = [[0] * (len(self.__buckets) + 1), 0.0]
+        histogram[0][bisect_left(self.__buckets, elapsed)] += 1
+        histogram[1] += elapsed
+
+    def record_rejection(self, param_set):
+        """
+        Anota un rechazo implícito en Decaps (cápsula que no vuelve a cifrarse igual).
+        """
+        shard = self.__shard()
+        shard.rejections[param_set] = shard.rejections.get(param_set, 0) + 1
+
+    def snapshot(self):
+        """
+        Suma de todas las particiones.
+
+        Salida:
+        - diccionario con "operations", "errors" y "rejections" (contadores por clave) y "latencies"
+          ((operación, nivel) -> (cuentas por cubo, suma))
+        """
+        with self.__shards_lock:
+            shards = list(self.__shards)
+        total = {"operations": {}, "errors": {}, "rejections": {}, "latencies": {}}
+        for shard in shards:
+            for name in ("operations", "errors", "rejections"):
+                target = total[name]
+                for (key, value) in list(getattr(shard, name).items()):
+                    target[key] = target.get(key, 0) + value
+            for (key, (counts, seconds)) in list(shard.latencies.items()):
+                (acc, acc_seconds) = total["latencies"].get(key, ([0] * len(counts), 0.0))
+                total["latencies"][key] = ([a + c for (a, c) in zip(acc, list(counts))], acc_seconds + seconds)
+        return total
+
+    def prometheus(self):
+        """
+        Exportación en el formato de texto de Prometheus (versión 0.0.4).
+        """
+        snapshot = self.snapshot()
+        lines = []
+
+        def counter(name, help_text, values, labels):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for (key, value) in sorted(values.items()):
+                lines.append(f"{name}{{{labels(key)}}} {value}")
+
+        operation_labels = lambda key: f'operation="{key[0]}",param_set="{key[1]}"'
+        counter("mlkem_operations_total", "Operaciones de ML-KEM completadas.", snapshot["operations"], operation_labels)
+        counter("mlkem_errors_total", "Operaciones de ML-KEM terminadas con una excepción (por ejemplo, una clave no válida).",
+                snapshot["errors"], operation_labels)
+        counter("mlkem_implicit_rejections_total", "Cápsulas rechazadas de forma implícita en Decaps.",
+                snapshot["rejections"], lambda param_set: f'param_set="{param_set}"')
+
+        name = "mlkem_operation_duration_seconds"
+        lines.append(f"# HELP {name} Latencia de las operaciones de ML-KEM completadas.")
+        lines.append(f"# TYPE {name} histogram")
+        for (key, (counts, seconds)) in sorted(snapshot["latencies"].items()):
+            labels = operation_labels(key)
+            cumulative = 0
+            for (bound, count) in zip(self.__buckets + (None,), counts):
+                cumulative += count
+                le = "+Inf" if bound is None else repr(float(bound))
+                lines.append(f'{name}_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f"{name}_sum{{{labels}}} {seconds!r}")
+            lines.append(f"{name}_count{{{labels}}} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+# Registro compartido para quien no necesite uno propio
+REGISTRY = Metrics()
+
+def make_handler(metrics):
+    """
+    Clase de manejador de http.server que sirve metrics en /metrics.
+    """
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass    # Sin una línea en stderr por cada consulta de Prometheus
+
+    return MetricsHandler
+
+
+def serve(metrics=REGISTRY, host="127.0.0.1", port=9464):
+    """
+    Sirve las métricas por HTTP en un hilo en segundo plano.
+
+    Salida:
+    - el ThreadingHTTPServer (server.shutdown() lo detiene; server.server_address da el puerto si port es 0)
+    """
+    server = ThreadingHTTPServer((host, port), make_handler(metrics))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="mlkem-metrics", daemon=True).start()
+    return server
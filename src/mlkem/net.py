@@ -0,0 +1,507 @@
+"""
+Servidor y cliente asyncio de referencia para un intercambio de claves ML-KEM sobre TCP.
+
+Protocolo: cada mensaje es una trama con la longitud (u32, little-endian) seguida del contenido.
+El cliente envía ek, el servidor ejecuta Encaps y responde con c, y el cliente obtiene K con Decaps.
+Una conexión puede encadenar tantos intercambios como quiera, sin esperar a las respuestas.
+
+El servidor lee las tramas con un BufferedProtocol directamente en buffers reutilizables (readinto,
+sin copias intermedias) y agrupa los intercambios que llegan dentro de una ventana corta en lotes
+que se procesan de una vez en un hilo aparte, de modo que el bucle de eventos sigue aceptando y
+leyendo mientras tanto. Si un cliente envía tramas más deprisa de lo que se procesan, el servidor
+deja de leer de esa conexión (o de todas, si se supera el límite global) hasta que se vacíe la cola.
+Servidor y cliente llevan estadísticas de intercambios por segundo y de percentiles de latencia.
+"""
+import argparse
+import asyncio
+import math
+import struct
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+FRAME = struct.Struct("<I")
+
+# Tamaños de ek y c de cada nivel de seguridad
+SIZES = {512: (800, 768), 768: (1184, 1088), 1024: (1568, 1568)}
+
+def _ml_kem_for(param_set, **options):
+    from . import ML_KEM
+    return getattr(ML_KEM, "ML_KEM_%d" % param_set)(**options)
+
+
+def _percentile(ordered, p):
+    """
+    Percentil p (entre 0 y 100) de una lista ya ordenada, por el método del rango más cercano.
+    """
+    if not ordered:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class Stats:
+    """
+    Contador de intercambios con las últimas latencias observadas (ventana acotada).
+    """
+
+    def __init__(self, window=100000):
+        """
+        Entrada:
+        - window: número de latencias recientes que se conservan para los percentiles
+        """
+        self.__lock = threading.Lock()
+        self.__latencies = deque(maxlen=window)
+        self.__start = time.perf_counter()
+        self.handshakes = 0
+        self.errors = 0
+        self.batches = 0
+
+    def record(self, latency):
+        with self.__lock:
+            self.handshakes += 1
+            self.__latencies.append(latency)
+
+    def record_error(self):
+        with self.__lock:
+            self.errors += 1
+
+    def record_batch(self):
+        with self.__lock:
+            self.batches += 1
+
+    def reset(self):
+        """
+        Reinicia los contadores y el instante de inicio (por ejemplo, tras el calentamiento).
+        """
+        with self.__lock:
+            self.__latencies.clear()
+            self.__start = time.perf_counter()
+            self.handshakes = self.errors = self.batches = 0
+
+    def snapshot(self):
+        """
+        Salida:
+        - diccionario con intercambios, errores, lotes, tamaño medio de lote, intercambios por segundo
+          y percentiles de latencia (p50, p90, p99, máx.) en segundos
+        """
+        with self.__lock:
+            ordered = sorted(self.__latencies)
+            elapsed = time.perf_counter() - self.__start
+            result = {"handshakes": self.handshakes, "errors": self.errors, "elapsed_s": elapsed,
+                      "handshakes_per_s": self.handshakes / elapsed if elapsed > 0 else 0.0}
+            if self.batches:
+                result["batches"] = self.batches
+                result["mean_batch"] = self.handshakes / self.batches
+        for p in (50, 90, 99):
+            result[f"p{p}_s"] = _percentile(ordered, p)
+        result["max_s"] = ordered[-1] if ordered else 0.0
+        return result
+
+    def report(self):
+        """
+        Resumen de snapshot() en una línea de texto.
+        """
+        s = self.snapshot()
+        batches = f"  lote medio {s['mean_batch']:.1f}" if "mean_batch" in s else ""
+        return (f"{s['handshakes']} intercambios ({s['errors']} errores)  {s['handshakes_per_s']:.1f}/s"
+                f"  p50 {s['p50_s'] * 1e3:.2f} ms  p90 {s['p90_s'] * 1e3:.2f} ms"
+                f"  p99 {s['p99_s'] * 1e3:.2f} ms  máx. {s['max_s'] * 1e3:.2f} ms{batches}")
+
+
+class _BufferPool:
+    """
+    Conjunto de bytearrays de tamaño fijo que se reutilizan entre tramas.
+    """
+
+    def __init__(self, size, count):
+        self.__size = size
+        self.__free = [bytearray(size) for _ in range(count)]
+        self.__lock = threading.Lock()
+
+    def get(self):
+        with self.__lock:
+            if self.__free:
+                return self.__free.pop()
+        return bytearray(self.__size)
+
+    def put(self, buf, limit=1024):
+        with self.__lock:
+            if len(self.__free) < limit:
+                self.__free.append(buf)
+
+
+class _ServerProtocol(asyncio.BufferedProtocol):
+    """
+    Conexión del servidor: lee cada trama en un buffer del conjunto y la entrega al servidor.
+    """
+
+    def __init__(self, server):
+        self.__server = server
+        self.__transport = None
+        self.__buffer = None
+        self.__filled = 0
+        self.__reading_paused = False
+        self.in_flight = 0              # Tramas de esta conexión entregadas y aún sin responder
+
+    def connection_made(self, transport):
+        self.__transport = transport
+        self.__buffer = self.__server.pool.get()
+
+    def connection_lost(self, exc):
+        if self.__buffer is not None:
+            self.__server.pool.put(self.__buffer)
+            self.__buffer = None
+        self.__transport = None
+
+    @property
+    def closed(self):
+        return self.__transport is None or self.__transport.is_closing()
+
+    def get_buffer(self, sizehint):
+        # Nunca se lee más allá del final de la trama actual: cada trama acaba en su propio buffer
+        return memoryview(self.__buffer)[self.__filled:]
+
+    def buffer_updated(self, nbytes):
+        previous = self.__filled
+        self.__filled += nbytes
+        if previous < FRAME.size <= self.__filled:
+            # Cabecera completa: solo se aceptan tramas con una clave pública del tamaño esperado
+            (length,) = FRAME.unpack_from(self.__buffer)
+            if length != self.__server.ek_size:
+                self.__server.stats.record_error()
+                self.__transport.close()
+                return
+        if self.__filled == len(self.__buffer):
+            buf = self.__buffer
+            self.__buffer = self.__server.pool.get()
+            self.__filled = 0
+            self.__server.submit(self, buf)
+
+    def send(self, data):
+        if not self.closed:
+            self.__transport.write(data)
+
+    def abort(self):
+        if not self.closed:
+            self.__transport.close()
+
+    def pause_reading(self):
+        if not self.__reading_paused and not self.closed:
+            self.__transport.pause_reading()
+            self.__reading_paused = True
+
+    def resume_reading(self):
+        if self.__reading_paused and not self.closed:
+            self.__transport.resume_reading()
+        self.__reading_paused = False
+
+
+class Server:
+    """
+    Servidor de intercambio de claves ML-KEM con agrupación de intercambios en lotes.
+    """
+
+    def __init__(self, param_set=768, batch_window=0.002, max_batch=64, on_key=None,
+                 max_connection_frames=16, max_frames=4096, **options):
+        """
+        Entrada:
+        - param_set: nivel de seguridad (512, 768 o 1024)
+        - batch_window: segundos que se espera a más intercambios antes de procesar un lote
+        - max_batch: tamaño de lote a partir del cual se procesa sin esperar a la ventana
+        - on_key: función que recibe cada clave compartida K establecida (en el bucle de eventos)
+        - max_connection_frames: tramas sin responder de una conexión a partir de las cuales se deja
+          de leer de ella
+        - max_frames: tramas sin responder en total a partir de las cuales se deja de leer de las
+          conexiones que envían más (acota la memoria de los buffers en cola)
+        - options: opciones de ML_KEM (engine, validation_cache_size, shadow)
+        """
+        assert(param_set in SIZES)
+        assert(batch_window >= 0 and max_batch >= 1)
+        assert(max_connection_frames >= 1 and max_frames >= 1)
+        self.ml_kem = _ml_kem_for(param_set, **options)
+        (self.ek_size, self.c_size) = SIZES[param_set]
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.on_key = on_key
+        self.max_connection_frames = max_connection_frames
+        self.max_frames = max_frames
+        self.pool = _BufferPool(FRAME.size + self.ek_size, 64)
+        self.stats = Stats()
+        self.__pending = []
+        self.__frames = 0               # Tramas entregadas y aún sin responder, de todas las conexiones
+        self.__paused = set()           # Conexiones de las que se ha dejado de leer
+        self.__timer = None
+        self.__busy = False
+        self.__closed = False
+        self.__executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mlkem-net")
+        self.__server = None
+
+    async def start(self, host="127.0.0.1", port=0):
+        """
+        Empieza a aceptar conexiones.
+
+        Salida:
+        - (host, puerto) en el que escucha el servidor
+        """
+        loop = asyncio.get_running_loop()
+        self.__server = await loop.create_server(lambda: _ServerProtocol(self), host, port)
+        return self.__server.sockets[0].getsockname()[:2]
+
+    async def serve_forever(self):
+        await self.__server.serve_forever()
+
+    async def close(self):
+        """
+        Deja de aceptar conexiones, corta las que esperan en el lote siguiente y espera (sin
+        bloquear el bucle de eventos) a que termine el lote en curso.
+        """
+        self.__closed = True
+        self.__flush()
+        self.__server.close()
+        await self.__server.wait_closed()
+        await asyncio.get_running_loop().run_in_executor(None, self.__executor.shutdown)
+
+    def submit(self, protocol, buf):
+        """
+        Añade una trama completa (longitud || ek) al lote en curso. Si la conexión o el servidor
+        superan su límite de tramas sin responder, se deja de leer de la conexión.
+        """
+        self.__pending.append((protocol, buf, time.perf_counter()))
+        protocol.in_flight += 1
+        self.__frames += 1
+        if protocol.in_flight >= self.max_connection_frames or self.__frames >= self.max_frames:
+            protocol.pause_reading()
+            self.__paused.add(protocol)
+        if self.__busy:
+            return      # El lote siguiente se lanza en cuanto termine el actual
+        if len(self.__pending) >= self.max_batch:
+            self.__flush()
+        elif self.__timer is None:
+            self.__timer = asyncio.get_running_loop().call_later(self.batch_window, self.__flush)
+
+    def __flush(self):
+        if self.__timer is not None:
+            self.__timer.cancel()
+            self.__timer = None
+        if self.__closed:
+            # El ejecutor ya no acepta lotes: los intercambios pendientes se cortan
+            (batch, self.__pending) = (self.__pending, [])
+            for (protocol, buf, _) in batch:
+                self.__release(protocol, buf)
+                self.stats.record_error()
+                protocol.abort()
+            return
+        if self.__busy or not self.__pending:
+            return
+        batch = self.__pending[:self.max_batch]
+        del self.__pending[:self.max_batch]
+        self.__busy = True
+        future = asyncio.get_running_loop().run_in_executor(self.__executor, self.__process, batch)
+        future.add_done_callback(lambda f: self.__done(batch, f))
+
+    def __release(self, protocol, buf):
+        """
+        Devuelve el buffer de una trama ya respondida (o cortada) y la descuenta de los límites.
+        """
+        self.pool.put(buf)
+        protocol.in_flight -= 1
+        self.__frames -= 1
+
+    def __resume(self):
+        """
+        Vuelve a leer de las conexiones pausadas que ya están por debajo de los límites.
+        """
+        if self.__frames >= self.max_frames:
+            return
+        for protocol in list(self.__paused):
+            if protocol.closed or protocol.in_flight < self.max_connection_frames:
+                protocol.resume_reading()
+                self.__paused.discard(protocol)
+
+    def __process(self, batch):
+        """
+        Ejecuta Encaps para todo el lote (en el hilo del ejecutor).
+
+        Salida:
+        - una pareja (respuesta longitud || c, K) por intercambio, o (None, None) si ek no es válida
+          o Encaps falla por cualquier otro motivo
+        """
+        replies = []
+        for (protocol, buf, _) in batch:
+            reply = bytearray(FRAME.size + self.c_size)
+            FRAME.pack_into(reply, 0, self.c_size)
+            K = bytearray(32)
+            try:
+                self.ml_kem.Encaps_into(memoryview(buf)[FRAME.size:], memoryview(reply)[FRAME.size:], K)
+            except Exception:
+                (reply, K) = (None, None)       # Un error en un intercambio no afecta al resto del lote
+            replies.append((reply, K))
+        return replies
+
+    def __done(self, batch, future):
+        self.__busy = False
+        self.stats.record_batch()
+        try:
+            replies = future.result()
+        except (Exception, asyncio.CancelledError):
+            # El lote entero falló: se cortan todas sus conexiones
+            replies = [(None, None)] * len(batch)
+        now = time.perf_counter()
+        for ((protocol, buf, arrival), (reply, K)) in zip(batch, replies):
+            self.__release(protocol, buf)
+            if reply is None:
+                self.stats.record_error()
+                protocol.abort()
+                continue
+            protocol.send(reply)
+            self.stats.record(now - arrival)
+            if self.on_key is not None:
+                try:
+                    self.on_key(bytes(K))
+                except Exception as exc:
+                    # Un fallo de on_key no deja sin respuesta al resto del lote
+                    asyncio.get_running_loop().call_exception_handler(
+                        {"message": "excepción en on_key del servidor ML-KEM", "exception": exc})
+        self.__resume()
+        # Lo que llegó durante el lote se procesa ya, o en cuanto venza la ventana si es poco
+        if len(self.__pending) >= self.max_batch or (self.__pending and self.__timer is None):
+            self.__flush()
+
+
+async def run_client(host, port, param_set=768, connections=4, handshakes=100, pipeline=1,
+                     fresh_keys=False, stats=None, on_key=None, **options):
+    """
+    Cliente de carga: abre varias conexiones y realiza en cada una el número de intercambios pedido.
+
+    Entrada:
+    - host, port: dirección del servidor
+    - param_set: nivel de seguridad (debe coincidir con el del servidor)
+    - connections: conexiones simultáneas
+    - handshakes: intercambios por conexión
+    - pipeline: intercambios enviados por adelantado en cada conexión sin esperar respuesta
+    - fresh_keys: generar un par de claves nuevo para cada intercambio (por defecto, uno por conexión)
+    - stats: instancia de Stats donde acumular (se crea una si es None)
+    - on_key: función que recibe cada clave compartida K obtenida con Decaps
+    - options: opciones de ML_KEM
+
+    Salida:
+    - Stats con las latencias de ida y vuelta (envío de ek hasta recibir c, sin contar Decaps)
+    """
+    assert(param_set in SIZES and connections >= 1 and handshakes >= 0 and pipeline >= 1)
+    ml_kem = _ml_kem_for(param_set, **options)
+    (ek_size, c_size) = SIZES[param_set]
+    stats = Stats() if stats is None else stats
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mlkem-net-client")
+
+    async def connection():
+        (reader, writer) = await asyncio.open_connection(host, port)
+        (ek, dk) = await loop.run_in_executor(executor, ml_kem.KeyGen)
+        in_flight = deque()
+        sent = 0
+        done = 0
+        try:
+            while done < handshakes:
+                while sent < handshakes and len(in_flight) < pipeline:
+                    if fresh_keys and sent:
+                        (ek, dk) = await loop.run_in_executor(executor, ml_kem.KeyGen)
+                    writer.write(FRAME.pack(ek_size) + ek)
+                    in_flight.append((dk, time.perf_counter()))
+                    sent += 1
+                await writer.drain()
+                header = await reader.readexactly(FRAME.size)
+                (length,) = FRAME.unpack(header)
+                if length != c_size:
+                    raise ConnectionError("el servidor respondió con una trama de %d bytes" % length)
+                c = await reader.readexactly(c_size)
+                (dk_used, start) = in_flight.popleft()
+                stats.record(time.perf_counter() - start)
+                K = await loop.run_in_executor(executor, ml_kem.Decaps, dk_used, c)
+                if on_key is not None:
+                    on_key(K)
+                done += 1
+        except (ConnectionError, asyncio.IncompleteReadError):
+            stats.record_error()
+        finally:
+            writer.close()
+            await writer.wait_closed()
+
+    try:
+        await asyncio.gather(*(connection() for _ in range(connections)))
+    finally:
+        executor.shutdown(wait=True)
+    return stats
+
+
+async def _loopback(args, options):
+    server = Server(args.param_set, args.batch_window, args.max_batch, **options)
+    (host, port) = await server.start("127.0.0.1", 0)
+    try:
+        client = await run_client(host, port, args.param_set, args.connections, args.handshakes,
+                                  args.pipeline, args.fresh_keys, **options)
+    finally:
+        await server.close()
+    print("servidor:", server.stats.report())
+    print("cliente: ", client.report())
+
+
+async def _serve(args, options):
+    server = Server(args.param_set, args.batch_window, args.max_batch, **options)
+    (host, port) = await server.start(args.host, args.port)
+    print(f"escuchando en {host}:{port}", flush=True)
+
+    async def report():
+        while True:
+            await asyncio.sleep(args.report_interval)
+            print(server.stats.report(), flush=True)
+
+    task = asyncio.ensure_future(report())
+    try:
+        await server.serve_forever()
+    finally:
+        task.cancel()
+        await server.close()
+
+
+def main(argv=None):
+    """
+    Uso: python -m mlkem.net server [--host H] [--port P] [--report-interval S]
+         python -m mlkem.net client [--host H] --port P [--connections N] [--handshakes N] [--pipeline N]
+         python -m mlkem.net loopback [--connections N] [--handshakes N] [--pipeline N]
+
+    Opciones comunes: --param-set, --engine, --batch-window, --max-batch, --fresh-keys.
+    """
+    parser = argparse.ArgumentParser(prog="python -m mlkem.net", description="Intercambio de claves ML-KEM sobre TCP")
+    parser.add_argument("mode", choices=("server", "client", "loopback"))
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--param-set", type=int, choices=sorted(SIZES), default=768)
+    parser.add_argument("--engine", default=None, help="motor de cálculo (por defecto, MLKEM_ENGINE)")
+    parser.add_argument("--batch-window", type=float, default=0.002, help="ventana de agrupación en segundos")
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--connections", type=int, default=4)
+    parser.add_argument("--handshakes", type=int, default=25, help="intercambios por conexión")
+    parser.add_argument("--pipeline", type=int, default=1)
+    parser.add_argument("--fresh-keys", action="store_true", help="un par de claves nuevo por intercambio")
+    parser.add_argument("--report-interval", type=float, default=5.0)
+    args = parser.parse_args(argv)
+    options = {"engine": args.engine}
+
+    if args.mode == "loopback":
+        asyncio.run(_loopback(args, options))
+    elif args.mode == "server":
+        try:
+            asyncio.run(_serve(args, options))
+        except KeyboardInterrupt:
+            pass
+    else:
+        stats = asyncio.run(run_client(args.host, args.port, args.param_set, args.connections,
+                                       args.handshakes, args.pipeline, args.fresh_keys, **options))
+        print(stats.report())
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
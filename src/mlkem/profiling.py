@@ -0,0 +1,179 @@
+"""
+Instrumentación opcional de las etapas de ML-KEM.
+
+Mientras no haya ningún perfil activo, cada punto de instrumentación se reduce a comprobar un
+contador global y seguir, por lo que el coste es prácticamente nulo. Dentro de un bloque
+
+    with profile() as p:
+        ml.Decaps(dk, c)
+
+se registran el número de llamadas y el tiempo acumulado de cada etapa ejecutada por ese mismo hilo.
+Los tiempos son inclusivos: una etapa que llama a otra (por ejemplo, la generación de ruido, que
+invoca PRF) incluye el tiempo de la interior.
+"""
+import functools
+import threading
+import time
+
+_local = threading.local()  # Pila de perfiles activos de cada hilo
+_active = 0                 # Número de perfiles activos en todo el proceso
+_active_lock = threading.Lock()
+
+class Profile:
+    """
+    Desglose por etapas: número de llamadas y tiempo acumulado de cada una.
+    """
+
+    def __init__(self):
+        self.stages = {}    # nombre -> [llamadas, segundos]
+
+    def record(self, name, elapsed):
+        """
+        Añade una llamada de duración elapsed (segundos) a la etapa name.
+        """
+        entry = self.stages.get(name)
+        if entry is None:
+            self.stages[name] = [1, elapsed]
+        else:
+            entry[0] += 1
+            entry[1] += elapsed
+
+    def breakdown(self):
+        """
+        Desglose estructurado de las etapas.
+
+        Salida:
+        - diccionario nombre -> {"calls", "total_s", "mean_s"}, ordenado por tiempo total descendente
+        """
+        ordered = sorted(self.stages.items(), key=lambda item: -item[1][1])
+        return {name: {"calls": calls, "total_s": total, "mean_s": total / calls}
+                for (name, (calls, total)) in ordered}
+
+    def report(self):
+        """
+        Tabla de texto con el desglose, una etapa por línea.
+        """
+        lines = [f"{'etapa':<20} {'llamadas':>9} {'total (ms)':>12} {'media (ms)':>12}"]
+        for (name, s) in self.breakdown().items():
+            lines.append(f"{name:<20} {s['calls']:>9} {s['total_s'] * 1e3:>12.3f} {s['mean_s'] * 1e3:>12.3f}")
+        return "\n".join(lines)
+
+
+class _NullStage:
+    """
+    Contexto vacío que se devuelve cuando no hay ningún perfil activo.
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+class _Stage:
+    """
+    Contexto que mide una etapa y la registra en todos los perfiles activos del hilo.
+    """
+
+    def __init__(self, profiles, name):
+        self.__profiles = profiles
+        self.__name = name
+
+    def __enter__(self):
+        self.__start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.__start
+        for p in self.__profiles:
+            p.record(self.__name, elapsed)
+        return False
+
+
+def stage(name):
+    """
+    Delimita una etapa dentro de un bloque with.
+
+    Entrada:
+    - name: nombre de la etapa
+
+    Salida:
+    - contexto que mide la etapa si hay un perfil activo en el hilo (o uno vacío en caso contrario)
+    """
+    if not _active:
+        return _NULL_STAGE
+    profiles = getattr(_local, "profiles", None)
+    if not profiles:
+        return _NULL_STAGE
+    return _Stage(profiles, name)
+
+
+def instrumented(name):
+    """
+    Decorador que registra cada llamada a la función como una ejecución de la etapa name.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _active:
+                return fn(*args, **kwargs)
+            with stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def measured(operation):
+    """
+    Decorador para los métodos públicos de ML_KEM que anota cada llamada, con su latencia, en el
+    registro de métricas de la instancia (atributo metrics, ver metrics.py), si lo tiene.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            metrics = self.metrics
+            if metrics is None:
+                return fn(self, *args, **kwargs)
+            with metrics.time(operation, self.param_set):
+                return fn(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class profile:
+    """
+    Activa la instrumentación en el hilo actual durante un bloque with.
+
+    Entrada:
+    - callback: función opcional que recibe el Profile al salir del bloque (por ejemplo, para
+      enviarlo a un sistema de métricas)
+
+    Salida (as):
+    - Profile que se va rellenando con las etapas ejecutadas dentro del bloque
+    """
+
+    def __init__(self, callback=None):
+        self.__callback = callback
+        self.__profile = Profile()
+
+    def __enter__(self):
+        global _active
+        profiles = getattr(_local, "profiles", None)
+        if profiles is None:
+            profiles = _local.profiles = []
+        profiles.append(self.__profile)
+        with _active_lock:
+            _active += 1
+        return self.__profile
+
+    def __exit__(self, exc_type, exc, tb):
+        global _active
+        _local.profiles.remove(self.__profile)
+        with _active_lock:
+            _active -= 1
+        if self.__callback is not None:
+            self.__callback(self.__profile)
+        return False
@@ -0,0 +1,154 @@
+"""
+Fuentes de aleatoriedad para ML_KEM.
+
+Una fuente es cualquier función que recibe n y devuelve n bytes aleatorios (os.urandom lo es).
+ML_KEM pide 64 bytes por KeyGen (d || z) y 32 por Encaps (m); con os.urandom cada petición es una
+llamada al sistema. Aquí hay tres alternativas:
+
+- OSRandom (la fuente por defecto, DEFAULT_SOURCE): pide entropía al sistema operativo en bloques
+  grandes, la guarda en un buffer por hilo y entrega trozos, con una llamada al sistema cada
+  chunk_size bytes. Tras un fork el proceso hijo descarta los buffers heredados, para no repetir
+  los bytes que también entregará el padre. Donde getrandom es barato (Linux reciente) cuesta
+  lo mismo que os.urandom; la diferencia aparece donde cada llamada al sistema es cara.
+- ShakeDRBG: generador determinista sobre SHAKE256 sembrado desde el sistema operativo, que se
+  vuelve a sembrar cada reseed_interval peticiones y tras un fork. Cada petición deriva también la
+  clave siguiente y descarta la anterior, de modo que la salida ya entregada no puede reconstruirse
+  a partir del estado.
+- DeterministicRandom: secuencia reproducible a partir de una semilla, para pruebas y para comparar
+  rendimientos con las mismas claves y cápsulas en cada ejecución. No es segura para uso real.
+"""
+import os
+import threading
+from hashlib import shake_256
+from io import BytesIO
+
+# Generación de fork: cambia en cada proceso hijo e invalida los buffers y estados heredados
+_fork_generation = 0
+
+def _after_fork_in_child():
+    global _fork_generation
+    _fork_generation += 1
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+class OSRandom:
+    """
+    Entropía del sistema operativo pedida por bloques y repartida desde un buffer por hilo.
+
+    Los bytes ya entregados siguen en el buffer hasta que se agota el bloque (chunk_size / 32
+    peticiones como mucho); después el bloque se descarta entero.
+    """
+
+    def __init__(self, chunk_size=4096):
+        """
+        Entrada:
+        - chunk_size: bytes que se piden al sistema operativo en cada llamada (peticiones mayores
+          van directamente a os.urandom)
+        """
+        assert(chunk_size >= 64)
+        self.__chunk_size = chunk_size
+        self.__local = threading.local()
+
+    def __call__(self, n):
+        """
+        Entrada:
+        - n: número de bytes
+
+        Salida:
+        - n bytes aleatorios
+        """
+        local = self.__local
+        try:
+            if local.generation == _fork_generation:
+                out = local.stream.read(n)
+                if len(out) == n:
+                    return out
+        except AttributeError:
+            pass        # Primera petición de este hilo
+        if n > self.__chunk_size:
+            return os.urandom(n)
+        # Bloque nuevo (el resto del anterior, si no llega para n bytes, se descarta)
+        local.stream = BytesIO(os.urandom(self.__chunk_size))
+        local.generation = _fork_generation
+        return local.stream.read(n)
+
+
+class ShakeDRBG:
+    """
+    Generador determinista de bits sobre SHAKE256, sembrado desde el sistema operativo.
+    """
+
+    def __init__(self, reseed_interval=1 << 16, entropy=os.urandom):
+        """
+        Entrada:
+        - reseed_interval: número de peticiones tras el que se mezcla entropía nueva del sistema
+        - entropy: fuente de la semilla y de las resiembras (por defecto, os.urandom)
+        """
+        assert(reseed_interval >= 1)
+        self.__reseed_interval = reseed_interval
+        self.__entropy = entropy
+        self.__lock = threading.Lock()
+        self.__key = None
+        self.__reseed()
+
+    def __reseed(self):
+        """
+        Mezcla 32 bytes de entropía nueva con la clave actual (con el cerrojo tomado o en __init__).
+        """
+        previous = b"" if self.__key is None else self.__key
+        self.__key = shake_256(b"reseed" + previous + bytes(self.__entropy(32))).digest(32)
+        self.__requests = 0
+        self.__generation = _fork_generation
+
+    def __call__(self, n):
+        """
+        Entrada:
+        - n: número de bytes
+
+        Salida:
+        - n bytes pseudoaleatorios
+        """
+        with self.__lock:
+            if self.__requests >= self.__reseed_interval or self.__generation != _fork_generation:
+                self.__reseed()
+            self.__requests += 1
+            # Los 32 primeros bytes son la clave siguiente; el resto, la salida
+            stream = shake_256(b"generate" + self.__key).digest(32 + n)
+            self.__key = stream[:32]
+        return stream[32:]
+
+
+class DeterministicRandom:
+    """
+    Secuencia reproducible de bytes: SHAKE256(semilla || contador) para cada petición.
+
+    Solo para pruebas y medidas de rendimiento: quien conozca la semilla conoce todas las claves.
+    """
+
+    def __init__(self, seed=b""):
+        """
+        Entrada:
+        - seed: semilla (bytes-like); la misma semilla produce la misma secuencia de peticiones
+        """
+        self.__seed = bytes(seed)
+        self.__counter = 0
+        self.__lock = threading.Lock()
+
+    def __call__(self, n):
+        """
+        Entrada:
+        - n: número de bytes
+
+        Salida:
+        - los n bytes de la petición siguiente de la secuencia
+        """
+        with self.__lock:
+            counter = self.__counter
+            self.__counter += 1
+        return shake_256(self.__seed + counter.to_bytes(8, 'little')).digest(n)
+
+
+# Fuente compartida por las instancias de ML_KEM que no indican otra
+DEFAULT_SOURCE = OSRandom()
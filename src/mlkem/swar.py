@@ -0,0 +1,135 @@
+"""
+Aritmética SWAR (SIMD dentro de un registro) sobre polinomios de R_q empaquetados en un entero.
+
+Los 256 coeficientes ocupan carriles de 16 bits de un único entero de 4096 bits (el coeficiente i
+en los bits 16·i a 16·i + 15). Un coeficiente reducido ocupa 12 bits; los 4 restantes son bits de
+guarda que absorben los acarreos de sumas sin reducir (hasta 9 sumandos menores que q) y permiten
+la resta condicional de q en todos los carriles a la vez:
+
+    x - q·[x >= q]  =  x - ((((x | G) - Q) & G) >> 15) · q
+
+donde G tiene el bit 15 de cada carril y Q tiene q en cada carril: restar Q del entero con los bits
+de guarda puestos no propaga préstamos entre carriles, y el bit de guarda que sobrevive indica en
+qué carriles x >= q.
+
+La NTT y los productos trabajan con listas de enteros, así que los polinomios no pueden quedarse
+empaquetados entre operaciones y la conversión (pack/unpack, a través de array('H')) se paga en
+cada uso. Por eso solo se usa donde compensa:
+
+- en la frontera con la codificación de 12 bits de FIPS 203 (ByteEncode_12/ByteDecode_12), con
+  from_bytes12 y to_bytes12, que convierten directamente entre bytes y carriles con cortes de bytes
+  con paso y máscaras por byte;
+- en kernels.SumManyNTTs, donde una sola reducción cada 9 sumandos (sum_mod) ahorra más que lo que
+  cuesta empaquetar cada sumando a partir de tres. Una suma o resta de dos polinomios sigue siendo
+  más barata coeficiente a coeficiente que con la conversión de ida y vuelta.
+"""
+from array import array
+
+q = 3329
+N = 256
+LANE = 16
+
+def _lanes(value):
+    """
+    Entero con value en cada uno de los 256 carriles de 16 bits.
+    """
+    return int.from_bytes(array('H', [value] * N).tobytes(), 'little')
+
+
+ONES = _lanes(1)
+Q = q * ONES
+GUARD = ONES << (LANE - 1)
+LANE_MASK_12 = _lanes(0x0FFF)
+_BYTES_0F = int.from_bytes(b"\x0f" * 128, 'little')
+_BYTES_F0 = int.from_bytes(b"\xf0" * 128, 'little')
+assert(array('H').itemsize * 8 == LANE)
+
+def pack(f):
+    """
+    Empaqueta un polinomio de 256 coeficientes en [0, 2^15).
+    """
+    return int.from_bytes(array('H', f).tobytes(), 'little')
+
+
+def unpack(P):
+    """
+    Lista de los 256 coeficientes de un polinomio empaquetado.
+    """
+    words = array('H')
+    words.frombytes(P.to_bytes(2 * N, 'little'))
+    return words.tolist()
+
+
+def csub(P, c):
+    """
+    Resta c en los carriles que valen al menos c (carriles y c menores que 2^15).
+    """
+    return P - ((((P | GUARD) - c * ONES) & GUARD) >> (LANE - 1)) * c
+
+
+def reduce_once(P):
+    """
+    Reducción módulo q de carriles en [0, 2q).
+    """
+    return csub(P, q)
+
+
+def reduce(P):
+    """
+    Reducción módulo q de carriles en [0, 2^15) (por ejemplo, una suma sin reducir de hasta 9 polinomios).
+    """
+    for c in (8 * q, 4 * q, 2 * q, q):
+        P = csub(P, c)
+    return P
+
+
+def sum_mod(polys):
+    """
+    Suma módulo q de varios polinomios empaquetados y reducidos, con una sola reducción cada 9 sumandos.
+    """
+    total = 0
+    pending = 0
+    for P in polys:
+        total += P
+        pending += 1
+        if pending == 9:
+            total = reduce(total)
+            pending = 1
+    return reduce(total)
+
+
+def from_bytes12(B):
+    """
+    ByteDecode_12 a carriles: 384 bytes con 256 enteros de 12 bits -> polinomio empaquetado (sin reducir).
+
+    Cada 3 bytes b0, b1, b2 codifican dos coeficientes: b0 | (b1 & 0xF) << 8 y b1 >> 4 | b2 << 4.
+    Los cortes con paso separan b0, b1 y b2, las máscaras por byte reparten los nibbles y la
+    asignación con paso intercala los cuatro bytes de cada pareja de carriles.
+    """
+    B = bytes(B)
+    assert(len(B) == 384)
+    b1 = int.from_bytes(B[1::3], 'little')
+    b2 = int.from_bytes(B[2::3], 'little')
+
+    out = bytearray(2 * N)
+    out[0::4] = B[0::3]
+    out[1::4] = (b1 & _BYTES_0F).to_bytes(128, 'little')
+    out[2::4] = (((b1 >> 4) & _BYTES_0F) | ((b2 << 4) & _BYTES_F0)).to_bytes(128, 'little')
+    out[3::4] = ((b2 >> 4) & _BYTES_0F).to_bytes(128, 'little')
+    return int.from_bytes(out, 'little')
+
+
+def to_bytes12(P):
+    """
+    Carriles a ByteEncode_12: polinomio empaquetado -> 384 bytes (solo se usan los 12 bits bajos).
+    """
+    lanes = (P & LANE_MASK_12).to_bytes(2 * N, 'little')
+    h0 = int.from_bytes(lanes[1::4], 'little')
+    l1 = int.from_bytes(lanes[2::4], 'little')
+    h1 = int.from_bytes(lanes[3::4], 'little')
+
+    out = bytearray(384)
+    out[0::3] = lanes[0::4]
+    out[1::3] = (h0 | ((l1 << 4) & _BYTES_F0)).to_bytes(128, 'little')
+    out[2::3] = (((l1 >> 4) & _BYTES_0F) | ((h1 << 4) & _BYTES_F0)).to_bytes(128, 'little')
+    return bytes(out)
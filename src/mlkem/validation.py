@@ -0,0 +1,227 @@
+from collections import OrderedDict
+from functools import lru_cache
+from threading import Lock
+from .keccak import H
+from .conversions import bytes_view
+
+q = 3329
+
+@lru_cache(maxsize=None)
+def _masks(n):
+    """
+    Precalcula las máscaras usadas por modulus_check para n bytes de coeficientes de 12 bits.
+
+    Los 8*n/12 coeficientes se separan en dos enteros (coeficientes pares e impares), de forma que
+    cada coeficiente ocupa los 12 bits bajos de una ranura de 24 bits y deja 12 bits libres de guarda.
+
+    Entrada:
+    - n: número de bytes (múltiplo de 3)
+
+    Salida:
+    - lanes: máscara con los 12 bits bajos de cada ranura de 24 bits a 1
+    - offset: constante (2^12 - q) repetida en cada ranura
+    - carry: máscara con el bit 12 de cada ranura a 1
+    """
+    assert(n % 3 == 0)
+    slots = n // 3
+    lanes = int.from_bytes(b"\xff\x0f\x00" * slots, 'little')
+    offset = lanes // 0xFFF * (4096 - q)
+    carry = lanes // 0xFFF * 4096
+    return lanes, offset, carry
+
+
+def modulus_check(B):
+    """
+    Comprueba a nivel de palabra que todos los enteros de 12 bits codificados en B son menores que q.
+
+    Equivale a la comprobación de módulo de FIPS 203 (ByteEncode_12(ByteDecode_12(B)) == B), pero sin
+    decodificar ni recodificar: B se interpreta como un único entero y, con unas pocas operaciones
+    sobre enteros grandes, se suma 2^12 - q a cada coeficiente; un coeficiente es >= q si y solo si
+    la suma desborda a su bit de guarda.
+
+    Entrada:
+    - B: secuencia de bytes de longitud múltiplo de 3 (por ejemplo, los 384*k primeros bytes de ek)
+
+    Salida:
+    - True si todos los coeficientes están en [0, q), False en caso contrario
+    """
+    (lanes, offset, carry) = _masks(len(B))
+    x = int.from_bytes(B, 'little')
+
+    # Coeficientes pares (bits 0..11 de cada ranura de 24) e impares (bits 12..23)
+    even = x & lanes
+    odd = (x >> 12) & lanes
+
+    return ((even + offset) & carry) == 0 and ((odd + offset) & carry) == 0
+
+
+class ValidatedEK:
+    """
+    Clave pública ya validada según FIPS 203 para un nivel de seguridad concreto.
+
+    El llamante puede conservar este objeto y pasarlo a Encaps en lugar de ek para omitir la
+    validación; además guarda H(ek), que Encaps necesita en cada llamada.
+    """
+    __slots__ = ('k', 'ek', 'h')
+
+    def __init__(self, k, ek, h):
+        self.k = k      # Parámetro k para el que se validó la clave
+        self.ek = ek    # Clave pública (bytes)
+        self.h = h      # H(ek) (bytes)
+
+
+class ValidatedDK:
+    """
+    Clave privada extendida ya validada según FIPS 203 para un nivel de seguridad concreto.
+
+    Puede pasarse a Decaps en lugar de dk para omitir la comprobación de longitud y de H(ek).
+    """
+    __slots__ = ('k', 'dk', '__weakref__')
+
+    def __init__(self, k, dk):
+        self.k = k      # Parámetro k para el que se validó la clave
+        self.dk = dk    # Clave privada extendida (bytes)
+
+
+class ExpandedDK:
+    """
+    Clave privada extendida ya validada y expandida: ŝ y t̂ decodificados y la matriz Aᵀ generada.
+
+    Se obtiene con ML_KEM.expand_dk y se pasa a ML_KEM.Decaps_expanded, que no repite la
+    decodificación de la clave ni los k² SampleNTT del recifrado.
+    """
+    __slots__ = ('k', 's_gorro', 't_gorro', 'A_T', 'h', 'z')
+
+    def __init__(self, k, s_gorro, t_gorro, A_T, h, z):
+        self.k = k                  # Parámetro k para el que se validó la clave
+        self.s_gorro = s_gorro      # ŝ: k polinomios en dominio NTT
+        self.t_gorro = t_gorro      # t̂: k polinomios en dominio NTT
+        self.A_T = A_T              # Aᵀ: matriz k×k en dominio NTT
+        self.h = h                  # H(ek) (bytes)
+        self.z = z                  # Valor de rechazo implícito z (bytes)
+
+
+class KeyValidator:
+    """
+    Validación de claves de entrada de ML-KEM con una caché acotada (LRU) de claves ya validadas.
+
+    Las claves se indexan por su propia codificación, por lo que un acierto en la caché exige una
+    coincidencia exacta de bytes: nunca se acepta una clave que no haya pasado todas las
+    comprobaciones de FIPS 203.
+    """
+
+    def __init__(self, k, maxsize=256, hash_function=H):
+        """
+        Entrada:
+        - k: parámetro k del esquema
+        - maxsize: número máximo de claves públicas (y, por separado, privadas) recordadas
+        - hash_function: implementación de H que se usa (la del motor de cálculo de ML_KEM)
+        """
+        assert(maxsize >= 0)
+        self.__k = k
+        self.__H = hash_function
+        self.__maxsize = maxsize
+        self.__ek_cache = OrderedDict()     # ek -> H(ek)
+        self.__dk_cache = OrderedDict()     # ek || H(ek) de dk -> True
+        self.__lock = Lock()
+
+    def __lookup(self, cache, key):
+        """
+        Busca key en la caché y, si está, la marca como usada recientemente.
+        """
+        with self.__lock:
+            value = cache.get(key)
+            if value is not None:
+                cache.move_to_end(key)
+            return value
+
+    def __store(self, cache, key, value):
+        """
+        Inserta key en la caché desalojando las entradas menos usadas si se supera el tamaño máximo.
+        """
+        if self.__maxsize == 0:
+            return
+        with self.__lock:
+            cache[key] = value
+            cache.move_to_end(key)
+            while len(cache) > self.__maxsize:
+                cache.popitem(last=False)
+
+    def check_ek(self, ek):
+        """
+        Realiza las comprobaciones de entrada de ML-KEM.Encaps sobre la clave pública.
+
+        Entrada:
+        - ek: clave pública (bytes-like, lista de enteros o ValidatedEK)
+
+        Salida:
+        - ek: clave pública como bytes
+        - h: H(ek)
+        """
+        if isinstance(ek, ValidatedEK):
+            assert(ek.k == self.__k)
+            return ek.ek, ek.h
+
+        ek = bytes(bytes_view(ek))
+        h = self.__lookup(self.__ek_cache, ek)
+        if h is None:
+            # Comprobación de tipo (longitud) y de módulo (FIPS 203, sección 7.2)
+            assert(len(ek) == 384 * self.__k + 32)
+            assert(modulus_check(ek[:384 * self.__k]))
+            h = self.__H(ek)
+            self.__store(self.__ek_cache, ek, h)
+
+        return ek, h
+
+    def check_dk(self, dk):
+        """
+        Realiza las comprobaciones de entrada de ML-KEM.Decaps sobre la clave privada.
+
+        Entrada:
+        - dk: clave privada extendida (bytes-like, lista de enteros o ValidatedDK)
+
+        Salida:
+        - memoryview de bytes sobre dk (sin copia si dk ya era bytes-like)
+        """
+        if isinstance(dk, ValidatedDK):
+            assert(dk.k == self.__k)
+            return memoryview(dk.dk)
+
+        k = self.__k
+        dk = bytes_view(dk)
+        # Comprobación de tipo (longitud)
+        assert(len(dk) == 768 * k + 96)
+
+        # Comprobación de hash: H(ek) debe coincidir con el valor almacenado en dk (FIPS 203, sección 7.3)
+        key = bytes(dk[384 * k : 768 * k + 64])
+        if self.__lookup(self.__dk_cache, key) is None:
+            assert(self.__H(dk[384 * k : 768 * k + 32]) == dk[768 * k + 32 : 768 * k + 64])
+            self.__store(self.__dk_cache, key, True)
+
+        return dk
+
+    def validate_ek(self, ek):
+        """
+        Valida la clave pública y devuelve un objeto que el llamante puede conservar y reutilizar.
+
+        Entrada:
+        - ek: clave pública (bytes-like o lista de enteros)
+
+        Salida:
+        - ValidatedEK con la clave y su hash H(ek)
+        """
+        (ek, h) = self.check_ek(ek)
+        return ValidatedEK(self.__k, ek, h)
+
+    def validate_dk(self, dk):
+        """
+        Valida la clave privada y devuelve un objeto que el llamante puede conservar y reutilizar.
+
+        Entrada:
+        - dk: clave privada extendida (bytes-like o lista de enteros)
+
+        Salida:
+        - ValidatedDK con una copia inmutable de la clave
+        """
+        dk = self.check_dk(dk)
+        return ValidatedDK(self.__k, bytes(dk))